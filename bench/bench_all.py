@@ -0,0 +1,58 @@
+"""
+Time for all filters, the CONTAINS and LENGTHS form against SAME, across array sizes
+"""
+
+import json
+import time
+import sqlite3
+
+import relations_sql
+from relations_sqlite import *
+
+
+class CONTAINED(relations_sql.ALL):
+    """
+    ALL the way it was, CONTAINS and LENGTHS
+    """
+
+    AND = AND
+    CONTAINS = relations_sqlite.CONTAINS
+    LENGTHS = relations_sqlite.LENGTHS
+
+
+def bench(SETS, size, rows=1000, repeat=3):
+    """
+    Times filtering rows whose arrays have size members for those with
+    the same members as one shuffled list
+    """
+
+    connection = sqlite3.connect(":memory:")
+    connection.execute("CREATE TABLE `people` (`id` INTEGER PRIMARY KEY, `tags` TEXT)")
+    connection.executemany(
+        "INSERT INTO `people` (`tags`) VALUES (?)",
+        [(json.dumps(list(range(row % 7, row % 7 + size))),) for row in range(rows)]
+    )
+
+    members = list(reversed(range(6, 6 + size)))
+
+    query = SELECT("id").FROM("people").WHERE(SETS("tags", members))
+    query.generate()
+
+    start = time.perf_counter()
+
+    for _ in range(repeat):
+        connection.execute(query.sql, query.args).fetchall()
+
+    elapsed = (time.perf_counter() - start) / repeat
+
+    connection.close()
+
+    return elapsed
+
+
+if __name__ == "__main__":
+
+    for size in [1, 10, 50, 200]:
+        contained = bench(CONTAINED, size)
+        same = bench(ALL, size)
+        print(f"{size:>4} members: CONTAINS+LENGTHS {contained*1000:>9.2f}ms SAME {same*1000:>9.2f}ms {contained/same:>6.1f}x")
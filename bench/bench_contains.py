@@ -0,0 +1,61 @@
+"""
+Time for has filters, CONTAINS against CONTAINS_EXISTS, across array sizes
+"""
+
+import json
+import time
+import sqlite3
+
+from relations_sqlite import *
+
+
+def bench(CONTAINS, size, missing, rows=1000, repeat=3):
+    """
+    Times filtering rows whose arrays have size members, looking for
+    members that are all there or with one missing up front
+    """
+
+    connection = sqlite3.connect(":memory:")
+    connection.execute("CREATE TABLE `people` (`id` INTEGER PRIMARY KEY, `tags` TEXT)")
+    connection.executemany(
+        "INSERT INTO `people` (`tags`) VALUES (?)",
+        [(json.dumps(list(range(row % 7, row % 7 + size))),) for row in range(rows)]
+    )
+
+    class CONTAINED(HAS):
+        """
+        HAS with the CONTAINS under test
+        """
+
+    CONTAINED.CONTAINS = CONTAINS
+
+    members = list(range(6, max(size, 7)))
+
+    if missing:
+        members.insert(0, -1)
+
+    query = SELECT("id").FROM("people").WHERE(CONTAINED("tags", members))
+    query.generate()
+
+    start = time.perf_counter()
+
+    for _ in range(repeat):
+        connection.execute(query.sql, query.args).fetchall()
+
+    elapsed = (time.perf_counter() - start) / repeat
+
+    connection.close()
+
+    return elapsed
+
+
+if __name__ == "__main__":
+
+    for missing in [False, True]:
+        for size in [1, 10, 50, 200]:
+            contains = bench(relations_sqlite.CONTAINS, size, missing)
+            exists = bench(relations_sqlite.CONTAINS_EXISTS, size, missing)
+            print(
+                f"{size:>4} members {'missing' if missing else 'present'}: "
+                f"CONTAINS {contains*1000:>9.2f}ms CONTAINS_EXISTS {exists*1000:>9.2f}ms {contains/exists:>6.1f}x"
+            )
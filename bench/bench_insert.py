@@ -0,0 +1,43 @@
+"""
+Rows per second for INSERT chunks of different sizes
+"""
+
+import time
+import sqlite3
+
+from relations_sqlite import *
+
+
+def bench(rows, size):
+    """
+    Times loading rows in chunks of size
+    """
+
+    connection = sqlite3.connect(":memory:")
+    connection.execute("CREATE TABLE `people` (`stuff` INTEGER, `things` TEXT, `more` REAL)")
+
+    query = INSERT("people", "stuff", "things", "more")
+
+    for row in range(rows):
+        query.VALUES(row, f"thing{row}", row / 2)
+
+    start = time.perf_counter()
+
+    cursor = connection.cursor()
+
+    for chunk in query.chunks(variables=INSERT.limit(connection), rows=size):
+        cursor.execute(chunk.sql, chunk.args)
+
+    connection.commit()
+
+    elapsed = time.perf_counter() - start
+
+    connection.close()
+
+    return rows / elapsed
+
+
+if __name__ == "__main__":
+
+    for size in [1, 10, 100, 333, 1000, 10000]:
+        print(f"{size:>6} rows per INSERT: {bench(50000, size):>12,.0f} rows/s")
@@ -12,3 +12,8 @@ from relations_sqlite.ddl import *
 from relations_sqlite.column import *
 from relations_sqlite.index import *
 from relations_sqlite.table import *
+from relations_sqlite.plan import *
+from relations_sqlite.pool import *
+from relations_sqlite.aio import *
+from relations_sqlite.writer import *
+from relations_sqlite.loader import *
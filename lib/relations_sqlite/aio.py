@@ -0,0 +1,180 @@
+"""
+Module for executing Relations sqlite Queries from asyncio
+"""
+
+import time
+import asyncio
+import concurrent.futures
+
+import relations_sqlite
+
+
+class AIO:
+    """
+    Runs queries in threads on pooled connections so they don't block the event loop
+    """
+
+    POOL = relations_sqlite.POOL
+
+    WORKERS = 4         # threads and connections by default
+    BATCH = 100         # rows to fetch at a time when iterating
+    INTERRUPT = 0.01    # seconds between interrupts of a cancelled query
+
+    workers = None  # threads and connections
+    batch = None    # rows to fetch at a time when iterating
+    pool = None     # POOL of connections, bounded to the workers
+    owned = None    # whether the pool was made here, and so closed here
+
+    def __init__(self, database=None, workers=None, batch=None, pool=None, **kwargs):
+
+        if pool is not None and pool.size is None:
+            raise ValueError("AIO needs a POOL with a size so connections aren't shared across threads")
+
+        self.workers = workers or (pool.size if pool is not None else self.WORKERS)
+        self.batch = batch or self.BATCH
+
+        self.owned = pool is None
+        self.pool = self.POOL(database, size=self.workers, **kwargs) if pool is None else pool
+
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="relations_sqlite")
+        self.semaphores = {}
+
+    async def __aenter__(self):
+
+        return self
+
+    async def __aexit__(self, *args):
+
+        self.close()
+
+    def semaphore(self):
+        """
+        Gets what limits connections in use for the running loop
+        """
+
+        loop = asyncio.get_running_loop()
+
+        if loop not in self.semaphores:
+            self.semaphores[loop] = asyncio.Semaphore(min(self.workers, self.pool.size))
+
+        return self.semaphores[loop]
+
+    async def acquire(self):
+        """
+        Waits for a connection without tying up a thread
+        """
+
+        semaphore = self.semaphore()
+
+        await semaphore.acquire()
+
+        future = asyncio.get_running_loop().run_in_executor(self.executor, self.pool.acquire)
+
+        try:
+            connection = await asyncio.shield(future)
+        except asyncio.CancelledError:
+            try:
+                await self.settle(future)
+                self.pool.release(future.result(), time.perf_counter())
+            finally:
+                semaphore.release()
+            raise
+        except BaseException:
+            semaphore.release()
+            raise
+
+        return connection, time.perf_counter()
+
+    def release(self, connection, start):
+        """
+        Gives a connection back
+        """
+
+        self.pool.release(connection, start)
+        self.semaphore().release()
+
+    async def settle(self, future, connection=None):
+        """
+        Waits for a thread to finish, even if cancelled again, interrupting the connection if given
+        """
+
+        while not future.done():
+
+            # an interrupt before the statement starts is lost, so keep at it until the thread's done
+            if connection is not None:
+                connection.interrupt()
+
+            try:
+                await asyncio.wait([future], timeout=self.INTERRUPT if connection is not None else None)
+            except asyncio.CancelledError:
+                pass
+
+    async def call(self, connection, function, *args):
+        """
+        Runs a function in a thread, interrupting the connection if cancelled
+        and waiting for the thread to let go of it
+        """
+
+        future = asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            await self.settle(future, connection)
+            try:
+                future.result()
+            except Exception: # pylint: disable=broad-except
+                pass
+            raise
+
+    async def execute(self, query, **kwargs):
+        """
+        Generates and runs a query, returning the rows if it has any, else the rows changed
+        """
+
+        self.pool.generate(query, **kwargs)
+
+        connection, start = await self.acquire()
+
+        try:
+            return await self.call(connection, self.pool.run, connection, query)
+        finally:
+            self.release(connection, start)
+
+    async def batches(self, query, size=None, **kwargs):
+        """
+        Generates and runs a query, yielding its rows a batch at a time
+        """
+
+        self.pool.generate(query, **kwargs)
+
+        connection, start = await self.acquire()
+        cursor = None
+
+        try:
+
+            cursor = await self.call(connection, connection.execute, query.sql, query.args)
+
+            while True:
+
+                rows = await self.call(connection, cursor.fetchmany, size or self.batch)
+
+                if not rows:
+                    break
+
+                yield rows
+
+        finally:
+            if cursor is not None:
+                cursor.close()
+            self.release(connection, start)
+
+    def close(self):
+        """
+        Waits for the threads to finish, closing the pool if made here
+        """
+
+        self.executor.shutdown(wait=True)
+
+        if self.owned:
+            self.pool.close()
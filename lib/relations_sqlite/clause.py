@@ -2,6 +2,8 @@
 Module for all sqlite SQL relations_sql.CLAUSES, pieces of Queries
 """
 
+import itertools
+
 import relations_sql
 import relations_sqlite
 
@@ -18,6 +20,39 @@ class ARGS(relations_sqlite.SQL, relations_sql.ARGS):
     """
 
 
+class WITH(relations_sqlite.SQL, relations_sql.CLAUSE):
+    """
+    Clause for WITH, named queries to SELECT FROM
+    """
+
+    NAME = "WITH"
+    RECURSIVE = "WITH RECURSIVE"
+
+    KWARGS = relations_sqlite.CTE
+
+    recursive = None    # whether the queries can SELECT FROM themselves
+
+    def add(self, *args, RECURSIVE=None, **kwargs): # pylint: disable=arguments-differ
+        """
+        Add named queries, making them recursive if asked
+        """
+
+        if RECURSIVE is not None:
+            self.recursive = RECURSIVE
+
+        return super().add(*args, **kwargs)
+
+    def generate(self, indent=0, count=0, pad=" ", **kwargs):
+        """
+        Concats the named queries
+        """
+
+        super().generate(indent=indent, count=count, pad=pad, **kwargs)
+
+        if self.recursive and self.sql:
+            self.sql = f"{self.RECURSIVE}{self.sql[len(self.NAME):]}"
+
+
 class OPTIONS(relations_sqlite.SQL, relations_sql.OPTIONS):
     """
     Beginning of a SELECT statement
@@ -55,6 +90,111 @@ class WHERE(relations_sqlite.SQL, relations_sql.WHERE):
     KWARGS = relations_sqlite.OP
 
 
+class RETURNING(relations_sqlite.SQL, relations_sql.FIELDS):
+    """
+    Clause for RETURNING, FIELDS of the rows written
+    """
+
+    NAME = "RETURNING"
+
+    ARGS = relations_sqlite.COLUMN_NAME
+    KWARG = relations_sqlite.COLUMN_NAME
+    KWARGS = relations_sqlite.AS
+
+    SINCE = (3, 35, 0)  # first version that can RETURNING
+
+    def generate(self, indent=0, count=0, pad=" ", **kwargs):
+        """
+        Concats the fields, if this version of sqlite can
+        """
+
+        if self and self.VERSION < self.SINCE:
+            raise relations_sql.SQLError(self, f"RETURNING needs sqlite {'.'.join(map(str, self.SINCE))} or later")
+
+        super().generate(indent=indent, count=count, pad=pad, **kwargs)
+
+
+class ON(relations_sqlite.SQL, relations_sql.WHERE):
+    """
+    Clause for the ON of a JOIN
+    """
+
+    NAME = "ON"
+
+    ARGS = relations_sqlite.VALUE
+    KWARGS = relations_sqlite.OP
+
+
+class JOIN(relations_sqlite.SQL, relations_sql.CLAUSE):
+    """
+    Clause for JOINs, each a table and ON criteria for it
+    """
+
+    NAME = "JOIN"
+    LEFT = "LEFT JOIN"
+
+    ARGS = relations_sqlite.TABLE_NAME
+    KWARGS = relations_sqlite.AS
+    ON = ON
+
+    joins = None    # JOIN or LEFT JOIN for each table
+    criteria = None # ON for each table
+
+    def __init__(self, *args, **kwargs):
+
+        self.joins = []
+        self.criteria = []
+
+        super().__init__(*args, **kwargs)
+
+    def add(self, *args, LEFT=False, **kwargs): # pylint: disable=arguments-differ
+        """
+        Add a table, aliased if a dict, with criteria and kwargs for ON, LEFT to keep rows without a match
+        """
+
+        if not args:
+            return self.query or self
+
+        table, *criteria = args
+
+        if isinstance(table, dict):
+            (label, table), = table.items()
+            table = self.KWARGS(label, table if isinstance(table, relations_sql.SQL) else self.ARGS(table))
+        elif not isinstance(table, relations_sql.SQL):
+            table = self.ARGS(table)
+
+        self.expressions.append(table)
+        self.joins.append(self.LEFT if LEFT else self.NAME)
+        self.criteria.append(self.ON(*criteria, **kwargs))
+
+        return self.query or self
+
+    def generate(self, indent=0, count=0, pad=" ", **kwargs):
+        """
+        Concats each table after how it's joined, then what it's joined ON
+        """
+
+        sql = []
+        self.args = []
+
+        current = pad * (count * indent)
+        next = current + (indent * pad)
+        line = "\n" if indent else ' '
+
+        for join, table, criteria in zip(self.joins, self.expressions, self.criteria):
+
+            table.generate(indent=indent, count=count+1, pad=pad, **kwargs)
+            sql.append(f"{join}{line}{next}{table.sql}")
+            self.args.extend(table.args)
+
+            if criteria:
+                criteria.generate(indent=indent, count=count, pad=pad, **kwargs)
+                sql[-1] = f"{sql[-1]}{line}{current}{criteria.sql}"
+                self.args.extend(criteria.args)
+
+        self.sql = f"{line}{current}".join(sql)
+
+
 class GROUP_BY(relations_sqlite.SQL, relations_sql.GROUP_BY):
     """
     Clasuse for GROUP BY
@@ -72,6 +212,57 @@ class HAVING(relations_sqlite.SQL, relations_sql.HAVING):
     KWARGS = relations_sqlite.OP
 
 
+class UNION(relations_sqlite.SQL, relations_sql.CLAUSE):
+    """
+    Clause for UNION, compounding SELECTs into one
+    """
+
+    NAME = "UNION"
+    ALL = "UNION ALL"
+
+    compounds = None    # UNION or UNION ALL for each query
+
+    def __init__(self, *args, **kwargs):
+
+        self.compounds = []
+
+        super().__init__(*args, **kwargs)
+
+    def add(self, *args, ALL=False): # pylint: disable=arguments-differ
+        """
+        Add queries, keeping duplicate rows if ALL
+        """
+
+        for query in args:
+
+            if not isinstance(query, relations_sql.SELECT):
+                raise relations_sql.SQLError(self, f"can only UNION a SELECT, not {query}")
+
+            self.expressions.append(query)
+            self.compounds.append(self.ALL if ALL else self.NAME)
+
+        return self.query or self
+
+    def generate(self, indent=0, count=0, pad=" ", **kwargs):
+        """
+        Concats each query after how it's compounded
+        """
+
+        sql = []
+        self.args = []
+
+        current = pad * (count * indent)
+        line = "\n" if indent else ' '
+        delimitter = f"{line}{current}"
+
+        for compound, query in zip(self.compounds, self.expressions):
+            query.generate(indent=indent, count=count, pad=pad, **kwargs)
+            sql.append(f"{compound}{delimitter}{query.sql}")
+            self.args.extend(query.args)
+
+        self.sql = delimitter.join(sql)
+
+
 class ORDER_BY(relations_sqlite.SQL, relations_sql.ORDER_BY):
     """
     Clause for the bORDER
@@ -97,9 +288,193 @@ class SET(relations_sqlite.SQL, relations_sql.SET):
     KWARGS = relations_sqlite.ASSIGN
 
 
+class ON_CONFLICT(relations_sqlite.SQL, relations_sql.CLAUSE):
+    """
+    Clause for ON CONFLICT, DO NOTHING unless there's something to SET
+    """
+
+    NAME = "ON CONFLICT"
+
+    ARGS = relations_sqlite.COLUMN_NAME
+    SET = SET
+    EXCLUDED = relations_sqlite.EXCLUDED
+
+    DELIMITTER = ","
+
+    conflict = None # whether to handle conflicts, even with no target
+    update = None   # SET to DO UPDATE with, if any
+
+    def __init__(self, *args, **kwargs): # pylint: disable=super-init-not-called
+
+        self.expressions = []
+        self.conflict = False
+        self.update = self.SET()
+
+        if args or kwargs:
+            self(*args, **kwargs)
+
+    def __len__(self):
+
+        return 1 if self.conflict else 0
+
+    def add(self, *args, EXCLUDED=None, **kwargs): # pylint: disable=arguments-differ
+        """
+        Adds columns to the target, columns to SET from the conflicting row, and other assignments
+        """
+
+        if len(args) == 1 and isinstance(args[0], dict) and not kwargs:
+            kwargs = args[0]
+            args = []
+
+        self.conflict = True
+
+        relations_sql.CRITERIA.add(self, *args)
+
+        self.update({column: self.EXCLUDED(column) for column in EXCLUDED or []})
+        self.update(kwargs)
+
+        return self.query or self
+
+    def generate(self, indent=0, count=0, pad=" ", **kwargs):
+        """
+        Generates the target, if any, then what to DO
+        """
+
+        sql = []
+        self.args = []
+
+        one = pad * indent
+        current = pad * (count * indent)
+        next = current + one
+        line = "\n" if indent else ' '
+
+        if self.expressions:
+            self.express(self.expressions, sql, **kwargs)
+            target = f" ({self.DELIMITTER.join(sql)})"
+        else:
+            target = ""
+
+        if self.update:
+            self.express(self.update, sql, indent=indent, count=count+1, pad=pad, **kwargs)
+            action = f"DO UPDATE {sql[-1]}"
+        else:
+            action = "DO NOTHING"
+
+        self.sql = f"{self.NAME}{target}{line}{next}{action}"
+
+
 class VALUES(relations_sqlite.SQL, relations_sql.VALUES):
     """
     relations_sql.CRITERIA for VALUES
     """
 
     ARGS = relations_sqlite.LIST
+
+    rows = None     # rows to bind one at a time with executemany
+    json = None     # columns to bind as JSON for many, else those that are in the first row
+    jsonify = None  # whether each column binds as JSON for many
+
+    def __len__(self):
+
+        return 1 if self.rows is not None else len(self.expressions)
+
+    def many(self, rows, COLUMNS=None, JSON=None):
+        """
+        Sets rows to bind one at a time with executemany
+        """
+
+        if COLUMNS:
+            self.column(COLUMNS)
+
+        self.rows = rows
+        self.json = JSON
+
+        return self.query or self
+
+    def values(self, row):
+        """
+        Orders a row by the columns
+        """
+
+        if isinstance(row, dict):
+
+            self.column(sorted(row.keys()))
+
+            for column in self.columns:
+                if column not in row:
+                    raise relations_sql.SQLError(self, f"missing column {column} in {row}")
+
+            return [row[column] for column in self.columns]
+
+        if self.columns is not None and len(row) != len(self.columns):
+            raise relations_sql.SQLError(self, f"wrong values {row} for columns {self.columns}")
+
+        return row
+
+    def arg(self, row):
+        """
+        Generates the args for a row as a tuple
+        """
+
+        values = self.values(row)
+
+        for column, value, jsonify in zip(self.columns or [None] * len(values), values, self.jsonify):
+            if not jsonify and self.ARGS.ARG(value).jsonify:
+                raise relations_sql.SQLError(self, f"{column} is JSON in {row} but not in the first row, so set it in JSON")
+
+        values = self.ARGS([self.ARGS.ARG(value, jsonify=jsonify) for value, jsonify in zip(values, self.jsonify)])
+        values.generate()
+
+        return tuple(values.args)
+
+    def first(self):
+        """
+        Peeks at the first row, keeping it in the rows
+        """
+
+        rows = iter(self.rows)
+        once = rows is self.rows
+
+        for first in rows:
+            if once:
+                self.rows = itertools.chain([first], rows)
+            return first
+
+        return None
+
+    def generate(self, indent=0, count=0, pad=" ", **kwargs):
+        """
+        Concats the values, or a single row with lazy args for many
+        """
+
+        if self.rows is None:
+            super().generate(indent=indent, count=count, pad=pad, **kwargs)
+            return
+
+        first = self.first()
+
+        if self.query and self.query.COLUMNS:
+            self.column([])
+
+        if first is None and not self.columns:
+            raise relations_sql.SQLError(self, "need rows or columns for many")
+
+        values = self.values(first) if first is not None else [None] * len(self.columns)
+
+        if self.json is not None:
+            self.jsonify = [column in self.json for column in self.columns or [None] * len(values)]
+        else:
+            self.jsonify = [self.ARGS.ARG(value).jsonify for value in values]
+
+        template = self.ARGS([self.ARGS.ARG(value, jsonify=jsonify) for value, jsonify in zip(values, self.jsonify)])
+
+        count += 1
+        current = pad * (count * indent)
+        next = current + (indent * pad)
+        line = "\n" if indent else ' '
+        left, right = (f"(\n{next}", f"\n{current})") if indent else ('(', ')')
+
+        template.generate(indent=indent, count=count+1, pad=pad, **kwargs)
+
+        self.sql = f"{self.NAME}{line}{current}{left}{template.sql}{right}"
+        self.args = (self.arg(row) for row in self.rows)
@@ -24,6 +24,7 @@ class COLUMN(relations_sqlite.DDL, relations_sql.COLUMN):
 
     AUTO = """INTEGER PRIMARY KEY"""
     EXTRACT = """AS (%s)"""
+    STORED = """STORED"""
 
     def __init__(self, migration=None, definition=None, added=False, **kwargs):
 
@@ -31,3 +32,13 @@ class COLUMN(relations_sqlite.DDL, relations_sql.COLUMN):
 
         if self.migration and self.migration.get("kind") == "bool" and "default" in self.migration:
             self.migration["default"] = int(self.migration["default"])
+
+    def extract(self, kind, sql, **kwargs):
+        """
+        Get extract DDL, STORED if set, else VIRTUAL
+        """
+
+        super().extract(kind, sql, **kwargs)
+
+        if self.migration.get("stored"):
+            sql.append(self.STORED)
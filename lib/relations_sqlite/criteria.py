@@ -49,6 +49,14 @@ class ANY(SETS, relations_sql.ANY):
     LEFT = relations_sqlite.COLUMN_NAME
     VALUE = relations_sqlite.VALUE
     CONTAINS = relations_sqlite.CONTAINS
+    INTERSECTS = relations_sqlite.INTERSECTS
+
+    def __init__(self, left=None, right=None, invert=False, jsonify=False, extracted=False, **kwargs): # pylint: disable=super-init-not-called
+
+        if kwargs:
+            left, right = list(kwargs.items())[0]
+
+        self.expression = self.INTERSECTS(left, self.ensure(right), jsonify=jsonify, extracted=extracted)
 
 
 class ALL(SETS, relations_sql.ALL):
@@ -59,6 +67,11 @@ class ALL(SETS, relations_sql.ALL):
     AND = AND
     CONTAINS = relations_sqlite.CONTAINS
     LENGTHS = relations_sqlite.LENGTHS
+    SAME = relations_sqlite.SAME
+
+    def __init__(self, left=None, right=None, invert=False, jsonify=False, extracted=False, **kwargs): # pylint: disable=super-init-not-called
+
+        self.expression = self.SAME(left, self.ensure(right), invert=invert, jsonify=jsonify, extracted=extracted, **kwargs)
 
 
 class OP(SETS, relations_sql.OP): # pylint: disable=too-few-public-methods
@@ -83,3 +96,77 @@ class OP(SETS, relations_sql.OP): # pylint: disable=too-few-public-methods
         'any': ANY,
         'all': ALL
     }
+
+
+class SEEK(relations_sqlite.SQL, relations_sql.EXPRESSION):
+    """
+    Rows past those with values, going by ORDER expressions, for keyset pagination
+    """
+
+    VALUE = relations_sqlite.VALUE
+
+    AFTER = {
+        None: ">",
+        relations_sql.ASC: ">",
+        relations_sql.DESC: "<"
+    }
+
+    orders = None   # ORDER expressions the rows are sorted by
+    values = None   # values of the last row seen, in the same order
+
+    def __init__(self, orders, values): # pylint: disable=super-init-not-called
+
+        if len(orders) != len(values):
+            raise relations_sql.SQLError(self, f"need {len(orders)} values for ORDER BY, got {len(values)}")
+
+        self.orders = orders
+        self.values = [value if isinstance(value, relations_sql.SQL) else self.VALUE(value) for value in values]
+
+    def __len__(self):
+
+        return len(self.orders)
+
+    def generate(self, **kwargs):
+        """
+        Generates a row value comparison if every order goes the same way, else
+        each column tied up to one past it
+        """
+
+        for order, value in zip(self.orders, self.values):
+            order.expression.generate()
+            value.generate()
+
+        afters = [self.AFTER[order.order] for order in self.orders]
+
+        self.args = []
+
+        if len(set(afters)) == 1:
+
+            columns = [order.expression for order in self.orders]
+
+            for expression in columns + self.values:
+                self.args.extend(expression.args)
+
+            if len(columns) == 1:
+                self.sql = f"{columns[0].sql}{afters[0]}{self.values[0].sql}"
+            else:
+                self.sql = f"({','.join(column.sql for column in columns)}){afters[0]}({','.join(value.sql for value in self.values)})"
+
+            return
+
+        ors = []
+
+        for index, (order, value) in enumerate(zip(self.orders, self.values)):
+
+            ands = []
+
+            for tied, tie in zip(self.orders[:index], self.values[:index]):
+                ands.append(f"{tied.expression.sql}={tie.sql}")
+                self.args.extend(tied.expression.args + tie.args)
+
+            ands.append(f"{order.expression.sql}{afters[index]}{value.sql}")
+            self.args.extend(order.expression.args + value.args)
+
+            ors.append(f"({' AND '.join(ands)})")
+
+        self.sql = f"({' OR '.join(ors)})"
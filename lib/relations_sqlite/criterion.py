@@ -77,6 +77,39 @@ class IN(CRITERION, relations_sql.IN):
     RIGHT = relations_sqlite.LIST
     VALUE = relations_sqlite.VALUE
 
+    THRESHOLD = 100 # More values than this are bound as a single JSON array
+    EACH = "(SELECT +value FROM json_each(%s))"
+
+    def __init__(self, left=None, right=None, invert=False, jsonify=False, extracted=False, **kwargs):
+
+        super().__init__(left, right, invert=invert, jsonify=jsonify, extracted=extracted, **kwargs)
+
+        if (
+            self.THRESHOLD is not None and isinstance(self.right, relations_sql.LIST) and
+            len(self.right) > self.THRESHOLD and
+            all(isinstance(value, relations_sql.VALUE) and not value.jsonify for value in self.right.expressions)
+        ):
+            self.right = self.VALUE([value.value for value in self.right.expressions], jsonify=True)
+
+    def generate(self, indent=0, count=0, pad=' ', **kwargs):
+        """
+        Generate the left and right with operand in between
+        """
+
+        if not isinstance(self.right, relations_sql.VALUE):
+            super().generate(indent=indent, count=count, pad=pad, **kwargs)
+            return
+
+        sql = []
+        self.args = []
+
+        self.express(self.left, sql, indent=indent, count=count+1, **kwargs)
+        self.express(self.right, [], indent=indent, count=count+1, **kwargs)
+
+        operand = self.INVERT if self.invert else self.OPERAND
+
+        self.sql = operand % (sql[0], self.EACH % self.PLACEHOLDER)
+
 
 class CONTAINS(CRITERION, relations_sql.CONTAINS):
     """
@@ -91,6 +124,46 @@ class CONTAINS(CRITERION, relations_sql.CONTAINS):
     REVERSE = True
 
 
+class CONTAINS_EXISTS(CONTAINS):
+    """
+    Wether one set contains another, stopping at the first missing member
+    """
+
+    INVERT = "EXISTS (SELECT 1 FROM json_each(%s) as l WHERE NOT EXISTS (SELECT 1 FROM json_each(%s) as r WHERE r.value=l.value))"
+    OPERAND = "(NOT %s)" % INVERT
+
+
+class INTERSECTS(CRITERION, relations_sql.CRITERION):
+    """
+    Wether one set has any members of another
+    """
+
+    RIGHT = relations_sqlite.VALUE
+
+    OPERAND = "EXISTS (SELECT 1 FROM json_each(%s) as l JOIN json_each(%s) as r ON l.value=r.value)"
+    INVERT = "NOT %s" % OPERAND
+
+
+class SAME(CRITERION, relations_sql.CRITERION):
+    """
+    Wether one set has the same members as another, sorting each once, with whole
+    reals as integers so 1.0 matches 1, and NULL matching nothing, not even []
+    """
+
+    RIGHT = relations_sqlite.VALUE
+
+    WHOLE = "type='real' AND value=CAST(value AS INTEGER)"
+
+    CANONICAL = (
+        "(SELECT CASE WHEN j IS NULL THEN NULL WHEN COUNT(t)=0 THEN '[]' ELSE json_group_array(v) END FROM ("
+        f"SELECT j,CASE WHEN {WHOLE} THEN 'integer' ELSE type END AS t,CASE WHEN {WHOLE} THEN CAST(value AS INTEGER) ELSE value END AS v "
+        "FROM (SELECT %s AS j) LEFT JOIN json_each(j) ORDER BY t,v))"
+    )
+
+    OPERAND = "%s=%s" % (CANONICAL, CANONICAL)
+    INVERT = "%s!=%s" % (CANONICAL, CANONICAL)
+
+
 class LENGTHS(CRITERION, relations_sql.LENGTHS):
     """
     Wether one set contains another
@@ -63,6 +63,35 @@ class COLUMN_NAME(relations_sqlite.SQL, relations_sql.COLUMN_NAME):
 
     TABLE_NAME = TABLE_NAME
 
+    def generate(self, **kwargs):
+        """
+        Generates the sql and args, with any path in the sql so it matches expression indexes
+        """
+
+        self.args = []
+
+        column = self.column(**kwargs)
+
+        if self.path:
+            self.sql = self.PATH % (column, self.str(self.walk(self.path)))
+        else:
+            self.sql = column
+
+        if self.jsonify:
+            self.sql = self.JSONIFY % self.sql
+
+
+class EXCLUDED(COLUMN_NAME):
+    """
+    Column of the row that conflicted, for ON CONFLICT DO UPDATE
+    """
+
+    TABLE = "excluded"
+
+    def __init__(self, name, jsonify=False): # pylint: disable=super-init-not-called
+
+        self(name, self.TABLE, jsonify=jsonify)
+
 
 class NAMES(relations_sqlite.SQL, relations_sql.NAMES):
     """
@@ -88,6 +117,31 @@ class AS(relations_sqlite.SQL, relations_sql.AS):
     NAME = NAME
 
 
+class CTE(relations_sqlite.SQL, relations_sql.AS):
+    """
+    For WITH pairings, the name then the query
+    """
+
+    NAME = NAME
+
+    def generate(self, indent=0, count=0, pad=' ', **kwargs):
+        """
+        Generates the sql and args
+        """
+
+        sql = []
+        self.args = []
+
+        current = pad * (count * indent)
+        next = current + (indent * pad)
+        line = "\n" if indent else ''
+
+        self.express(self.label, sql, indent=indent, count=count+1, **kwargs)
+        self.express(self.expression, sql, indent=indent, count=count+1, pad=pad, **kwargs)
+
+        self.sql = f"{sql[0]} AS ({line}{next}{sql[1]}{line}{current})"
+
+
 ASC = relations_sql.ASC
 DESC = relations_sql.DESC
 
@@ -4,6 +4,8 @@ Module for Column DDL
 
 # pylint: disable=unused-argument,arguments-differ
 
+import json
+
 import relations_sql
 import relations_sqlite
 
@@ -14,7 +16,9 @@ class INDEX(relations_sqlite.DDL, relations_sql.INDEX):
     """
 
     TABLE = relations_sqlite.TABLE_NAME
+    COLUMN = relations_sqlite.COLUMN_NAME
     COLUMNS = relations_sqlite.COLUMN_NAMES
+    WHERE = relations_sqlite.WHERE
 
     CREATE = "INDEX"
 
@@ -42,6 +46,57 @@ class INDEX(relations_sqlite.DDL, relations_sql.INDEX):
 
         return self.SEPARATOR.join(sql)
 
+    def column(self, column):
+        """
+        Parses a column, with a JSON path as an expression
+        """
+
+        if isinstance(column, relations_sql.SQL):
+            return column
+
+        return self.COLUMN(column)
+
+    def literal(self, value):
+        """
+        Outputs a value to put in the sql itself
+        """
+
+        if value is None:
+            return "NULL"
+
+        if isinstance(value, bool):
+            return str(int(value))
+
+        if isinstance(value, (int, float)):
+            return repr(value)
+
+        return self.str(value if isinstance(value, str) else json.dumps(value))
+
+    def where(self):
+        """
+        Generates the WHERE for a partial index, with values in place as DDL can't bind
+        """
+
+        where = self.migration["where"]
+        where = self.WHERE(**where) if isinstance(where, dict) else self.WHERE(where)
+        where.generate()
+
+        sql = []
+        args = iter(where.args)
+        quote = None
+
+        for char in where.sql:
+            if quote:
+                if char == quote:
+                    quote = None
+            elif char in [self.STR, self.QUOTE]:
+                quote = char
+            elif char == self.PLACEHOLDER:
+                char = self.literal(next(args))
+            sql.append(char)
+
+        return "".join(sql)
+
     def create(self, **kwargs):
         """
         CREATE DLL
@@ -60,10 +115,13 @@ class INDEX(relations_sqlite.DDL, relations_sql.INDEX):
             table.generate()
             sql.append(f"ON {table.sql}")
 
-        columns = self.COLUMNS(self.migration["columns"])
+        columns = self.COLUMNS([self.column(column) for column in self.migration["columns"]])
         columns.generate()
         sql.append(columns.sql)
 
+        if self.migration.get("where"):
+            sql.append(self.where())
+
         self.sql = " ".join(sql)
 
     def modify(self, indent=0, count=0, pad=' ', **kwargs):
@@ -0,0 +1,99 @@
+"""
+Module for loading Relations sqlite children of many parents at once
+"""
+
+import copy
+
+import relations_sql
+import relations_sqlite
+
+
+class LOADER:
+    """
+    Fetches the children of many parents with one IN query, grouped by parent key
+    """
+
+    IN = relations_sqlite.IN
+    INSERT = relations_sqlite.INSERT
+
+    query = None    # SELECT of the children, without the parent keys
+    key = None      # column of the children holding the parent key
+    size = None     # most keys to a query, else as many as fit
+
+    def __init__(self, query, key, size=None):
+
+        self.query = query
+        self.key = key
+        self.size = size
+
+    def chunks(self, connection, keys):
+        """
+        Splits the keys so each query fits in the variable limit, all at once if they're bound as JSON
+        """
+
+        size = self.size
+
+        if size is None and self.IN.THRESHOLD is None:
+            self.query.generate()
+            size = self.INSERT.limit(connection) - len(self.query.args)
+
+        if size is None:
+            return [keys]
+
+        if size < 1:
+            raise relations_sql.SQLError(self.query, f"no room for keys in {self.INSERT.limit(connection)} variables")
+
+        return [keys[index:index + size] for index in range(0, len(keys), size)]
+
+    def fetch(self, connection, keys):
+        """
+        Runs the query for each chunk of keys on a connection, grouping the rows by the key column
+        """
+
+        name = relations_sqlite.COLUMN_NAME(self.key).name
+
+        grouped = {key: [] for key in keys}
+
+        for chunk in self.chunks(connection, keys):
+
+            query = copy.deepcopy(self.query)
+            query.WHERE(**{f"{self.key}__in": chunk})
+            query.generate()
+
+            cursor = connection.cursor()
+
+            try:
+
+                cursor.execute(query.sql, query.args)
+
+                names = [column[0] for column in cursor.description]
+
+                if name not in names:
+                    raise relations_sql.SQLError(query, f"need {name} in FIELDS to group by")
+
+                index = names.index(name)
+
+                for row in cursor.fetchall():
+                    grouped.setdefault(row[name] if isinstance(row, dict) else row[index], []).append(row)
+
+            finally:
+                cursor.close()
+
+        return grouped
+
+    def load(self, source, keys):
+        """
+        Gets the children for each parent key, from a connection or a POOL, every key
+        having a list even if empty
+        """
+
+        keys = list(dict.fromkeys(key for key in keys if key is not None))
+
+        if not keys:
+            return {}
+
+        if isinstance(source, relations_sqlite.POOL):
+            with source.connection() as connection:
+                return self.fetch(connection, keys)
+
+        return self.fetch(source, keys)
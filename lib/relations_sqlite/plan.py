@@ -0,0 +1,188 @@
+"""
+Module for planning Table migrations
+"""
+
+import sqlite3
+
+import relations_sqlite
+
+
+class PLAN:
+    """
+    What a TABLE migration will cost, change by change, before running it
+    """
+
+    TABLE = relations_sqlite.TABLE
+
+    METADATA = "metadata"   # only the schema changes
+    INDEX = "index"         # indexes are built, reading every row
+    REWRITE = "rewrite"     # the table is rebuilt, or every row rewritten in place
+
+    COSTS = [METADATA, INDEX, REWRITE]
+
+    migration = None    # the changes to the table
+    definition = None   # the table as it is
+    changes = None      # each change and what it costs
+
+    def __init__(self, migration=None, definition=None):
+
+        self.migration = migration or {}
+        self.definition = definition or {}
+
+        self.changes = self.classify()
+
+    def cost(self, migration=None):
+        """
+        Gets the cost of a migration, this one by default
+        """
+
+        ddl = self.TABLE(migration=self.migration if migration is None else migration, definition=self.definition)
+        ddl.args = []
+
+        if not ddl.alter():
+            return self.REWRITE
+
+        statements = ddl.sql.split(";\n\n")
+
+        # DROP COLUMN rewrites every row to take the column out
+
+        if any(statement.startswith("ALTER TABLE") and " DROP " in statement for statement in statements):
+            return self.REWRITE
+
+        if any(statement.startswith("CREATE") for statement in statements):
+            return self.INDEX
+
+        return self.METADATA
+
+    def classify(self):
+        """
+        Gets each change to the table, fields, and indexes, with the cost of it alone
+        """
+
+        changes = []
+
+        table = {attr: self.migration[attr] for attr in ["name", "store", "schema"] if attr in self.migration}
+
+        if table:
+            changes.append({"kind": "table", "action": "change", "name": self.definition.get("name"), "cost": self.cost(table)})
+
+        fields = self.migration.get("fields", {})
+
+        for field in fields.get("add", []):
+            changes.append({
+                "kind": "field", "action": "add", "name": field["name"],
+                "cost": self.cost({"fields": {"add": [field]}})
+            })
+
+        for name, change in fields.get("change", {}).items():
+            changes.append({
+                "kind": "field", "action": "change", "name": name,
+                "cost": self.cost({"fields": {"change": {name: change}}})
+            })
+
+        for name in fields.get("remove", []):
+            changes.append({
+                "kind": "field", "action": "remove", "name": name,
+                "cost": self.cost({"fields": {"remove": [name]}})
+            })
+
+        for unique in ["index", "unique"]:
+
+            indexes = self.migration.get(unique, {})
+
+            for name, columns in indexes.get("add", {}).items():
+                changes.append({
+                    "kind": unique, "action": "add", "name": name,
+                    "cost": self.cost({unique: {"add": {name: columns}}})
+                })
+
+            for name, rename in indexes.get("rename", {}).items():
+                changes.append({
+                    "kind": unique, "action": "rename", "name": name,
+                    "cost": self.cost({unique: {"rename": {name: rename}}})
+                })
+
+            for name in indexes.get("remove", []):
+                changes.append({
+                    "kind": unique, "action": "remove", "name": name,
+                    "cost": self.cost({unique: {"remove": [name]}})
+                })
+
+        return changes
+
+    @property
+    def rewrite(self):
+        """
+        Whether the migration as a whole rebuilds the table or rewrites every row
+        """
+
+        return self.cost() == self.REWRITE
+
+    def rows(self, connection):
+        """
+        Estimates the rows in the table from sqlite_stat1 if analyzed, else the rowid range
+        """
+
+        ddl = self.TABLE(definition=self.definition)
+
+        stat = ddl.NAME("sqlite_stat1", schema=ddl.definition.get("schema"))
+        stat.generate()
+
+        cursor = connection.cursor()
+        cursor.row_factory = None
+
+        try:
+
+            try:
+                stats = cursor.execute(f"SELECT stat FROM {stat.sql} WHERE tbl=?", [ddl.definition["store"]]).fetchall()
+            except sqlite3.OperationalError:
+                stats = []
+
+            if stats:
+                return max(int(stat.split(" ")[0]) for stat, in stats)
+
+            rows = cursor.execute(f"SELECT MAX(rowid)-MIN(rowid)+1 FROM {ddl.name(state='definition')}").fetchone()[0]
+
+        finally:
+            cursor.close()
+
+        return rows or 0
+
+    def bytes(self, connection):
+        """
+        Estimates the bytes in the table from the size of its pages, or
+        the whole database if dbstat isn't compiled in
+        """
+
+        ddl = self.TABLE(definition=self.definition)
+
+        schema = ddl.definition.get("schema") or "main"
+
+        cursor = connection.cursor()
+        cursor.row_factory = None
+
+        try:
+
+            try:
+                cursor.execute("SELECT SUM(pgsize) FROM dbstat(?) WHERE name=?", [schema, ddl.definition["store"]])
+                return cursor.fetchone()[0] or 0
+            except sqlite3.OperationalError:
+                pass
+
+            pages = cursor.execute(f"PRAGMA {ddl.quote(schema)}.page_count").fetchone()[0]
+            size = cursor.execute(f"PRAGMA {ddl.quote(schema)}.page_size").fetchone()[0]
+
+        finally:
+            cursor.close()
+
+        return pages * size
+
+    def estimate(self, connection):
+        """
+        Estimates the rows and bytes the migration will write, none unless rewriting
+        """
+
+        if not self.rewrite:
+            return {"cost": self.cost(), "rows": 0, "bytes": 0}
+
+        return {"cost": self.REWRITE, "rows": self.rows(connection), "bytes": self.bytes(connection)}
@@ -0,0 +1,286 @@
+"""
+Module for executing Relations sqlite Queries on pooled connections
+"""
+
+import time
+import queue
+import weakref
+import sqlite3
+import threading
+import contextlib
+
+import relations_sqlite
+
+
+class OWNER: # pylint: disable=too-few-public-methods
+    """
+    Kept by a thread, so its connection can be closed once the thread's gone
+    """
+
+
+class POOL: # pylint: disable=too-many-instance-attributes
+    """
+    Connections set up once each, per thread or a bounded number shared, that execute queries
+    """
+
+    SCHEMA_NAME = relations_sqlite.SCHEMA_NAME
+    PRAGMA = relations_sqlite.PRAGMA
+    OWNER = OWNER
+
+    database = None     # the main database to connect to
+    size = None         # most connections to share, else one per thread
+    attach = None       # databases to ATTACH, by schema
+    pragma = None       # preset or dict of pragmas to apply to each database
+    cache = None        # CACHE to generate queries with, if any
+    wait = None         # most seconds to wait for a connection
+    row_factory = None  # row factory to set on each connection
+
+    opened = None       # connections made
+    acquired = None     # times a connection was handed out
+    busy = None         # connections handed out right now
+    waited = None       # seconds spent waiting for a connection
+    used = None         # seconds connections were handed out
+    started = None      # when the pool was made
+
+    def __init__(self, database, size=None, attach=None, pragma=None, cache=None, wait=None, row_factory=None, **kwargs): # pylint: disable=too-many-arguments
+
+        self.database = database
+        self.size = size
+        self.attach = attach or {}
+        self.pragma = pragma
+        self.cache = cache
+        self.wait = wait
+        self.row_factory = row_factory
+        self.kwargs = kwargs
+
+        self.lock = threading.Lock()
+        self.idle = queue.LifoQueue()
+        self.local = threading.local()
+        self.connections = []
+
+        self.opened = 0
+        self.acquired = 0
+        self.busy = 0
+        self.waited = 0.0
+        self.used = 0.0
+        self.started = time.perf_counter()
+
+    def connect(self):
+        """
+        Makes a connection, attaching databases and applying pragmas
+        """
+
+        connection = sqlite3.connect(self.database, check_same_thread=False, **self.kwargs)
+
+        if self.row_factory is not None:
+            connection.row_factory = self.row_factory
+
+        for schema, database in self.attach.items():
+            name = self.SCHEMA_NAME(schema)
+            name.generate()
+            connection.execute(f"ATTACH DATABASE ? AS {name.sql}", [database])
+
+        if self.pragma is not None:
+            for schema in [None, *self.attach]:
+                self.PRAGMA.apply(connection, self.pragma, schema=schema)
+
+        return connection
+
+    def open(self):
+        """
+        Makes a connection for a slot already counted, giving the slot back if it can't
+        """
+
+        try:
+            connection = self.connect()
+        except BaseException:
+            with self.lock:
+                self.opened -= 1
+            raise
+
+        with self.lock:
+            self.connections.append(connection)
+
+        return connection
+
+    def acquire(self):
+        """
+        Gets a connection, this thread's own or an idle one, waiting for one if all are busy
+        """
+
+        waited = 0.0
+
+        if self.size is None:
+            connection = getattr(self.local, "connection", None)
+            if connection is None:
+                with self.lock:
+                    self.opened += 1
+                connection = self.local.connection = self.open()
+                # the thread's local storage goes when it ends, taking the owner with it
+                self.local.owner = self.OWNER()
+                weakref.finalize(self.local.owner, self.forget, connection)
+        else:
+            try:
+                connection = self.idle.get_nowait()
+            except queue.Empty:
+                connection = None
+            if connection is None:
+                with self.lock:
+                    room = self.opened < self.size
+                    if room:
+                        self.opened += 1
+                if room:
+                    connection = self.open()
+                else:
+                    start = time.perf_counter()
+                    try:
+                        connection = self.idle.get(timeout=self.wait)
+                    except queue.Empty:
+                        raise TimeoutError(f"no connection free after {self.wait} seconds") from None
+                    waited = time.perf_counter() - start
+
+        with self.lock:
+            self.acquired += 1
+            self.busy += 1
+            self.waited += waited
+
+        return connection
+
+    def forget(self, connection):
+        """
+        Closes a thread's connection once the thread's gone, unless already closed with the rest
+        """
+
+        with self.lock:
+            if connection not in self.connections:
+                return
+            self.connections.remove(connection)
+            self.opened -= 1
+
+        connection.close()
+
+    def release(self, connection, start):
+        """
+        Gives a connection back, rolling back anything left uncommitted
+        """
+
+        if connection.in_transaction:
+            connection.rollback()
+
+        with self.lock:
+            self.busy -= 1
+            self.used += time.perf_counter() - start
+
+        if self.size is not None:
+            self.idle.put(connection)
+
+    @contextlib.contextmanager
+    def connection(self):
+        """
+        Hands out a connection for as long as it's needed
+        """
+
+        connection = self.acquire()
+        start = time.perf_counter()
+
+        try:
+            yield connection
+        finally:
+            self.release(connection, start)
+
+    @staticmethod
+    def many(query):
+        """
+        Whether a query is an INSERT of many rows
+        """
+
+        return isinstance(query, relations_sqlite.INSERT) and query.VALUES.rows is not None
+
+    def generate(self, query, **kwargs):
+        """
+        Generates a query, through the cache if there is one and the query isn't DDL or many rows
+        """
+
+        if self.cache is not None and not self.many(query) and not isinstance(query, relations_sqlite.DDL):
+            self.cache.generate(query, **kwargs)
+        else:
+            query.generate(**kwargs)
+
+    def run(self, connection, query, commit=True):
+        """
+        Runs a generated query, or each statement of DDL, on a connection, committing it
+        unless told not to, returning the rows if it has any, else the rows changed, with
+        many RETURNING run a row at a time as executemany drops what's returned
+        """
+
+        cursor = connection.cursor()
+        result = None
+
+        try:
+
+            if self.many(query) and query.RETURNING:
+                result = []
+                for args in query.args:
+                    result.extend(cursor.execute(query.sql, args).fetchall())
+            elif self.many(query):
+                cursor.executemany(query.sql, query.args)
+            elif isinstance(query, relations_sqlite.DDL):
+                for statement in query.sql[:-2].split(";\n\n"):
+                    cursor.execute(statement)
+            else:
+                cursor.execute(query.sql, query.args)
+
+            if result is None:
+                result = cursor.fetchall() if cursor.description is not None else cursor.rowcount
+
+            if commit:
+                connection.commit()
+
+        finally:
+            cursor.close()
+
+        return result
+
+    def execute(self, query, **kwargs):
+        """
+        Generates and runs a query on a connection from the pool
+        """
+
+        self.generate(query, **kwargs)
+
+        with self.connection() as connection:
+            return self.run(connection, query)
+
+    def metrics(self):
+        """
+        Gets how much the connections were waited for and used
+        """
+
+        with self.lock:
+
+            elapsed = time.perf_counter() - self.started
+
+            return {
+                "size": self.size,
+                "opened": self.opened,
+                "busy": self.busy,
+                "acquired": self.acquired,
+                "waited": self.waited,
+                "wait": self.waited / self.acquired if self.acquired else 0.0,
+                "utilisation": self.used / (elapsed * self.opened) if self.opened and elapsed else 0.0
+            }
+
+    def close(self):
+        """
+        Closes every connection made
+        """
+
+        with self.lock:
+            connections, self.connections = self.connections, []
+            self.opened = 0
+
+        for connection in connections:
+            connection.close()
+
+        self.idle = queue.LifoQueue()
+        self.local = threading.local()
@@ -2,7 +2,12 @@
 Module for all Relations sqlite Queries.
 """
 
+import re
+import json
+import base64
+import sqlite3
 import collections
+import threading
 
 import relations_sql
 import relations_sqlite
@@ -19,16 +24,119 @@ class SELECT(relations_sqlite.SQL, relations_sql.SELECT):
     """
 
     CLAUSES = collections.OrderedDict([
+        ("WITH", relations_sqlite.WITH),
         ("OPTIONS", relations_sqlite.OPTIONS),
         ("FIELDS", relations_sqlite.FIELDS),
         ("FROM", relations_sqlite.FROM),
+        ("JOIN", relations_sqlite.JOIN),
         ("WHERE", relations_sqlite.WHERE),
         ("GROUP_BY", relations_sqlite.GROUP_BY),
         ("HAVING", relations_sqlite.HAVING),
+        ("UNION", relations_sqlite.UNION),
         ("ORDER_BY", relations_sqlite.ORDER_BY),
         ("LIMIT", relations_sqlite.LIMIT)
     ])
 
+    SEEK = relations_sqlite.SEEK
+
+    KEY = "id"  # unique column to break ties in ORDER BY when seeking
+
+    def generate(self, indent=0, count=0, pad=" ", **kwargs):
+        """
+        Generate the sql and args, with any WITH ahead of SELECT
+        """
+
+        sql = []
+        self.args = []
+
+        current = pad * (count * indent)
+        line = "\n" if indent else ' '
+        delimitter = f"{line}{current}"
+
+        clauses = [clause for name, clause in self.clauses.items() if name != "WITH"]
+
+        self.express(self.WITH, sql, indent=indent, count=count, pad=" ", **kwargs)
+        self.express(clauses, sql, indent=indent, count=count, pad=" ", **kwargs)
+
+        if self.WITH:
+            self.sql = f"{sql[0]}{delimitter}{self.NAME}{line}{current}{delimitter.join(sql[1:])}"
+        else:
+            self.sql = f"{self.NAME}{line}{current}{delimitter.join(sql)}"
+
+    def keyed(self, KEY=None):
+        """
+        Makes sure ORDER BY ends in a unique column, so rows can't tie and be skipped
+        when seeking, adding the key going the same way as the last order if it isn't there
+        """
+
+        key = relations_sqlite.COLUMN_NAME(KEY or self.KEY)
+
+        for order in self.ORDER_BY.expressions:
+            if isinstance(order.expression, relations_sql.COLUMN_NAME) and not order.expression.path and order.expression.name == key.name:
+                return
+
+        last = self.ORDER_BY.expressions[-1].order if self.ORDER_BY.expressions else None
+
+        if last is None:
+            self.ORDER_BY(KEY or self.KEY)
+        else:
+            self.ORDER_BY(**{KEY or self.KEY: last})
+
+    def label(self, expression):
+        """
+        Gets the name a row has an ORDER BY value under, its alias in FIELDS if any, else
+        the column, else the expression itself as sqlite names it
+        """
+
+        expression.generate()
+
+        for field in self.FIELDS.expressions:
+            if isinstance(field, relations_sql.AS):
+                field.expression.generate()
+                if field.expression.sql == expression.sql:
+                    return field.label.name
+
+        if isinstance(expression, relations_sql.COLUMN_NAME) and not expression.path:
+            return expression.name
+
+        return expression.sql
+
+    def token(self, row, KEY=None):
+        """
+        Makes a cursor for the rows after this one, from its values for ORDER BY,
+        by column name if a dict, else in the same order
+        """
+
+        self.keyed(KEY)
+
+        if hasattr(row, "keys"):
+
+            labels = [self.label(order.expression) for order in self.ORDER_BY.expressions]
+
+            for label in labels:
+                if label not in row.keys():
+                    raise relations_sql.SQLError(self, f"need {label} in the row for ORDER BY")
+
+            row = [row[label] for label in labels]
+
+        elif len(row) != len(self.ORDER_BY.expressions):
+            raise relations_sql.SQLError(self, f"need {len(self.ORDER_BY.expressions)} values for ORDER BY, got {len(row)}")
+
+        return base64.urlsafe_b64encode(json.dumps(list(row)).encode()).decode()
+
+    def seek(self, token, KEY=None):
+        """
+        Only gets rows after the one the cursor was made from, going by ORDER BY
+        with the key to break ties
+        """
+
+        self.keyed(KEY)
+
+        if token is not None:
+            self.WHERE(self.SEEK(self.ORDER_BY.expressions, json.loads(base64.urlsafe_b64decode(token.encode()))))
+
+        return self
+
 
 class INSERT(relations_sqlite.SQL, relations_sql.INSERT):
     """
@@ -40,9 +148,127 @@ class INSERT(relations_sqlite.SQL, relations_sql.INSERT):
         ("TABLE", relations_sqlite.TABLE_NAME),
         ("COLUMNS", relations_sqlite.COLUMN_NAMES),
         ("VALUES", relations_sqlite.VALUES),
-        ("SELECT", SELECT)
+        ("SELECT", SELECT),
+        ("ON_CONFLICT", relations_sqlite.ON_CONFLICT),
+        ("RETURNING", relations_sqlite.RETURNING)
     ])
 
+    VARIABLES = 999
+    VARIABLE_NUMBER = getattr(sqlite3, "SQLITE_LIMIT_VARIABLE_NUMBER", 9)
+
+    @classmethod
+    def limit(cls, connection):
+        """
+        Looks up the most variables a connection allows in a statement
+        """
+
+        try:
+            return connection.getlimit(cls.VARIABLE_NUMBER)
+        except AttributeError:
+            return cls.VARIABLES
+
+    def chunk(self, expressions, indent=0, count=0, pad=" ", **kwargs):
+        """
+        Generates a copy of this INSERT with only some of the VALUES
+        """
+
+        query = self.__class__(self.TABLE, COLUMNS=self.COLUMNS)
+
+        for clause in self.CLAUSES:
+            if clause not in ["TABLE", "COLUMNS", "VALUES"]:
+                query.clauses[clause] = self.clauses[clause]
+
+        query.VALUES.columns = self.VALUES.columns
+        query.VALUES.expressions = expressions
+
+        query.generate(indent=indent, count=count, pad=pad, **kwargs)
+
+        return query
+
+    def chunks(self, variables=None, rows=None, indent=0, count=0, pad=" ", **kwargs):
+        """
+        Generates INSERTs with as many VALUES as fit in the variables
+        """
+
+        if not self.VALUES:
+            self.generate(indent=indent, count=count, pad=pad, **kwargs)
+            yield self
+            return
+
+        variables = variables or self.VARIABLES
+
+        if self.ON_CONFLICT:
+            self.ON_CONFLICT.generate()
+            variables -= len(self.ON_CONFLICT.args)
+
+        expressions = []
+        used = 0
+
+        for values in self.VALUES.expressions:
+
+            if len(values) > variables:
+                raise relations_sql.SQLError(self, f"{len(values)} values over {variables} variables")
+
+            if expressions and (used + len(values) > variables or (rows and len(expressions) >= rows)):
+                yield self.chunk(expressions, indent=indent, count=count, pad=pad, **kwargs)
+                expressions = []
+                used = 0
+
+            expressions.append(values)
+            used += len(values)
+
+        yield self.chunk(expressions, indent=indent, count=count, pad=pad, **kwargs)
+
+    def many(self, rows, JSON=None):
+        """
+        Sets rows to bind one at a time with executemany, JSON naming the columns to bind as JSON
+        """
+
+        return self.VALUES.many(rows, JSON=JSON)
+
+    def generate(self, indent=0, count=0, pad=" ", **kwargs):
+        """
+        Generate the sql and args, args lazy by row for many
+        """
+
+        if self.ON_CONFLICT and self.SELECT and not self.SELECT.WHERE:
+            raise relations_sql.SQLError(self, "SELECT needs a WHERE for ON CONFLICT to parse")
+
+        if self.VALUES.rows is None:
+            super().generate(indent=indent, count=count, pad=pad, **kwargs)
+            return
+
+        if self.SELECT:
+            raise relations_sql.SQLError(self, "set VALUES or SELECT but not both")
+
+        first = self.VALUES.first()
+
+        if first is not None:
+            self.VALUES.values(first)
+
+        sql = []
+        self.args = []
+
+        current = pad * (count * indent)
+        line = "\n" if indent else ' '
+        delimitter = f"{line}{current}"
+
+        for clause in self.clauses.values():
+            if clause is self.VALUES:
+                if self.args:
+                    raise relations_sql.SQLError(self, "only VALUES can have args for many")
+                clause.generate(indent=indent, count=count, pad=" ", **kwargs)
+                sql.append(clause.sql)
+            else:
+                self.express(clause, sql, indent=indent, count=count, pad=" ", **kwargs)
+
+        self.sql = f"{self.NAME}{line}{current}{delimitter.join(sql)}"
+
+        # args after VALUES, like ON CONFLICT's, go on the end of every row
+
+        after = tuple(self.args)
+        self.args = (args + after for args in self.VALUES.args) if after else self.VALUES.args
+
 
 class LIMITED(relations_sqlite.SQL, relations_sql.LIMITED):
     """
@@ -60,6 +286,7 @@ class UPDATE(relations_sqlite.SQL, relations_sql.UPDATE):
         ("TABLE", relations_sqlite.TABLE_NAME),
         ("SET", relations_sqlite.SET),
         ("WHERE", relations_sqlite.WHERE),
+        ("RETURNING", relations_sqlite.RETURNING),
         ("ORDER_BY", relations_sqlite.ORDER_BY),
         ("LIMIT", relations_sqlite.LIMIT)
     ])
@@ -74,6 +301,291 @@ class DELETE(relations_sqlite.SQL, relations_sql.DELETE):
         ("OPTIONS", relations_sqlite.OPTIONS),
         ("TABLE", relations_sqlite.TABLE_NAME),
         ("WHERE", relations_sqlite.WHERE),
+        ("RETURNING", relations_sqlite.RETURNING),
         ("ORDER_BY", relations_sqlite.ORDER_BY),
         ("LIMIT", relations_sqlite.LIMIT)
     ])
+
+
+class PRAGMA(relations_sqlite.SQL, relations_sql.EXPRESSION):
+    """
+    PRAGMA statement, setting if there's a value, else getting
+    """
+
+    NAME = "PRAGMA"
+    KEYWORD = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+    GLOBAL = {"busy_timeout", "foreign_keys", "recursive_triggers", "temp_store", "threads"} # pragmas without a schema
+
+    PRESETS = {
+        "bulk-load": {
+            "journal_mode": "MEMORY",
+            "synchronous": "OFF",
+            "cache_size": -262144,
+            "temp_store": "MEMORY"
+        },
+        "read-heavy": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "cache_size": -65536,
+            "mmap_size": 268435456,
+            "temp_store": "MEMORY",
+            "busy_timeout": 5000
+        },
+        "durable": {
+            "journal_mode": "WAL",
+            "synchronous": "FULL",
+            "busy_timeout": 5000
+        }
+    }
+
+    name = None     # the pragma
+    value = None    # what to set it to, if anything
+    schema = None   # the attached database to set it on
+
+    def __init__(self, name, value=None, schema=None): # pylint: disable=super-init-not-called
+
+        if not self.KEYWORD.match(name):
+            raise relations_sql.SQLError(self, f"invalid pragma {name}")
+
+        self.name = name
+        self.value = value
+        self.schema = schema
+
+    def literal(self, value):
+        """
+        Puts a value in the sql, as pragmas can't be bound
+        """
+
+        if isinstance(value, bool):
+            return "ON" if value else "OFF"
+
+        if isinstance(value, (int, float)):
+            return repr(value)
+
+        if self.KEYWORD.match(value):
+            return value
+
+        return self.str(value)
+
+    def generate(self, **kwargs):
+        """
+        Generate the sql, schema first if it has one
+        """
+
+        schema = f"{self.quote(self.schema)}{self.SEPARATOR}" if self.schema and self.name not in self.GLOBAL else ""
+
+        self.sql = f"{self.NAME} {schema}{self.quote(self.name)}"
+        self.args = []
+
+        if self.value is not None:
+            self.sql = f"{self.sql}={self.literal(self.value)}"
+
+    @classmethod
+    def preset(cls, preset, schema=None):
+        """
+        Gets the pragmas of a preset by name, or from a dict
+        """
+
+        if isinstance(preset, str):
+            if preset not in cls.PRESETS:
+                raise relations_sql.SQLError(None, f"unknown preset {preset}")
+            preset = cls.PRESETS[preset]
+
+        return [cls(name, value, schema=schema) for name, value in preset.items()]
+
+    @classmethod
+    def apply(cls, connection, preset, schema=None):
+        """
+        Runs the pragmas of a preset on a connection, returning what each ended up as
+        """
+
+        results = {}
+
+        cursor = connection.cursor()
+        cursor.row_factory = None
+
+        for pragma in cls.preset(preset, schema=schema):
+            pragma.generate()
+            row = cursor.execute(pragma.sql).fetchone()
+            results[pragma.name] = row[0] if row else pragma.value
+
+        cursor.close()
+
+        return results
+
+
+class CACHE:
+    """
+    Bounded LRU of generated sql keyed by the shape of a query
+    """
+
+    MARKER = "\x00relations_sqlite.CACHE:"
+    SKIP = {"sql", "args", "query", "model"}
+    SCALARS = {str, int, float, bool, type(None)}
+
+    size = None     # most shapes to keep
+    hits = None     # times the sql was reused
+    misses = None   # times the query had to be fully generated
+    compiled = None # sql and arg slots by shape, oldest first
+
+    def __init__(self, size=1024):
+
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self.compiled = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    def __len__(self):
+
+        return len(self.compiled)
+
+    def clear(self):
+        """
+        Drops all compiled sql and resets the counters
+        """
+
+        with self.lock:
+            self.compiled.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def shape(self, expression, values):
+        """
+        Builds a hashable key from everything in the expression except the values
+        """
+
+        if isinstance(expression, relations_sql.VALUE):
+            values.setdefault(id(expression), expression)
+            return (expression.__class__, expression.jsonify)
+
+        if isinstance(expression, relations_sql.SQL):
+
+            key = [expression.__class__]
+
+            if not isinstance(expression, relations_sql.EXPRESSION):
+                key.extend([expression.sql, tuple(expression.args)])
+
+            if isinstance(expression, relations_sql.NULL):
+                key.append(bool(expression.right.value))
+
+            for name, value in expression.__dict__.items():
+                if name in self.SKIP:
+                    continue
+                key.append(name)
+                key.append(value if value.__class__ in self.SCALARS else self.shape(value, values))
+
+            return tuple(key)
+
+        if isinstance(expression, (list, tuple)):
+            return tuple(
+                each if each.__class__ in self.SCALARS else self.shape(each, values)
+                for each in expression
+            )
+
+        if isinstance(expression, dict):
+            return tuple((name, self.shape(value, values)) for name, value in expression.items())
+
+        return expression
+
+    def compile(self, query, values, **kwargs):
+        """
+        Generates the query, then again with markers in place of values to
+        work out which args come from which values
+        """
+
+        query.generate(**kwargs)
+        sql, args = query.sql, query.args
+
+        originals = [value.value for value in values]
+        markers = {}
+
+        for index, value in enumerate(values):
+            value.value = f"{self.MARKER}{index}"
+            markers[value.value] = index
+            markers[json.dumps(value.value)] = index
+
+        try:
+            query.generate(**kwargs)
+            marked = query.args
+        finally:
+            for value, original in zip(values, originals):
+                value.value = original
+
+        query.sql, query.args = sql, args
+
+        if len(marked) != len(args):
+            return sql, None
+
+        slots = []
+
+        for index, arg in enumerate(marked):
+            if isinstance(arg, str) and arg in markers:
+                slots.append((True, markers[arg]))
+            elif isinstance(arg, str) and self.MARKER in arg:
+                return sql, None
+            else:
+                slots.append((False, args[index]))
+
+        return sql, slots
+
+    def generate(self, query, **kwargs):
+        """
+        Sets the sql and args of the query, reusing sql for a known shape
+        """
+
+        # many rows are only generated once, as their rows can only be iterated once
+
+        if isinstance(query, INSERT) and query.VALUES.rows is not None:
+            with self.lock:
+                self.misses += 1
+            query.generate(**kwargs)
+            return
+
+        values = {}
+
+        try:
+            key = (tuple(sorted(kwargs.items())), self.shape(query, values))
+            hash(key)
+        except TypeError:
+            with self.lock:
+                self.misses += 1
+            query.generate(**kwargs)
+            return
+
+        values = list(values.values())
+
+        with self.lock:
+            compiled = self.compiled.get(key)
+            if compiled is not None:
+                self.compiled.move_to_end(key)
+            if compiled is not None and compiled[1] is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if compiled is not None and compiled[1] is not None:
+
+            sql, slots = compiled
+            args = []
+
+            for value in values:
+                value.generate()
+
+            for slot, arg in slots:
+                args.append(values[arg].args[0] if slot else arg)
+
+            query.sql = sql
+            query.args = args
+            return
+
+        if compiled is not None:
+            query.generate(**kwargs)
+            return
+
+        compiled = self.compile(query, values, **kwargs)
+
+        with self.lock:
+            self.compiled[key] = compiled
+            while len(self.compiled) > self.size:
+                self.compiled.popitem(last=False)
@@ -2,6 +2,8 @@
 Base SQL module for all of sqlite SQL
 """
 
+import sqlite3
+
 
 class SQL: # pylint: disable=too-few-public-methods
     """
@@ -14,6 +16,14 @@ class SQL: # pylint: disable=too-few-public-methods
     PLACEHOLDER = "?"
     JSONIFY = "json_extract(%s,'$')"
     PATH = "json_extract(%s,%s)"
+    VERSION = sqlite3.sqlite_version_info
+
+    def str(self, value):
+        """
+        Quotes a string to put in the sql itself
+        """
+
+        return f"{self.STR}{value.replace(self.STR, self.STR * 2)}{self.STR}"
 
     @staticmethod
     def walk(path):
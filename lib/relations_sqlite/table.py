@@ -14,6 +14,7 @@ class TABLE(relations_sqlite.DDL, relations_sql.TABLE):
     """
 
     NAME = relations_sqlite.TABLE_NAME
+    COLUMN_NAME = relations_sqlite.COLUMN_NAME
     COLUMN = relations_sqlite.COLUMN
     INDEX = relations_sqlite.INDEX
     UNIQUE = relations_sqlite.UNIQUE
@@ -22,6 +23,15 @@ class TABLE(relations_sqlite.DDL, relations_sql.TABLE):
 
     INDEXES = False
 
+    STORED = False      # whether extracted columns are STORED instead of VIRTUAL
+    EXTRACTED = False   # whether to index every extracted column
+
+    RENAME_COLUMN = (3, 25, 0)  # first version that can ALTER TABLE RENAME COLUMN
+    DROP_COLUMN = (3, 35, 0)    # first version that can ALTER TABLE DROP COLUMN
+
+    ROWS = 10000    # rows to copy per commit when executing a rebuild
+    ANALYZE = False # whether to ANALYZE a rebuilt table once it's indexed
+
     def name(self, state="migration", prefix='', rename=False):
         """
         Generate a quoted name, with table as the default
@@ -60,12 +70,104 @@ class TABLE(relations_sqlite.DDL, relations_sql.TABLE):
 
         return table.sql
 
-    def modify(self, indent=0, count=0, pad=' ', **kwargs): # pylint: disable=too-many-locals,too-many-branches
+    def extracted(self, state):
+        """
+        Gets the indexes for extracted columns, if indexing them
+        """
+
+        indexes = {}
+
+        if not self.EXTRACTED:
+            return indexes
+
+        for field in state.get("fields", []):
+            if field.get("inject"):
+                continue
+            for extract in sorted(field.get("extract", {})):
+                store = f"{field['store']}__{extract}"
+                indexes.setdefault(store, [store])
+
+        return indexes
+
+    def indexes(self, state):
+        """
+        Gets the index and unique columns by name, with those for extracted columns
+        """
+
+        return {
+            "index": {**self.extracted(state), **state.get("index", {})},
+            "unique": {**state.get("unique", {})}
+        }
+
+    @staticmethod
+    def columns(state, columns):
+        """
+        Keeps extracted columns as columns so only other paths are expressions
+        """
+
+        stores = set()
+
+        for field in state.get("fields", []):
+            if not field.get("inject"):
+                stores.add(field["store"])
+                stores.update(f"{field['store']}__{extract}" for extract in field.get("extract", {}))
+
+        return [
+            relations_sqlite.COLUMN_NAME(column, extracted=True) if column in stores and "__" in column else column
+            for column in columns
+        ]
+
+    def create(self, indent=0, count=0, pad=' ', **kwargs):
         """
-        MODIFY DLL
+        CREATE DLL, with extracted columns STORED and indexed if set, and
+        indexes on paths that aren't extracted columns as expressions
         """
 
-        sql = [f"""ALTER TABLE {self.name(state='definition')} RENAME TO {self.name(state='definition', prefix='_old_', rename=True)}"""]
+        original = self.migration
+
+        migration = {**original, "fields": []}
+
+        for unique, indexes in self.indexes(original).items():
+            migration[unique] = {name: self.columns(original, columns) for name, columns in indexes.items()}
+
+        for field in original["fields"]:
+
+            if field.get("inject") or "extract" not in field:
+                migration["fields"].append(field)
+                continue
+
+            migration["fields"].append({attr: value for attr, value in field.items() if attr != "extract"})
+
+            for extract in sorted(field["extract"]):
+                migration["fields"].append({
+                    "store": f"{field['store']}__{extract}",
+                    "kind": field["extract"][extract],
+                    "stored": field.get("stored", self.STORED)
+                })
+
+        self.migration = migration
+
+        try:
+            super().create(indent=indent, count=count, pad=pad, **kwargs)
+        finally:
+            self.migration = original
+
+    @staticmethod
+    def rename(renames, column):
+        """
+        Gets what a column or path on it is called after fields are renamed
+        """
+
+        for new, old in renames.items():
+            if new != old and (column == old or column.startswith(f"{old}__")):
+                return f"{new}{column[len(old):]}"
+
+        return column
+
+    def target(self): # pylint: disable=too-many-branches
+        """
+        Gets what the table will be after the migration, and the old column for each new one
+        """
 
         migration = {
             "store": self.migration.get("store", self.definition["store"]),
@@ -97,62 +199,479 @@ class TABLE(relations_sqlite.DDL, relations_sql.TABLE):
                 continue
             migration["fields"].append(field)
 
-        table = {
-            "name": self.definition["store"],
-            "schema": self.definition.get("schema")
-        }
+        for unique in ["index", "unique"]:
+
+            for index in self.definition.get(unique, {}):
+                if index in self.migration.get(unique, {}).get("remove", []):
+                    continue
+                columns = [self.rename(renames, column) for column in self.definition[unique][index]]
+                if index in self.migration.get(unique, {}).get("rename", {}):
+                    migration[unique][self.migration[unique]["rename"][index]] = columns
+                else:
+                    migration[unique][index] = columns
 
-        indexes = []
+            migration[unique].update(self.migration.get(unique, {}).get("add", {}))
 
-        for index in self.definition.get("index", {}):
-            indexes.append(self.INDEX(definition={
-                "name": index,
-                "columns": self.definition["index"][index],
-                "table": table
-            }))
-            if index in self.migration.get("index", {}).get("remove", []):
+        return migration, renames
+
+    def alterable(self, migration): # pylint: disable=too-many-return-statements,too-many-branches
+        """
+        Gets the columns to drop, rename, and add in place, or None if the table has to be rebuilt
+        """
+
+        if migration.get("schema") != self.definition.get("schema"):
+            return None
+
+        drops = []
+        renames = []
+        adds = []
+
+        for name in self.migration.get("fields", {}).get("remove", []):
+
+            definition = self.field(name)
+
+            if definition.get("inject"):
                 continue
-            if index in self.migration.get("index", {}).get("rename", {}):
-                migration["index"][self.migration["index"]["rename"][index]] = self.definition["index"][index]
-            else:
-                migration["index"][index] = self.definition["index"][index]
 
-        migration["index"].update(self.migration.get("index", {}).get("add", {}))
+            if definition.get("auto") or self.VERSION < self.DROP_COLUMN:
+                return None
 
-        for index in self.definition.get("unique", {}):
-            indexes.append(self.UNIQUE(definition={
-                "name": index,
-                "columns": self.definition["unique"][index],
-                "table": table
-            }))
-            if index in self.migration.get("unique", {}).get("remove", []):
+            for extract in sorted(definition.get("extract", {})):
+                drops.append(self.COLUMN(definition={"store": f"{definition['store']}__{extract}"}))
+
+            drops.append(self.COLUMN(definition=definition))
+
+        for name, change in self.migration.get("fields", {}).get("change", {}).items():
+
+            definition = self.field(name)
+
+            if definition.get("inject"):
                 continue
-            if index in self.migration.get("unique", {}).get("rename", {}):
-                migration["unique"][self.migration["unique"]["rename"][index]] = self.definition["unique"][index]
-            else:
-                migration["unique"][index] = self.definition["unique"][index]
 
-        migration["unique"].update(self.migration.get("unique", {}).get("add", {}))
+            if set(change) - {"name", "store"}:
+                return None
 
-        current = pad * (count * indent)
-        delimitter = f";\n\n{current}"
+            if change.get("store", definition["store"]) == definition["store"]:
+                continue
+
+            if self.VERSION < self.RENAME_COLUMN:
+                return None
+
+            renames.append(self.COLUMN(migration={"store": change["store"]}, definition=definition))
+
+            for extract in sorted(definition.get("extract", {})):
+                renames.append(self.COLUMN(
+                    migration={"store": f"{change['store']}__{extract}"},
+                    definition={"store": f"{definition['store']}__{extract}"}
+                ))
+
+        for field in self.migration.get("fields", {}).get("add", []):
+
+            if field.get("inject"):
+                continue
+
+            if field.get("auto") or (not field.get("none") and field.get("default") is None):
+                return None
+
+            if field.get("extract") and field.get("stored", self.STORED):
+                return None
+
+            adds.append(self.COLUMN(migration=field, added=True))
+
+            for extract in sorted(field.get("extract", {})):
+                adds.append(self.COLUMN(
+                    migration={"store": f"{field['store']}__{extract}", "kind": field["extract"][extract]},
+                    added=True
+                ))
+
+        return drops + renames + adds
+
+    def alter(self, indent=0, count=0, pad=' ', **kwargs): # pylint: disable=too-many-locals
+        """
+        ALTER DDL in place, returning whether the changes allowed it
+        """
+
+        migration, renames = self.target()
+
+        columns = self.alterable(migration)
+
+        if columns is None:
+            return False
 
-        for index in indexes:
+        moved = migration["store"] != self.definition["store"]
+
+        before = self.indexes(self.definition)
+        after = self.indexes(migration)
+
+        sql = []
+        creates = []
+
+        for unique, INDEX in [("index", self.INDEX), ("unique", self.UNIQUE)]:
+
+            kept = []
+
+            for index, index_columns in before[unique].items():
+                if not moved and after[unique].get(index) == [self.rename(renames, column) for column in index_columns]:
+                    kept.append(index)
+                    continue
+                ddl = INDEX(definition={
+                    "name": index,
+                    "table": {"name": self.definition["store"], "schema": self.definition.get("schema")}
+                })
+                ddl.generate()
+                sql.append(ddl.sql)
+
+            for index in sorted(after[unique]):
+                if index in kept:
+                    continue
+                creates.append(INDEX(migration={
+                    "name": index,
+                    "columns": self.columns(migration, after[unique][index]),
+                    "table": {"name": migration["store"], "schema": migration.get("schema")}
+                }))
+
+        if moved:
+            sql.append(f"ALTER TABLE {self.name(state='definition')} RENAME TO {self.name(rename=True)}")
+
+        for column in columns:
+            if column.migration and column.definition:
+                sql.append(f"ALTER TABLE {self.name()} RENAME {column.name(definition=True)} TO {column.name()}")
+                continue
+            column.generate()
+            sql.append(f"ALTER TABLE {self.name()} {column.sql}")
+
+        for index in creates:
             index.generate()
             sql.append(index.sql)
 
+        current = pad * (count * indent)
+        delimitter = f";\n\n{current}"
+
+        self.sql = f"{delimitter.join(sql)};\n" if sql else ""
+
+        return True
+
+    def modify(self, indent=0, count=0, pad=' ', **kwargs):
+        """
+        MODIFY DLL, in place if possible, else rebuilding
+        """
+
+        if not self.alter(indent=indent, count=count, pad=pad, **kwargs):
+            self.rebuild(indent=indent, count=count, pad=pad, **kwargs)
+
+    def rebuilding(self, indent=0, count=0, pad=' ', **kwargs): # pylint: disable=too-many-locals
+        """
+        Gets the statements that set up a rebuild with a bare shadow table, the query
+        that copies the rows, and the statements that swap it in and index it, so
+        nothing can write to the table until it's whole
+        """
+
+        prepare = [
+            f"""ALTER TABLE {self.name(state='definition')} RENAME TO {self.name(state='definition', prefix='_old_', rename=True)}"""
+        ]
+
+        migration, renames = self.target()
+
+        table = {
+            "name": self.definition["store"],
+            "schema": self.definition.get("schema")
+        }
+
+        for unique, INDEX in [("index", self.INDEX), ("unique", self.UNIQUE)]:
+            for index in self.indexes(self.definition)[unique]:
+                index = INDEX(definition={
+                    "name": index,
+                    "table": table
+                })
+                index.generate()
+                prepare.append(index.sql)
+
+        current = pad * (count * indent)
+
         ddl = self.__class__(migration)
         ddl.generate(indent=indent, count=count, pad=pad, **kwargs)
-        sql.append(ddl.sql[:-2])
+        _, *indexes = ddl.sql[:-2].split(f";\n\n{current}")
+
+        shadow = self.__class__({**migration, "store": f"_new_{migration['store']}"})
+        shadow.generate(indent=indent, count=count, pad=pad, **kwargs)
+        prepare.append(shadow.sql[:-2].split(f";\n\n{current}")[0])
 
         query = self.INSERT(
-            self.NAME(ddl.migration["store"], schema=ddl.migration.get("schema")), COLUMNS=sorted(renames.keys()),
+            self.NAME(f"_new_{migration['store']}", schema=migration.get("schema")), COLUMNS=sorted(renames.keys()),
             SELECT=self.SELECT(FIELDS=renames).FROM(relations_sql.SQL(self.name(state='definition', prefix='_old_')))
         )
 
+        finish = [
+            f"""ALTER TABLE {self.name(state='migration', prefix='_new_')} RENAME TO {self.name(state='migration', rename=True)}"""
+        ]
+
+        finish.extend(indexes)
+        finish.append(f"""DROP TABLE {self.name(state='definition', prefix='_old_')}""")
+
+        if self.ANALYZE:
+            finish.append(f"""ANALYZE {self.name()}""")
+
+        return prepare, query, finish
+
+    def rebuild(self, indent=0, count=0, pad=' ', **kwargs):
+        """
+        Rebuilds the table, copying the rows to a new one
+        """
+
+        prepare, query, finish = self.rebuilding(indent=indent, count=count, pad=pad, **kwargs)
+
+        current = pad * (count * indent)
+        delimitter = f";\n\n{current}"
+
         query.generate(indent, count, pad, **kwargs)
-        sql.append(query.sql)
 
-        sql.append(f"""DROP TABLE {self.name(state='definition', prefix='_old_')}""")
+        self.sql = f"{delimitter.join(prepare + [query.sql] + finish)};\n"
+
+    @staticmethod
+    def transact(connection, statements):
+        """
+        Executes statements all together or not at all
+        """
+
+        cursor = connection.cursor()
+
+        try:
+            cursor.execute("BEGIN")
+            for statement in statements:
+                cursor.execute(statement)
+            connection.commit()
+        except BaseException:
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    def exists(self, connection, prefix=''):
+        """
+        Whether the definition table, with prefix, is there
+        """
+
+        schema = self.definition.get("schema")
+        master = self.NAME("sqlite_master", schema=schema)
+        master.generate()
+
+        cursor = connection.cursor()
+        cursor.row_factory = None
+
+        cursor.execute(f"SELECT COUNT(*) FROM {master.sql} WHERE type='table' AND name=?", [prefix + self.definition["store"]])
+        found = cursor.fetchone()[0]
+
+        cursor.close()
+
+        return bool(found)
+
+    @staticmethod
+    def copying(migration, renames):
+        """
+        Gets the old column for each new one to copy, with the rowid if it isn't one of them
+        """
+
+        fields = dict(renames)
+
+        if not any(field.get("auto") for field in migration["fields"]):
+            fields["rowid"] = "rowid"
+
+        return fields
+
+    def copy(self, connection, rows=None, progress=None): # pylint: disable=too-many-locals
+        """
+        Copies rows from the old table to the shadow a range of rowids at a time,
+        committing after each, starting after the last rowid already copied, which
+        only this writes to
+        """
+
+        migration, renames = self.target()
+
+        fields = self.copying(migration, renames)
+
+        old = self.name(state='definition', prefix='_old_')
+        new = self.name(state='migration', prefix='_new_')
+
+        cursor = connection.cursor()
+        cursor.row_factory = None
+
+        total = cursor.execute(f"SELECT COUNT(*) FROM {old}").fetchone()[0]
+        done = cursor.execute(f"SELECT COUNT(*) FROM {new}").fetchone()[0]
+
+        while True:
+
+            last = cursor.execute(f"SELECT MAX(rowid) FROM {new}").fetchone()[0]
+
+            select = self.SELECT(FIELDS=fields).FROM(relations_sql.SQL(old)).ORDER_BY("rowid").LIMIT(rows or self.ROWS)
+
+            if last is not None:
+                select.WHERE(rowid__gt=last)
+
+            query = self.INSERT(
+                self.NAME(f"_new_{migration['store']}", schema=migration.get("schema")),
+                COLUMNS=sorted(fields.keys()), SELECT=select
+            )
+            query.generate()
+
+            cursor.execute(query.sql, query.args)
+            copied = cursor.rowcount
+            connection.commit()
+
+            if copied < 1:
+                break
+
+            done += copied
+
+            if progress is not None:
+                progress(done, total)
+
+        cursor.close()
+
+    def mirroring(self): # pylint: disable=too-many-locals
+        """
+        Gets the statements that set up a bare shadow table with triggers mirroring
+        changes to it, and the statements that swap it in and index it
+        """
+
+        if self.migration.get("schema", self.definition.get("schema")) != self.definition.get("schema"):
+            raise relations_sql.SQLError(self, "can't rebuild online across schemas")
+
+        for field in self.migration.get("fields", {}).get("add", []):
+            if not field.get("inject") and not field.get("auto") and not field.get("none") and field.get("default") is None:
+                raise relations_sql.SQLError(self, f"can't rebuild online adding {field['name']} NOT NULL without a default")
+
+        migration, renames = self.target()
+        fields = self.copying(migration, renames)
+
+        ddl = self.__class__(migration)
+        ddl.generate()
+        _, *indexes = ddl.sql[:-2].split(";\n\n")
+
+        shadow = self.__class__({**migration, "store": f"_new_{self.definition['store']}"})
+        shadow.generate()
+
+        prepare = [shadow.sql[:-2].split(";\n\n")[0]]
+
+        table = self.quote(self.definition["store"])
+        new = self.quote(f"_new_{self.definition['store']}")
+        columns = ",".join(self.quote(column) for column in sorted(fields))
+
+        values = ",".join(f"NEW.{self.quote(fields[column])}" for column in sorted(fields))
+
+        mirror = {
+            "insert": f"INSERT INTO {new} ({columns}) VALUES ({values});",
+            "update": f"DELETE FROM {new} WHERE rowid=OLD.rowid; INSERT INTO {new} ({columns}) VALUES ({values});",
+            "delete": f"DELETE FROM {new} WHERE rowid=OLD.rowid;"
+        }
+
+        for action in ["insert", "update", "delete"]:
+            trigger = self.NAME(f"_new_{self.definition['store']}_{action}", schema=self.definition.get("schema"))
+            trigger.generate()
+            prepare.append(f"CREATE TRIGGER {trigger.sql} AFTER {action.upper()} ON {table} BEGIN {mirror[action]} END")
+
+        finish = [
+            f"""DROP TABLE {self.name(state='definition')}""",
+            f"""ALTER TABLE {self.name(state='definition', prefix='_new_')} RENAME TO {self.name(rename=True)}"""
+        ]
+
+        finish.extend(indexes)
+
+        if self.ANALYZE:
+            finish.append(f"""ANALYZE {self.name()}""")
+
+        return prepare, finish
+
+    def backfill(self, connection, rows=None, progress=None): # pylint: disable=too-many-locals
+        """
+        Copies rows from the table to the shadow a range of rowids at a time,
+        committing after each, skipping only those the triggers already mirrored
+        """
+
+        migration, renames = self.target()
+        fields = self.copying(migration, renames)
+
+        table = self.name(state='definition')
+        mirrored = relations_sql.SQL(f"rowid NOT IN (SELECT rowid FROM {self.name(state='definition', prefix='_new_')})")
+
+        cursor = connection.cursor()
+        cursor.row_factory = None
+
+        total = cursor.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        done = 0
+        last = None
+
+        while True:
+
+            where = "" if last is None else "WHERE rowid>? "
+            args = ([] if last is None else [last]) + [rows or self.ROWS]
+
+            bound, count = cursor.execute(
+                f"SELECT MAX(rowid),COUNT(*) FROM (SELECT rowid FROM {table} {where}ORDER BY rowid LIMIT ?)", args
+            ).fetchone()
+
+            if not count:
+                break
+
+            select = self.SELECT(FIELDS=fields).FROM(relations_sql.SQL(table)).WHERE(mirrored, rowid__lte=bound)
+
+            if last is not None:
+                select.WHERE(rowid__gt=last)
+
+            query = self.INSERT(
+                self.NAME(f"_new_{self.definition['store']}", schema=self.definition.get("schema")),
+                COLUMNS=sorted(fields.keys()), SELECT=select
+            )
+            query.generate()
+
+            cursor.execute(query.sql, query.args)
+            connection.commit()
+
+            done += count
+            last = bound
+
+            if progress is not None:
+                progress(done, total)
+
+        cursor.close()
+
+    def online(self, connection, rows=None, progress=None):
+        """
+        Rebuilds while the table stays in use, mirroring changes to a shadow table
+        with triggers, back filling it in chunks, then swapping it in and indexing it
+        """
+
+        prepare, finish = self.mirroring()
+
+        if not self.exists(connection, prefix='_new_'):
+            self.transact(connection, prepare)
+
+        self.backfill(connection, rows=rows, progress=progress)
+
+        self.transact(connection, finish)
+
+    def execute(self, connection, rows=None, progress=None, online=False):
+        """
+        Runs MODIFY DDL on a connection, in place if possible, else rebuilding,
+        copying rows in chunks and picking back up if the rebuild was cut short,
+        online with a shadow table if set
+        """
+
+        self.args = []
+
+        if self.alter():
+            if self.sql:
+                self.transact(connection, [statement for statement in self.sql.split(";\n") if statement.strip()])
+            return
+
+        if online:
+            self.online(connection, rows=rows, progress=progress)
+            return
+
+        prepare, _, finish = self.rebuilding()
+
+        if not self.exists(connection, prefix='_old_'):
+            self.transact(connection, prepare)
+
+        self.copy(connection, rows=rows, progress=progress)
 
-        self.sql = f"{delimitter.join(sql)};\n"
+        self.transact(connection, finish)
@@ -0,0 +1,217 @@
+"""
+Module for funneling Relations sqlite writes through one connection
+"""
+
+import queue
+import asyncio
+import threading
+import concurrent.futures
+
+import relations_sqlite
+
+
+class WRITER: # pylint: disable=too-many-instance-attributes
+    """
+    One thread and connection all writes go through, committing those that arrive together at once
+    """
+
+    POOL = relations_sqlite.POOL
+
+    WINDOW = 0.002  # seconds to wait for more writes to commit together
+    BATCH = 1000    # most writes to commit together
+
+    STOP = object() # tells the thread to finish up
+
+    window = None   # seconds to wait for more writes to commit together
+    batch = None    # most writes to commit together
+    pool = None     # POOL the one connection comes from
+    owned = None    # whether the pool was made here, and so closed here
+    closed = None   # whether writes are no longer taken
+    failure = None  # what stopped the thread taking writes, if anything
+
+    writes = None   # writes run
+    commits = None  # transactions committed
+
+    def __init__(self, database=None, window=None, batch=None, pool=None, **kwargs):
+
+        self.window = self.WINDOW if window is None else window
+        self.batch = batch or self.BATCH
+
+        self.owned = pool is None
+        self.pool = self.POOL(database, size=1, **kwargs) if pool is None else pool
+
+        self.closed = False
+        self.writes = 0
+        self.commits = 0
+
+        self.lock = threading.Lock()
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self.loop, name="relations_sqlite.WRITER", daemon=True)
+        self.thread.start()
+
+    def submit(self, query, **kwargs):
+        """
+        Generates a write and queues it, returning a future for its result
+        """
+
+        self.pool.generate(query, **kwargs)
+
+        future = concurrent.futures.Future()
+
+        with self.lock:
+            if self.closed:
+                raise RuntimeError("WRITER is closed") from self.failure
+            self.queue.put((query, future))
+
+        return future
+
+    def execute(self, query, **kwargs):
+        """
+        Runs a write, waiting for it to be committed
+        """
+
+        return self.submit(query, **kwargs).result()
+
+    async def write(self, query, **kwargs):
+        """
+        Runs a write, awaiting it being committed
+        """
+
+        return await asyncio.wrap_future(self.submit(query, **kwargs))
+
+    def gather(self, first):
+        """
+        Gets writes that arrive within the window of the first, up to the batch
+        """
+
+        writes = [first]
+        stop = False
+
+        while len(writes) < self.batch:
+
+            try:
+                write = self.queue.get(timeout=self.window) if self.window else self.queue.get_nowait()
+            except queue.Empty:
+                break
+
+            if write is self.STOP:
+                stop = True
+                break
+
+            writes.append(write)
+
+        return writes, stop
+
+    def commit(self, connection, writes):
+        """
+        Runs writes in one transaction, each in a savepoint so one failing doesn't undo the rest
+        """
+
+        results = []
+
+        cursor = connection.cursor()
+
+        try:
+
+            cursor.execute("BEGIN IMMEDIATE")
+
+            for query, future in writes:
+
+                if not future.set_running_or_notify_cancel():
+                    results.append(None)
+                    continue
+
+                cursor.execute("SAVEPOINT `write`")
+
+                try:
+                    results.append((True, self.pool.run(connection, query, commit=False)))
+                except Exception as exception: # pylint: disable=broad-except
+                    cursor.execute("ROLLBACK TO `write`")
+                    results.append((False, exception))
+
+                cursor.execute("RELEASE `write`")
+
+            connection.commit()
+
+        except BaseException as exception: # pylint: disable=broad-except
+            if connection.in_transaction:
+                connection.rollback()
+            for query, future in writes:
+                if not future.done():
+                    future.set_exception(exception)
+            return
+
+        finally:
+            cursor.close()
+
+        self.writes += len([result for result in results if result is not None])
+        self.commits += 1
+
+        for (query, future), result in zip(writes, results):
+            if result is None:
+                continue
+            if result[0]:
+                future.set_result(result[1])
+            else:
+                future.set_exception(result[1])
+
+    def fail(self, exception):
+        """
+        Stops taking writes, failing those already queued with why
+        """
+
+        with self.lock:
+            self.closed = True
+            self.failure = exception
+
+        while True:
+
+            try:
+                write = self.queue.get_nowait()
+            except queue.Empty:
+                break
+
+            if write is not self.STOP and not write[1].done():
+                write[1].set_exception(exception)
+
+    def loop(self):
+        """
+        Takes writes off the queue and commits them together until told to stop
+        """
+
+        try:
+
+            with self.pool.connection() as connection:
+
+                stop = False
+
+                while not stop:
+
+                    first = self.queue.get()
+
+                    if first is self.STOP:
+                        break
+
+                    writes, stop = self.gather(first)
+
+                    self.commit(connection, writes)
+
+        except BaseException as exception: # pylint: disable=broad-except
+            self.fail(exception)
+
+    def close(self):
+        """
+        Finishes the writes already queued, then stops, closing the pool if made here
+        """
+
+        with self.lock:
+            stopping = not self.closed
+            if stopping:
+                self.closed = True
+                self.queue.put(self.STOP)
+
+        if stopping:
+            self.thread.join()
+
+        if self.owned:
+            self.pool.close()
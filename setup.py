@@ -20,7 +20,12 @@ setup(
         'relations_sqlite.ddl',
         'relations_sqlite.column',
         'relations_sqlite.index',
-        'relations_sqlite.table'
+        'relations_sqlite.table',
+        'relations_sqlite.plan',
+        'relations_sqlite.pool',
+        'relations_sqlite.aio',
+        'relations_sqlite.writer',
+        'relations_sqlite.loader'
     ],
     install_requires=[
         'relations-sql>=0.6.7'
@@ -0,0 +1,180 @@
+import unittest
+import unittest.mock
+
+import os
+import time
+import asyncio
+import tempfile
+
+import relations
+from relations_sqlite import *
+
+
+class Meta(relations.Model):
+    id = int, {"auto": True}
+    name = str
+
+
+SLOW = relations_sql.SQL("WITH RECURSIVE `count`(`x`) AS (SELECT 1 UNION ALL SELECT `x`+1 FROM `count`) SELECT COUNT(*) FROM (SELECT `x` FROM `count` LIMIT 1000000000)")
+
+
+class TestAIO(unittest.IsolatedAsyncioTestCase):
+
+    maxDiff = None
+
+    def setUp(self):
+
+        self.directory = tempfile.TemporaryDirectory()
+        self.database = os.path.join(self.directory.name, "main.db")
+
+        self.aio = AIO(self.database, workers=2, batch=100)
+
+    def tearDown(self):
+
+        self.aio.close()
+        self.directory.cleanup()
+
+    def test___init__(self):
+
+        self.assertEqual(self.aio.workers, 2)
+        self.assertEqual(self.aio.batch, 100)
+        self.assertEqual(self.aio.pool.size, 2)
+        self.assertTrue(self.aio.owned)
+
+        pool = POOL(self.database, size=3)
+        aio = AIO(pool=pool)
+
+        self.assertEqual((aio.workers, aio.batch, aio.owned), (3, 100, False))
+        self.assertIs(aio.pool, pool)
+
+        aio.close()
+        pool.close()
+
+        self.assertRaisesRegex(ValueError, "AIO needs a POOL with a size", AIO, pool=POOL(self.database))
+
+    async def test_acquire(self):
+
+        connection, start = await self.aio.acquire()
+        other, _ = await self.aio.acquire()
+
+        self.assertIsNot(connection, other)
+
+        waiting = asyncio.ensure_future(self.aio.acquire())
+        await asyncio.sleep(0.01)
+        self.assertFalse(waiting.done())
+
+        self.aio.release(connection, start)
+
+        again, start = await waiting
+        self.assertIs(again, connection)
+
+        self.aio.release(again, start)
+        self.aio.release(other, start)
+
+        self.assertEqual(self.aio.pool.busy, 0)
+
+        held = [self.aio.pool.acquire(), self.aio.pool.acquire()]
+
+        waiting = asyncio.ensure_future(self.aio.acquire())
+        await asyncio.sleep(0.01)
+
+        waiting.cancel()
+        await asyncio.sleep(0.01)
+        waiting.cancel()
+        await asyncio.sleep(0.01)
+
+        self.assertFalse(waiting.done())
+
+        self.aio.pool.release(held[0], start)
+
+        with self.assertRaises(asyncio.CancelledError):
+            await waiting
+
+        self.aio.pool.release(held[1], start)
+
+        self.assertEqual(self.aio.pool.busy, 0)
+        self.assertEqual(self.aio.pool.idle.qsize(), 2)
+        self.assertFalse(self.aio.semaphore().locked())
+
+    async def test_call(self):
+
+        connection, start = await self.aio.acquire()
+
+        finished = []
+
+        def stubborn():
+            time.sleep(0.1)
+            finished.append(True)
+
+        task = asyncio.ensure_future(self.aio.call(connection, stubborn))
+        await asyncio.sleep(0.01)
+
+        task.cancel()
+        await asyncio.sleep(0.01)
+        task.cancel()
+
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+
+        self.assertEqual(finished, [True])
+
+        self.aio.release(connection, start)
+
+        self.assertEqual(self.aio.pool.busy, 0)
+
+    async def test_execute(self):
+
+        await self.aio.execute(TABLE(migration=Meta.thy().define()))
+
+        self.assertEqual(await self.aio.execute(INSERT("meta").many([{"name": f"n{row}"} for row in range(3)])), 3)
+        self.assertEqual(await self.aio.execute(UPDATE("meta").SET(name="jane").WHERE(id=1)), 1)
+        self.assertEqual(await self.aio.execute(SELECT("name").FROM("meta").ORDER_BY("id")), [("jane",), ("n1",), ("n2",)])
+        self.assertEqual(await self.aio.execute(DELETE("meta")), 3)
+
+        slow = asyncio.ensure_future(self.aio.execute(SLOW))
+
+        start = time.perf_counter()
+        self.assertEqual(await self.aio.execute(SELECT("name").FROM("meta")), [])
+        self.assertLess(time.perf_counter() - start, 1)
+
+        slow.cancel()
+
+        with self.assertRaises(asyncio.CancelledError):
+            await slow
+
+        self.assertLess(time.perf_counter() - start, 5)
+        self.assertEqual(self.aio.pool.busy, 0)
+
+    async def test_batches(self):
+
+        await self.aio.execute(TABLE(migration=Meta.thy().define()))
+        await self.aio.execute(INSERT("meta").many([{"name": f"n{row}"} for row in range(250)]))
+
+        sizes = []
+
+        async for rows in self.aio.batches(SELECT("name").FROM("meta")):
+            sizes.append(len(rows))
+
+        self.assertEqual(sizes, [100, 100, 50])
+
+        batches = self.aio.batches(SELECT("name").FROM("meta").ORDER_BY("id"), size=2)
+
+        self.assertEqual(await batches.__anext__(), [("n0",), ("n1",)])
+        self.assertEqual(self.aio.pool.busy, 1)
+
+        await batches.aclose()
+
+        self.assertEqual(self.aio.pool.busy, 0)
+
+        async def each():
+            async for _ in self.aio.batches(SLOW):
+                pass
+
+        task = asyncio.ensure_future(each())
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+
+        self.assertEqual(self.aio.pool.busy, 0)
@@ -4,6 +4,49 @@ import unittest.mock
 from relations_sqlite import *
 
 
+class TestWITH(unittest.TestCase):
+
+    maxDiff = None
+
+    def test_add(self):
+
+        clause = WITH()
+        self.assertFalse(clause)
+        self.assertFalse(clause.recursive)
+
+        clause(RECURSIVE=True, people=SELECT("*").FROM("stuff"))
+        self.assertTrue(clause.recursive)
+        self.assertEqual(len(clause.expressions), 1)
+
+    def test_generate(self):
+
+        clause = WITH(people=SELECT("*").FROM("stuff").WHERE(things=1), places=relations_sql.SQL("test", ["unit"]))
+
+        clause.generate()
+        self.assertEqual(clause.sql, """WITH `people` AS (SELECT * FROM `stuff` WHERE `things`=?),`places` AS (test)""")
+        self.assertEqual(clause.args, [1, "unit"])
+
+        clause(RECURSIVE=True)
+        clause.generate()
+        self.assertEqual(clause.sql, """WITH RECURSIVE `people` AS (SELECT * FROM `stuff` WHERE `things`=?),`places` AS (test)""")
+        self.assertEqual(clause.NAME, "WITH")
+
+        clause.generate(indent=2)
+        self.assertEqual(clause.sql, """WITH RECURSIVE
+  `people` AS (
+    SELECT
+      *
+    FROM
+      `stuff`
+    WHERE
+      `things`=?
+  ),
+  `places` AS (
+    test
+  )""")
+        self.assertNotIn("NAME", clause.__dict__)
+
+
 class TestOPTIONS(unittest.TestCase):
 
     maxDiff = None
@@ -67,6 +110,34 @@ class TestFIELDS(unittest.TestCase):
       `things` AS `stuff`""")
 
 
+class TestRETURNING(unittest.TestCase):
+
+    maxDiff = None
+
+    def test_generate(self):
+
+        clause = RETURNING()
+
+        self.assertFalse(clause)
+
+        clause.generate()
+        self.assertEqual(clause.sql, "")
+
+        clause("id", stuff="things__a")
+        clause.generate()
+        self.assertEqual(clause.sql, """RETURNING `id`,json_extract(`things`,'$.a') AS `stuff`""")
+        self.assertEqual(clause.args, [])
+
+        clause.generate(indent=2)
+        self.assertEqual(clause.sql, """RETURNING
+  `id`,
+  json_extract(`things`,'$.a') AS `stuff`""")
+
+        with unittest.mock.patch.object(RETURNING, "VERSION", (3, 34, 1)):
+            self.assertRaisesRegex(relations_sql.SQLError, "RETURNING needs sqlite 3.35.0 or later", clause.generate)
+            RETURNING().generate()
+
+
 class TestFROM(unittest.TestCase):
 
     maxDiff = None
@@ -129,6 +200,75 @@ class TestWHERE(unittest.TestCase):
       `stuff`=?""")
 
 
+class TestON(unittest.TestCase):
+
+    maxDiff = None
+
+    def test_generate(self):
+
+        clause = ON()
+        self.assertFalse(clause)
+
+        clause(**{"stuff.people_id": COLUMN_NAME("people.id"), "stuff.things__gt": 1})
+        clause.generate()
+        self.assertEqual(clause.sql, """ON `stuff`.`people_id`=(`people`.`id`) AND `stuff`.`things`>?""")
+        self.assertEqual(clause.args, [1])
+
+
+class TestJOIN(unittest.TestCase):
+
+    maxDiff = None
+
+    def test_add(self):
+
+        clause = JOIN()
+        self.assertFalse(clause)
+
+        clause("stuff")
+        clause({"t": "things"}, LEFT=True, **{"t.id": COLUMN_NAME("stuff.things_id")})
+        clause({"s": SELECT("id").FROM("stuff")}, relations_sql.SQL("1"))
+
+        self.assertEqual(clause.joins, ["JOIN", "LEFT JOIN", "JOIN"])
+        self.assertEqual([len(criteria) for criteria in clause.criteria], [0, 1, 1])
+
+        self.assertIsInstance(clause.expressions[0], TABLE_NAME)
+        self.assertIsInstance(clause.expressions[1], AS)
+
+    def test_generate(self):
+
+        clause = JOIN({"s": "stuff"}, **{"s.people_id": COLUMN_NAME("people.id")})
+        clause({"t": SELECT("id").FROM("things").WHERE(id__gt=1)}, LEFT=True, **{"t.id": COLUMN_NAME("s.things_id"), "t.id__lt": 5})
+        clause("places")
+
+        clause.generate()
+        self.assertEqual(clause.sql,
+            """JOIN `stuff` AS `s` ON `s`.`people_id`=(`people`.`id`) """
+            """LEFT JOIN (SELECT `id` FROM `things` WHERE `id`>?) AS `t` ON `t`.`id`=(`s`.`things_id`) AND `t`.`id`<? """
+            """JOIN `places`"""
+        )
+        self.assertEqual(clause.args, [1, 5])
+
+        clause = JOIN({"s": "stuff"}, LEFT=True, **{"s.people_id": COLUMN_NAME("people.id"), "s.things": 1})
+
+        clause.generate(indent=2)
+        self.assertEqual(clause.sql, """LEFT JOIN
+  `stuff` AS `s`
+ON
+  `s`.`people_id`=(
+    `people`.`id`
+  ) AND
+  `s`.`things`=?""")
+
+        clause.generate(indent=2, count=1)
+        self.assertEqual(clause.sql, """LEFT JOIN
+    `stuff` AS `s`
+  ON
+    `s`.`people_id`=(
+      `people`.`id`
+    ) AND
+    `s`.`things`=?""")
+
+
 class TestGROUP_BY(unittest.TestCase):
 
     maxDiff = None
@@ -194,6 +334,45 @@ class TestHAVING(unittest.TestCase):
       `stuff`=?""")
 
 
+class TestUNION(unittest.TestCase):
+
+    maxDiff = None
+
+    def test_add(self):
+
+        clause = UNION()
+        self.assertFalse(clause)
+
+        clause(SELECT("stuff").FROM("people"))
+        clause(SELECT("things").FROM("people"), ALL=True)
+        self.assertEqual(clause.compounds, ["UNION", "UNION ALL"])
+
+        self.assertRaisesRegex(relations_sql.SQLError, "can only UNION a SELECT", clause, "people")
+
+    def test_generate(self):
+
+        clause = UNION(SELECT("stuff").FROM("people").WHERE(stuff=1))
+        clause(SELECT("things").FROM("people"), ALL=True)
+
+        clause.generate()
+        self.assertEqual(clause.sql, """UNION SELECT `stuff` FROM `people` WHERE `stuff`=? UNION ALL SELECT `things` FROM `people`""")
+        self.assertEqual(clause.args, [1])
+
+        clause.generate(indent=2, count=1)
+        self.assertEqual(clause.sql, """UNION
+  SELECT
+    `stuff`
+  FROM
+    `people`
+  WHERE
+    `stuff`=?
+  UNION ALL
+  SELECT
+    `things`
+  FROM
+    `people`""")
+
+
 class TestORDER_BY(unittest.TestCase):
 
     maxDiff = None
@@ -284,6 +463,68 @@ class TestSET(unittest.TestCase):
       `foe`=?""")
 
 
+class TestON_CONFLICT(unittest.TestCase):
+
+    maxDiff = None
+
+    def test___init__(self):
+
+        clause = ON_CONFLICT()
+        self.assertFalse(clause)
+
+        clause = ON_CONFLICT(["stuff", "things"])
+        self.assertTrue(clause)
+        self.assertEqual(len(clause.expressions), 2)
+        self.assertFalse(clause.update)
+
+    def test_add(self):
+
+        clause = ON_CONFLICT()
+
+        clause()
+        self.assertTrue(clause)
+
+        clause("stuff", EXCLUDED=["things"], fee="fie")
+        clause.generate()
+        self.assertEqual(clause.sql, """ON CONFLICT (`stuff`) DO UPDATE SET `things`=`excluded`.`things`,`fee`=?""")
+        self.assertEqual(clause.args, ["fie"])
+
+        clause = ON_CONFLICT()
+
+        clause({"fee": "fie"})
+        clause.generate()
+        self.assertEqual(clause.sql, """ON CONFLICT DO UPDATE SET `fee`=?""")
+
+    def test_generate(self):
+
+        clause = ON_CONFLICT()
+
+        clause.generate()
+        self.assertEqual(clause.sql, """ON CONFLICT DO NOTHING""")
+        self.assertEqual(clause.args, [])
+
+        clause("stuff", "things__a")
+        clause.generate()
+        self.assertEqual(clause.sql, """ON CONFLICT (`stuff`,json_extract(`things`,'$.a')) DO NOTHING""")
+
+        clause(fee="fie", foe=EXCLUDED("foe"))
+        clause.generate()
+        self.assertEqual(clause.sql, """ON CONFLICT (`stuff`,json_extract(`things`,'$.a')) DO UPDATE SET `fee`=?,`foe`=`excluded`.`foe`""")
+        self.assertEqual(clause.args, ["fie"])
+
+        clause.generate(indent=2)
+        self.assertEqual(clause.sql, """ON CONFLICT (`stuff`,json_extract(`things`,'$.a'))
+  DO UPDATE SET
+    `fee`=?,
+    `foe`=`excluded`.`foe`""")
+
+        clause.generate(indent=2, count=1)
+        self.assertEqual(clause.sql, """ON CONFLICT (`stuff`,json_extract(`things`,'$.a'))
+    DO UPDATE SET
+      `fee`=?,
+      `foe`=`excluded`.`foe`""")
+
+
 class TestVALUES(unittest.TestCase):
 
     maxDiff = None
@@ -330,3 +571,62 @@ class TestVALUES(unittest.TestCase):
         ?,
         ?
       )""")
+
+    def test_many(self):
+
+        clause = VALUES().many(iter([{"fee": "fie", "foe": {"a": 1}}, {"fee": "fum", "foe": [2]}]))
+
+        self.assertTrue(clause)
+
+        clause.generate()
+        self.assertEqual(clause.sql, """VALUES (?,json_extract(?,'$'))""")
+        self.assertEqual(clause.columns, ["fee", "foe"])
+        self.assertEqual(list(clause.args), [("fie", '{"a": 1}'), ("fum", '[2]')])
+
+        clause = VALUES(COLUMNS=["fee", "foe"]).many([["fie", "fum"], ["foe"]])
+
+        clause.generate(indent=2)
+        self.assertEqual(clause.sql, """VALUES
+  (
+    ?,
+    ?
+  )""")
+
+        args = clause.args
+        self.assertEqual(next(args), ("fie", "fum"))
+        self.assertRaisesRegex(relations_sql.SQLError, "wrong values", next, args)
+
+        clause = VALUES().many([{"fee": "fie"}, {"foe": "fum"}])
+
+        clause.generate()
+        self.assertRaisesRegex(relations_sql.SQLError, "missing column fee", list, clause.args)
+
+        clause = VALUES(COLUMNS=["fee", "foe"]).many([])
+
+        clause.generate()
+        self.assertEqual(clause.sql, """VALUES (?,?)""")
+        self.assertEqual(list(clause.args), [])
+
+        clause = VALUES().many([])
+
+        self.assertRaisesRegex(relations_sql.SQLError, "need rows or columns for many", clause.generate)
+
+        clause = VALUES().many(iter([{"fee": "fie", "foe": None}, {"fee": "fum", "foe": {"a": 1}}]))
+
+        clause.generate()
+        self.assertEqual(clause.sql, """VALUES (?,?)""")
+        self.assertRaisesRegex(relations_sql.SQLError, "foe is JSON in .* but not in the first row, so set it in JSON", list, clause.args)
+
+        clause = VALUES().many(iter([
+            {"fee": "fie", "foe": None}, {"fee": "fum", "foe": {"a": 1}}, {"fee": "fo", "foe": "abc"}
+        ]), JSON=["foe"])
+
+        clause.generate()
+        self.assertEqual(clause.sql, """VALUES (?,json_extract(?,'$'))""")
+        self.assertEqual(list(clause.args), [("fie", 'null'), ("fum", '{"a": 1}'), ("fo", '"abc"')])
+
+        clause = VALUES().many(iter([{"fee": "fie", "foe": [1]}, {"fee": "fum", "foe": "abc"}]))
+
+        clause.generate()
+        self.assertEqual(clause.sql, """VALUES (?,json_extract(?,'$'))""")
+        self.assertEqual(list(clause.args), [("fie", '[1]'), ("fum", '"abc"')])
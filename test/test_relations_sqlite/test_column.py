@@ -65,6 +65,12 @@ class TestCOLUMN(unittest.TestCase):
         self.assertEqual(ddl.sql, """`data__a__0___1____2_____3` TEXT AS (json_extract(`data`,'$.a[0][-1]."2"."-3"'))""")
         self.assertEqual(ddl.args, [])
 
+        ddl = COLUMN(store="data__a", kind="int", stored=True)
+
+        ddl.generate()
+        self.assertEqual(ddl.sql, """`data__a` INTEGER AS (json_extract(`data`,'$.a')) STORED""")
+        self.assertEqual(ddl.args, [])
+
         field = relations.Field(bool, name="flag")
         ddl = COLUMN(field.define(), added=True)
 
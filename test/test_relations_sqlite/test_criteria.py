@@ -1,6 +1,8 @@
 import unittest
 import unittest.mock
 
+import sqlite3
+
 from relations_sqlite import *
 
 
@@ -74,6 +76,14 @@ class TestHAS(unittest.TestCase):
         self.assertEqual(criteria.sql, """(NOT (SELECT COUNT(*) FROM json_each(json_extract(?,'$')) as l LEFT JOIN json_each(`totes`) as r ON l.value=r.value WHERE r.value IS NULL))""")
         self.assertEqual(criteria.args, ['["mai", "goats"]'])
 
+        with unittest.mock.patch.object(HAS, "CONTAINS", CONTAINS_EXISTS):
+
+            criteria = HAS("totes", ["mai", "goats"])
+
+            criteria.generate()
+            self.assertEqual(criteria.sql, """(NOT EXISTS (SELECT 1 FROM json_each(json_extract(?,'$')) as l WHERE NOT EXISTS (SELECT 1 FROM json_each(`totes`) as r WHERE r.value=l.value)))""")
+            self.assertEqual(criteria.args, ['["mai", "goats"]'])
+
 
 class TestANY(unittest.TestCase):
 
@@ -84,8 +94,14 @@ class TestANY(unittest.TestCase):
         criteria = ANY("totes", ["mai", "goats"])
 
         criteria.generate()
-        self.assertEqual(criteria.sql, """((NOT (SELECT COUNT(*) FROM json_each(json_extract(?,'$')) as l LEFT JOIN json_each(`totes`) as r ON l.value=r.value WHERE r.value IS NULL)) OR (NOT (SELECT COUNT(*) FROM json_each(json_extract(?,'$')) as l LEFT JOIN json_each(`totes`) as r ON l.value=r.value WHERE r.value IS NULL)))""")
-        self.assertEqual(criteria.args, ['["mai"]', '["goats"]'])
+        self.assertEqual(criteria.sql, """EXISTS (SELECT 1 FROM json_each(`totes`) as l JOIN json_each(json_extract(?,'$')) as r ON l.value=r.value)""")
+        self.assertEqual(criteria.args, ['["mai", "goats"]'])
+
+        criteria = ANY(totes__a=["mai", "goats"])
+
+        criteria.generate()
+        self.assertEqual(criteria.sql, """EXISTS (SELECT 1 FROM json_each(json_extract(`totes`,'$.a')) as l JOIN json_each(json_extract(?,'$')) as r ON l.value=r.value)""")
+        self.assertEqual(criteria.args, ['["mai", "goats"]'])
 
 
 class TestALL(unittest.TestCase):
@@ -95,8 +111,42 @@ class TestALL(unittest.TestCase):
         criteria = ALL("totes", ["mai", "goats"])
 
         criteria.generate()
-        self.assertEqual(criteria.sql, """((NOT (SELECT COUNT(*) FROM json_each(json_extract(?,'$')) as l LEFT JOIN json_each(`totes`) as r ON l.value=r.value WHERE r.value IS NULL)) AND json_array_length(`totes`)=json_array_length(json_extract(?,'$')))""")
-        self.assertEqual(criteria.args, ['["mai", "goats"]', '["mai", "goats"]'])
+        self.assertEqual(criteria.sql, """(SELECT CASE WHEN j IS NULL THEN NULL WHEN COUNT(t)=0 THEN '[]' ELSE json_group_array(v) END FROM (SELECT j,CASE WHEN type='real' AND value=CAST(value AS INTEGER) THEN 'integer' ELSE type END AS t,CASE WHEN type='real' AND value=CAST(value AS INTEGER) THEN CAST(value AS INTEGER) ELSE value END AS v FROM (SELECT `totes` AS j) LEFT JOIN json_each(j) ORDER BY t,v))=(SELECT CASE WHEN j IS NULL THEN NULL WHEN COUNT(t)=0 THEN '[]' ELSE json_group_array(v) END FROM (SELECT j,CASE WHEN type='real' AND value=CAST(value AS INTEGER) THEN 'integer' ELSE type END AS t,CASE WHEN type='real' AND value=CAST(value AS INTEGER) THEN CAST(value AS INTEGER) ELSE value END AS v FROM (SELECT json_extract(?,'$') AS j) LEFT JOIN json_each(j) ORDER BY t,v))""")
+        self.assertEqual(criteria.args, ['["mai", "goats"]'])
+
+        criteria = ALL(totes__a=["mai", "goats"], invert=True)
+
+        criteria.generate()
+        self.assertEqual(criteria.sql, """(SELECT CASE WHEN j IS NULL THEN NULL WHEN COUNT(t)=0 THEN '[]' ELSE json_group_array(v) END FROM (SELECT j,CASE WHEN type='real' AND value=CAST(value AS INTEGER) THEN 'integer' ELSE type END AS t,CASE WHEN type='real' AND value=CAST(value AS INTEGER) THEN CAST(value AS INTEGER) ELSE value END AS v FROM (SELECT json_extract(`totes`,'$.a') AS j) LEFT JOIN json_each(j) ORDER BY t,v))!=(SELECT CASE WHEN j IS NULL THEN NULL WHEN COUNT(t)=0 THEN '[]' ELSE json_group_array(v) END FROM (SELECT j,CASE WHEN type='real' AND value=CAST(value AS INTEGER) THEN 'integer' ELSE type END AS t,CASE WHEN type='real' AND value=CAST(value AS INTEGER) THEN CAST(value AS INTEGER) ELSE value END AS v FROM (SELECT json_extract(?,'$') AS j) LEFT JOIN json_each(j) ORDER BY t,v))""")
+        self.assertEqual(criteria.args, ['["mai", "goats"]'])
+
+    def test_execute(self):
+
+        connection = sqlite3.connect(":memory:")
+        connection.execute("CREATE TABLE `sets` (`id` INTEGER PRIMARY KEY, `totes` TEXT, `j` TEXT)")
+        connection.executemany("INSERT INTO `sets` (`totes`, `j`) VALUES (?, ?)", [
+            ('[1,2,2]', '[3]'),
+            ('[2,1,1]', None),
+            ('[1.0,2]', None),
+            ('[1.5,"a",null]', None),
+            ('[]', None),
+            (None, None),
+            ('{"a":[]}', None)
+        ])
+
+        def ids(*args, **kwargs):
+            criteria = ALL(*args, **kwargs)
+            criteria.generate()
+            return [row[0] for row in connection.execute(f"SELECT `id` FROM `sets` WHERE {criteria.sql} ORDER BY `id`", criteria.args)]
+
+        self.assertEqual(ids("totes", [2, 1, 2]), [1])
+        self.assertEqual(ids("totes", [1, 2]), [3])
+        self.assertEqual(ids("totes", [2.0, 1.0]), [3])
+        self.assertEqual(ids("totes", [None, "a", 1.5]), [4])
+        self.assertEqual(ids("totes", []), [5])
+        self.assertEqual(ids("totes", [1, 2], invert=True), [1, 2, 4, 5, 7])
+        self.assertEqual(ids("j", [3]), [1])
+        self.assertEqual(ids(totes__a=[]), [7])
 
 
 class TestOP(unittest.TestCase):
@@ -112,20 +162,20 @@ class TestOP(unittest.TestCase):
         criteria = OP(totes__a__null=False)
 
         criteria.generate()
-        self.assertEqual(criteria.sql, """json_extract(`totes`,?) IS NOT NULL""")
-        self.assertEqual(criteria.args, ['$.a'])
+        self.assertEqual(criteria.sql, """json_extract(`totes`,'$.a') IS NOT NULL""")
+        self.assertEqual(criteria.args, [])
 
         criteria = OP(totes__a__not_null=True)
 
         criteria.generate()
-        self.assertEqual(criteria.sql, """json_extract(`totes`,?) IS NOT NULL""")
-        self.assertEqual(criteria.args, ['$.a'])
+        self.assertEqual(criteria.sql, """json_extract(`totes`,'$.a') IS NOT NULL""")
+        self.assertEqual(criteria.args, [])
 
         criteria = OP(totes__a__not_has=[1, 2, 3])
 
         criteria.generate()
-        self.assertEqual(criteria.sql, """NOT (NOT (SELECT COUNT(*) FROM json_each(json_extract(?,'$')) as l LEFT JOIN json_each(json_extract(`totes`,?)) as r ON l.value=r.value WHERE r.value IS NULL))""")
-        self.assertEqual(criteria.args, ['[1, 2, 3]', '$.a'])
+        self.assertEqual(criteria.sql, """NOT (NOT (SELECT COUNT(*) FROM json_each(json_extract(?,'$')) as l LEFT JOIN json_each(json_extract(`totes`,'$.a')) as r ON l.value=r.value WHERE r.value IS NULL))""")
+        self.assertEqual(criteria.args, ['[1, 2, 3]'])
 
         criteria = OP(totes=1, JSONIFY=True)
 
@@ -150,13 +200,53 @@ class TestOP(unittest.TestCase):
         criteria = OP(totes__a__any=[1, 2], EXTRACTED=True)
 
         criteria.generate()
-        self.assertEqual(criteria.sql, """((NOT (SELECT COUNT(*) FROM json_each(json_extract(?,'$')) as l LEFT JOIN json_each(`totes__a`) as r ON l.value=r.value WHERE r.value IS NULL)) OR (NOT (SELECT COUNT(*) FROM json_each(json_extract(?,'$')) as l LEFT JOIN json_each(`totes__a`) as r ON l.value=r.value WHERE r.value IS NULL)))""")
-        self.assertEqual(criteria.args, ['[1]', '[2]'])
+        self.assertEqual(criteria.sql, """EXISTS (SELECT 1 FROM json_each(`totes__a`) as l JOIN json_each(json_extract(?,'$')) as r ON l.value=r.value)""")
+        self.assertEqual(criteria.args, ['[1, 2]'])
+
+        criteria = OP(totes__a__not_any=[1, 2])
+
+        criteria.generate()
+        self.assertEqual(criteria.sql, """NOT EXISTS (SELECT 1 FROM json_each(json_extract(`totes`,'$.a')) as l JOIN json_each(json_extract(?,'$')) as r ON l.value=r.value)""")
+        self.assertEqual(criteria.args, ['[1, 2]'])
 
         criteria = OP(totes__a__all=[1, 2], EXTRACTED=True)
 
         criteria.generate()
-        self.assertEqual(criteria.sql, """((NOT (SELECT COUNT(*) FROM json_each(json_extract(?,'$')) as l LEFT JOIN json_each(`totes__a`) as r ON l.value=r.value WHERE r.value IS NULL)) AND json_array_length(`totes__a`)=json_array_length(json_extract(?,'$')))""")
-        self.assertEqual(criteria.args, ['[1, 2]', '[1, 2]'])
+        self.assertEqual(criteria.sql, """(SELECT CASE WHEN j IS NULL THEN NULL WHEN COUNT(t)=0 THEN '[]' ELSE json_group_array(v) END FROM (SELECT j,CASE WHEN type='real' AND value=CAST(value AS INTEGER) THEN 'integer' ELSE type END AS t,CASE WHEN type='real' AND value=CAST(value AS INTEGER) THEN CAST(value AS INTEGER) ELSE value END AS v FROM (SELECT `totes__a` AS j) LEFT JOIN json_each(j) ORDER BY t,v))=(SELECT CASE WHEN j IS NULL THEN NULL WHEN COUNT(t)=0 THEN '[]' ELSE json_group_array(v) END FROM (SELECT j,CASE WHEN type='real' AND value=CAST(value AS INTEGER) THEN 'integer' ELSE type END AS t,CASE WHEN type='real' AND value=CAST(value AS INTEGER) THEN CAST(value AS INTEGER) ELSE value END AS v FROM (SELECT json_extract(?,'$') AS j) LEFT JOIN json_each(j) ORDER BY t,v))""")
+        self.assertEqual(criteria.args, ['[1, 2]'])
 
         self.assertRaisesRegex(relations_sql.SQLError, "need single pair", OP, "nope")
+
+
+class TestSEEK(unittest.TestCase):
+
+    maxDiff = None
+
+    def test___init__(self):
+
+        criteria = SEEK([ORDER("name")], ["bob"])
+
+        self.assertEqual(len(criteria), 1)
+        self.assertEqual(criteria.values[0].value, "bob")
+
+        self.assertRaisesRegex(relations_sql.SQLError, "need 2 values for ORDER BY, got 1", SEEK, [ORDER("name"), ORDER("id")], ["bob"])
+
+    def test_generate(self):
+
+        criteria = SEEK([ORDER("name", DESC)], ["bob"])
+
+        criteria.generate()
+        self.assertEqual(criteria.sql, """`name`<?""")
+        self.assertEqual(criteria.args, ["bob"])
+
+        criteria = SEEK([ORDER("name"), ORDER(things__a=ASC)], ["bob", {"b": 1}])
+
+        criteria.generate()
+        self.assertEqual(criteria.sql, """(`name`,json_extract(`things`,'$.a'))>(?,json_extract(?,'$'))""")
+        self.assertEqual(criteria.args, ["bob", '{"b": 1}'])
+
+        criteria = SEEK([ORDER("name"), ORDER("age", DESC), ORDER("id")], ["bob", 40, 3])
+
+        criteria.generate()
+        self.assertEqual(criteria.sql, """((`name`>?) OR (`name`=? AND `age`<?) OR (`name`=? AND `age`=? AND `id`>?))""")
+        self.assertEqual(criteria.args, ["bob", "bob", 40, "bob", 40, 3])
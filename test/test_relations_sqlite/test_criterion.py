@@ -1,6 +1,8 @@
 import unittest
 import unittest.mock
 
+import json
+
 from relations_sqlite import *
 
 
@@ -18,8 +20,8 @@ class TestNULL(unittest.TestCase):
         criterion = NULL(totes__a=False)
 
         criterion.generate()
-        self.assertEqual(criterion.sql, """json_extract(`totes`,?) IS NOT NULL""")
-        self.assertEqual(criterion.args, ['$.a'])
+        self.assertEqual(criterion.sql, """json_extract(`totes`,'$.a') IS NOT NULL""")
+        self.assertEqual(criterion.args, [])
 
 
 class TestEQ(unittest.TestCase):
@@ -41,8 +43,8 @@ class TestEQ(unittest.TestCase):
         criterion = EQ(totes__a="maigoats")
 
         criterion.generate()
-        self.assertEqual(criterion.sql, """json_extract(`totes`,?)=?""")
-        self.assertEqual(criterion.args, ['$.a', 'maigoats'])
+        self.assertEqual(criterion.sql, """json_extract(`totes`,'$.a')=?""")
+        self.assertEqual(criterion.args, ['maigoats'])
 
 
 class TestGT(unittest.TestCase):
@@ -58,8 +60,8 @@ class TestGT(unittest.TestCase):
         criterion = GT(totes__a="maigoats")
 
         criterion.generate()
-        self.assertEqual(criterion.sql, """json_extract(`totes`,?)>?""")
-        self.assertEqual(criterion.args, ['$.a', 'maigoats'])
+        self.assertEqual(criterion.sql, """json_extract(`totes`,'$.a')>?""")
+        self.assertEqual(criterion.args, ['maigoats'])
 
 
 class TestGTE(unittest.TestCase):
@@ -75,8 +77,8 @@ class TestGTE(unittest.TestCase):
         criterion = GTE(totes__a="maigoats")
 
         criterion.generate()
-        self.assertEqual(criterion.sql, """json_extract(`totes`,?)>=?""")
-        self.assertEqual(criterion.args, ['$.a', 'maigoats'])
+        self.assertEqual(criterion.sql, """json_extract(`totes`,'$.a')>=?""")
+        self.assertEqual(criterion.args, ['maigoats'])
 
 
 class TestLT(unittest.TestCase):
@@ -92,8 +94,8 @@ class TestLT(unittest.TestCase):
         criterion = LT(totes__a="maigoats")
 
         criterion.generate()
-        self.assertEqual(criterion.sql, """json_extract(`totes`,?)<?""")
-        self.assertEqual(criterion.args, ['$.a', 'maigoats'])
+        self.assertEqual(criterion.sql, """json_extract(`totes`,'$.a')<?""")
+        self.assertEqual(criterion.args, ['maigoats'])
 
 
 class TestLTE(unittest.TestCase):
@@ -109,8 +111,8 @@ class TestLTE(unittest.TestCase):
         criterion = LTE(totes__a="maigoats")
 
         criterion.generate()
-        self.assertEqual(criterion.sql, """json_extract(`totes`,?)<=?""")
-        self.assertEqual(criterion.args, ['$.a', 'maigoats'])
+        self.assertEqual(criterion.sql, """json_extract(`totes`,'$.a')<=?""")
+        self.assertEqual(criterion.args, ['maigoats'])
 
 
 class TestLIKE(unittest.TestCase):
@@ -132,8 +134,8 @@ class TestLIKE(unittest.TestCase):
         criterion = LIKE(totes__a="maigoats")
 
         criterion.generate()
-        self.assertEqual(criterion.sql, """json_extract(`totes`,?) LIKE ?""")
-        self.assertEqual(criterion.args, ['$.a', '%maigoats%'])
+        self.assertEqual(criterion.sql, """json_extract(`totes`,'$.a') LIKE ?""")
+        self.assertEqual(criterion.args, ['%maigoats%'])
 
 
 class TestSTART(unittest.TestCase):
@@ -155,8 +157,8 @@ class TestSTART(unittest.TestCase):
         criterion = START(totes__a="maigoats")
 
         criterion.generate()
-        self.assertEqual(criterion.sql, """json_extract(`totes`,?) LIKE ?""")
-        self.assertEqual(criterion.args, ['$.a', 'maigoats%'])
+        self.assertEqual(criterion.sql, """json_extract(`totes`,'$.a') LIKE ?""")
+        self.assertEqual(criterion.args, ['maigoats%'])
 
 
 class TestEND(unittest.TestCase):
@@ -178,8 +180,8 @@ class TestEND(unittest.TestCase):
         criterion = END(totes__a="maigoats")
 
         criterion.generate()
-        self.assertEqual(criterion.sql, """json_extract(`totes`,?) LIKE ?""")
-        self.assertEqual(criterion.args, ['$.a', '%maigoats'])
+        self.assertEqual(criterion.sql, """json_extract(`totes`,'$.a') LIKE ?""")
+        self.assertEqual(criterion.args, ['%maigoats'])
 
 
 class TestIN(unittest.TestCase):
@@ -201,8 +203,8 @@ class TestIN(unittest.TestCase):
         criterion = IN(totes__a=["mai", "goats"])
 
         criterion.generate()
-        self.assertEqual(criterion.sql, """json_extract(`totes`,?) IN (?,?)""")
-        self.assertEqual(criterion.args, ['$.a', 'mai', 'goats'])
+        self.assertEqual(criterion.sql, """json_extract(`totes`,'$.a') IN (?,?)""")
+        self.assertEqual(criterion.args, ['mai', 'goats'])
 
         criterion = IN(totes__a=[])
 
@@ -210,6 +212,38 @@ class TestIN(unittest.TestCase):
         self.assertEqual(criterion.sql, """?""")
         self.assertEqual(criterion.args, [False])
 
+        criterion = IN("totes", list(range(101)))
+
+        criterion.generate()
+        self.assertEqual(criterion.sql, """`totes` IN (SELECT +value FROM json_each(?))""")
+        self.assertEqual(criterion.args, [json.dumps(list(range(101)))])
+
+        criterion = IN(totes__a=["mai"] * 101, invert=True)
+
+        criterion.generate()
+        self.assertEqual(criterion.sql, """json_extract(`totes`,'$.a') NOT IN (SELECT +value FROM json_each(?))""")
+        self.assertEqual(criterion.args, [json.dumps(["mai"] * 101)])
+
+        criterion = IN("totes", [{"a": 1}] * 101)
+
+        criterion.generate()
+        self.assertEqual(criterion.sql, """`totes` IN (%s)""" % ",".join(["json_extract(?,'$')"] * 101))
+
+        with unittest.mock.patch.object(IN, "THRESHOLD", 1):
+
+            criterion = IN("totes", ["mai", "goats"])
+
+            criterion.generate()
+            self.assertEqual(criterion.sql, """`totes` IN (SELECT +value FROM json_each(?))""")
+            self.assertEqual(criterion.args, ['["mai", "goats"]'])
+
+        with unittest.mock.patch.object(IN, "THRESHOLD", None):
+
+            criterion = IN("totes", list(range(101)))
+
+            criterion.generate()
+            self.assertEqual(criterion.sql, """`totes` IN (%s)""" % ",".join(["?"] * 101))
+
 
 class TestCONTAINS(unittest.TestCase):
 
@@ -228,6 +262,59 @@ class TestCONTAINS(unittest.TestCase):
         self.assertEqual(criterion.args, ['["mai", "goats"]'])
 
 
+class TestCONTAINS_EXISTS(unittest.TestCase):
+
+    def test_generate(self):
+
+        criterion = CONTAINS_EXISTS("totes", ["mai", "goats"])
+
+        criterion.generate()
+        self.assertEqual(criterion.sql, """(NOT EXISTS (SELECT 1 FROM json_each(json_extract(?,'$')) as l WHERE NOT EXISTS (SELECT 1 FROM json_each(`totes`) as r WHERE r.value=l.value)))""")
+        self.assertEqual(criterion.args, ['["mai", "goats"]'])
+
+        criterion = CONTAINS_EXISTS(totes__a=["mai", "goats"], invert=True)
+
+        criterion.generate()
+        self.assertEqual(criterion.sql, """EXISTS (SELECT 1 FROM json_each(json_extract(?,'$')) as l WHERE NOT EXISTS (SELECT 1 FROM json_each(json_extract(`totes`,'$.a')) as r WHERE r.value=l.value))""")
+        self.assertEqual(criterion.args, ['["mai", "goats"]'])
+
+
+class TestINTERSECTS(unittest.TestCase):
+
+    def test_generate(self):
+
+        criterion = INTERSECTS("totes", ["mai", "goats"])
+
+        criterion.generate()
+        self.assertEqual(criterion.sql, """EXISTS (SELECT 1 FROM json_each(`totes`) as l JOIN json_each(json_extract(?,'$')) as r ON l.value=r.value)""")
+        self.assertEqual(criterion.args, ['["mai", "goats"]'])
+
+        criterion = INTERSECTS(totes__a=["mai", "goats"], invert=True)
+
+        criterion.generate()
+        self.assertEqual(criterion.sql, """NOT EXISTS (SELECT 1 FROM json_each(json_extract(`totes`,'$.a')) as l JOIN json_each(json_extract(?,'$')) as r ON l.value=r.value)""")
+        self.assertEqual(criterion.args, ['["mai", "goats"]'])
+
+
+class TestSAME(unittest.TestCase):
+
+    maxDiff = None
+
+    def test_generate(self):
+
+        criterion = SAME("totes", ["mai", "goats"])
+
+        criterion.generate()
+        self.assertEqual(criterion.sql, """(SELECT CASE WHEN j IS NULL THEN NULL WHEN COUNT(t)=0 THEN '[]' ELSE json_group_array(v) END FROM (SELECT j,CASE WHEN type='real' AND value=CAST(value AS INTEGER) THEN 'integer' ELSE type END AS t,CASE WHEN type='real' AND value=CAST(value AS INTEGER) THEN CAST(value AS INTEGER) ELSE value END AS v FROM (SELECT `totes` AS j) LEFT JOIN json_each(j) ORDER BY t,v))=(SELECT CASE WHEN j IS NULL THEN NULL WHEN COUNT(t)=0 THEN '[]' ELSE json_group_array(v) END FROM (SELECT j,CASE WHEN type='real' AND value=CAST(value AS INTEGER) THEN 'integer' ELSE type END AS t,CASE WHEN type='real' AND value=CAST(value AS INTEGER) THEN CAST(value AS INTEGER) ELSE value END AS v FROM (SELECT json_extract(?,'$') AS j) LEFT JOIN json_each(j) ORDER BY t,v))""")
+        self.assertEqual(criterion.args, ['["mai", "goats"]'])
+
+        criterion = SAME(totes__a=["mai", "goats"], invert=True)
+
+        criterion.generate()
+        self.assertEqual(criterion.sql, """(SELECT CASE WHEN j IS NULL THEN NULL WHEN COUNT(t)=0 THEN '[]' ELSE json_group_array(v) END FROM (SELECT j,CASE WHEN type='real' AND value=CAST(value AS INTEGER) THEN 'integer' ELSE type END AS t,CASE WHEN type='real' AND value=CAST(value AS INTEGER) THEN CAST(value AS INTEGER) ELSE value END AS v FROM (SELECT json_extract(`totes`,'$.a') AS j) LEFT JOIN json_each(j) ORDER BY t,v))!=(SELECT CASE WHEN j IS NULL THEN NULL WHEN COUNT(t)=0 THEN '[]' ELSE json_group_array(v) END FROM (SELECT j,CASE WHEN type='real' AND value=CAST(value AS INTEGER) THEN 'integer' ELSE type END AS t,CASE WHEN type='real' AND value=CAST(value AS INTEGER) THEN CAST(value AS INTEGER) ELSE value END AS v FROM (SELECT json_extract(?,'$') AS j) LEFT JOIN json_each(j) ORDER BY t,v))""")
+        self.assertEqual(criterion.args, ['["mai", "goats"]'])
+
+
 class TestLENGTHS(unittest.TestCase):
 
     def test_generate(self):
@@ -248,7 +248,8 @@ class TestSQLite3(unittest.TestCase):
             "fields": {
                 "change": {
                     "added": {
-                        "name": "adding"
+                        "name": "adding",
+                        "store": "adding"
                     }
                 }
             }
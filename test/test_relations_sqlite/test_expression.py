@@ -178,15 +178,29 @@ class TestCOLUMN_NAME(unittest.TestCase):
 
         expression = COLUMN_NAME("people.stuff.things__a__0___1____2_____3", table=table)
         expression.generate()
-        self.assertEqual(expression.sql, """json_extract(test.`things`,?)""")
-        self.assertEqual(expression.args, ["unit", '$.a[0][-1]."2"."-3"'])
+        self.assertEqual(expression.sql, """json_extract(test.`things`,'$.a[0][-1]."2"."-3"')""")
+        self.assertEqual(expression.args, ["unit"])
 
         schema = relations_sql.SQL("unit", ["test"])
 
         expression = COLUMN_NAME("people.stuff.things__a__0___1____2_____3", schema=schema)
         expression.generate()
-        self.assertEqual(expression.sql, """json_extract(unit.`stuff`.`things`,?)""")
-        self.assertEqual(expression.args, ["test", '$.a[0][-1]."2"."-3"'])
+        self.assertEqual(expression.sql, """json_extract(unit.`stuff`.`things`,'$.a[0][-1]."2"."-3"')""")
+        self.assertEqual(expression.args, ["test"])
+
+
+class TestEXCLUDED(unittest.TestCase):
+
+    def test_generate(self):
+
+        expression = EXCLUDED("stuff")
+        expression.generate()
+        self.assertEqual(expression.sql, """`excluded`.`stuff`""")
+        self.assertEqual(expression.args, [])
+
+        expression = EXCLUDED("things__a", jsonify=True)
+        expression.generate()
+        self.assertEqual(expression.sql, """json_extract(json_extract(`excluded`.`things`,'$.a'),'$')""")
 
 
 class TestNAMES(unittest.TestCase):
@@ -255,6 +269,29 @@ class TestAS(unittest.TestCase):
         self.assertEqual(expression.sql, """test AS unit""")
 
 
+class TestCTE(unittest.TestCase):
+
+    maxDiff = None
+
+    def test_generate(self):
+
+        query = relations_sql.SQL("test", ["unit"])
+
+        expression = CTE("people", query)
+        expression.generate()
+        self.assertEqual(expression.sql, """`people` AS (test)""")
+        self.assertEqual(expression.args, ["unit"])
+
+        expression = CTE("people", SELECT("stuff").FROM("things"))
+        expression.generate(indent=2)
+        self.assertEqual(expression.sql, """`people` AS (
+  SELECT
+    `stuff`
+  FROM
+    `things`
+)""")
+
+
 class TestORDER(unittest.TestCase):
 
     maxDiff = None
@@ -38,6 +38,30 @@ INDEX `people` (`stuff`,`things`);
         self.assertEqual(ddl.sql, "DROP INDEX `persons`")
         self.assertEqual(ddl.args, [])
 
+        ddl = INDEX(name="people", table="persons", columns=["stuff__a__0____1", COLUMN_NAME("things__b", extracted=True)])
+
+        ddl.generate()
+        self.assertEqual(ddl.sql, """CREATE INDEX `persons_people` ON `persons` (json_extract(`stuff`,'$.a[0]."1"'),`things__b`)""")
+        self.assertEqual(ddl.args, [])
+
+        ddl = INDEX(name="people", table="persons", columns=["stuff"], where={"status": "it's", "deleted__null": True, "things__a__gt": 1.5})
+
+        ddl.generate()
+        self.assertEqual(ddl.sql, """CREATE INDEX `persons_people` ON `persons` (`stuff`) """
+                                  """WHERE `deleted` IS NULL AND `status`='it''s' AND json_extract(`things`,'$.a')>1.5""")
+        self.assertEqual(ddl.args, [])
+
+    def test_literal(self):
+
+        ddl = INDEX(name="people", columns=["stuff"])
+
+        self.assertEqual(ddl.literal(None), "NULL")
+        self.assertEqual(ddl.literal(True), "1")
+        self.assertEqual(ddl.literal(2), "2")
+        self.assertEqual(ddl.literal(2.5), "2.5")
+        self.assertEqual(ddl.literal("it's"), "'it''s'")
+        self.assertEqual(ddl.literal([1]), "'[1]'")
+
 
 class TestUNIQUE(unittest.TestCase):
 
@@ -71,3 +95,15 @@ UNIQUE INDEX `people` (`stuff`,`things`);
         ddl.generate()
         self.assertEqual(ddl.sql, "DROP INDEX `persons`")
         self.assertEqual(ddl.args, [])
+
+        ddl = UNIQUE(name="people", table="persons", columns=["stuff__a"])
+
+        ddl.generate()
+        self.assertEqual(ddl.sql, """CREATE UNIQUE INDEX `persons_people` ON `persons` (json_extract(`stuff`,'$.a'))""")
+        self.assertEqual(ddl.args, [])
+
+        ddl = UNIQUE(name="people", table="persons", columns=["stuff"], where=OP(deleted__null=False))
+
+        ddl.generate()
+        self.assertEqual(ddl.sql, """CREATE UNIQUE INDEX `persons_people` ON `persons` (`stuff`) WHERE `deleted` IS NOT NULL""")
+        self.assertEqual(ddl.args, [])
@@ -0,0 +1,112 @@
+import unittest
+import unittest.mock
+
+import os
+import sqlite3
+import tempfile
+
+from relations_sqlite import *
+
+
+class TestLOADER(unittest.TestCase):
+
+    maxDiff = None
+
+    def setUp(self):
+
+        self.directory = tempfile.TemporaryDirectory()
+        self.database = os.path.join(self.directory.name, "main.db")
+
+        self.connection = sqlite3.connect(self.database)
+        self.connection.execute("CREATE TABLE `stuff` (`id` INTEGER PRIMARY KEY, `people_id` INTEGER, `what` TEXT)")
+        self.connection.executemany("INSERT INTO `stuff` VALUES (?,?,?)", [
+            (1, 1, "a"), (2, 1, "b"), (3, 2, "c"), (4, 3, "d"), (5, 3, "z")
+        ])
+        self.connection.commit()
+
+    def tearDown(self):
+
+        self.connection.close()
+        self.directory.cleanup()
+
+    def test___init__(self):
+
+        query = SELECT("*").FROM("stuff")
+
+        loader = LOADER(query, "people_id", size=10)
+
+        self.assertIs(loader.query, query)
+        self.assertEqual(loader.key, "people_id")
+        self.assertEqual(loader.size, 10)
+
+    def test_chunks(self):
+
+        loader = LOADER(SELECT("*").FROM("stuff").WHERE(what__not_eq="z"), "people_id")
+
+        self.assertEqual(loader.chunks(self.connection, list(range(5))), [[0, 1, 2, 3, 4]])
+
+        loader.size = 2
+        self.assertEqual(loader.chunks(self.connection, list(range(5))), [[0, 1], [2, 3], [4]])
+
+        loader.size = None
+        connection = unittest.mock.MagicMock()
+        connection.getlimit.return_value = 3
+
+        with unittest.mock.patch.object(IN, "THRESHOLD", None):
+
+            self.assertEqual(loader.chunks(connection, list(range(5))), [[0, 1], [2, 3], [4]])
+
+            connection.getlimit.return_value = 1
+            self.assertRaisesRegex(relations_sql.SQLError, "no room for keys in 1 variables", loader.chunks, connection, [1])
+
+    def test_fetch(self):
+
+        loader = LOADER(SELECT("id", "people_id").FROM("stuff").WHERE(what__not_eq="z").ORDER_BY("id"), "people_id")
+
+        self.assertEqual(loader.fetch(self.connection, [1, 3, 4]), {
+            1: [(1, 1), (2, 1)],
+            3: [(4, 3)],
+            4: []
+        })
+
+        self.assertEqual(len(loader.query.WHERE.expressions), 1)
+
+        loader = LOADER(SELECT("s.what", "s.people_id").FROM(s="stuff").ORDER_BY("s.id"), "s.people_id", size=1)
+
+        self.connection.row_factory = sqlite3.Row
+
+        grouped = loader.fetch(self.connection, [2, 3])
+        self.assertEqual({key: [row["what"] for row in rows] for key, rows in grouped.items()}, {2: ["c"], 3: ["d", "z"]})
+
+        self.connection.row_factory = lambda cursor, row: {column[0]: value for column, value in zip(cursor.description, row)}
+
+        self.assertEqual(loader.fetch(self.connection, [2]), {2: [{"what": "c", "people_id": 2}]})
+
+        loader = LOADER(SELECT("id").FROM("stuff"), "people_id")
+
+        self.assertRaisesRegex(relations_sql.SQLError, "need people_id in FIELDS to group by", loader.fetch, self.connection, [1])
+
+    def test_load(self):
+
+        loader = LOADER(SELECT("what", "people_id").FROM("stuff").ORDER_BY("id"), "people_id")
+
+        self.assertEqual(loader.load(self.connection, []), {})
+        self.assertEqual(loader.load(self.connection, [None]), {})
+
+        self.assertEqual(loader.load(self.connection, [2, 1, 2, None]), {
+            2: [("c", 2)],
+            1: [("a", 1), ("b", 1)]
+        })
+
+        keys = list(range(1, 200))
+
+        grouped = loader.load(self.connection, keys)
+        self.assertEqual(len(grouped), 199)
+        self.assertEqual(grouped[3], [("d", 3), ("z", 3)])
+
+        pool = POOL(self.database, size=1)
+
+        self.assertEqual(loader.load(pool, [3]), {3: [("d", 3), ("z", 3)]})
+        self.assertEqual(pool.metrics()["acquired"], 1)
+
+        pool.close()
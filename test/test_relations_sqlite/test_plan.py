@@ -0,0 +1,127 @@
+import unittest
+import unittest.mock
+
+import sqlite3
+
+import relations
+from relations_sqlite import *
+
+
+class Meta(relations.Model):
+    id = int, {"auto": True}
+    name = str
+    flag = bool
+    spend = float
+    things = dict, {"extract": {"a": int}}
+
+
+class TestPLAN(unittest.TestCase):
+
+    maxDiff = None
+
+    def setUp(self):
+
+        self.definition = {**Meta.thy().define(), "index": {"spend": ["spend"]}}
+
+    def test___init__(self):
+
+        plan = PLAN(migration={"name": "metas"}, definition=self.definition)
+
+        self.assertEqual(plan.migration, {"name": "metas"})
+        self.assertEqual(plan.changes, [{"kind": "table", "action": "change", "name": "meta", "cost": "index"}])
+
+    def test_cost(self):
+
+        plan = PLAN(migration={"fields": {"change": {"flag": {"store": "flagged"}}}}, definition=self.definition)
+        self.assertEqual(plan.cost(), "metadata")
+        self.assertEqual(plan.cost({"index": {"add": {"flag": ["flag"]}}}), "index")
+        self.assertEqual(plan.cost({"fields": {"change": {"flag": {"default": True}}}}), "rewrite")
+        self.assertEqual(plan.cost({"schema": "other"}), "rewrite")
+        self.assertEqual(plan.cost({"fields": {"remove": ["spend"]}}), "rewrite")
+        self.assertEqual(plan.cost({"unique": {"remove": ["name"]}}), "metadata")
+
+    def test_classify(self):
+
+        plan = PLAN(
+            migration={
+                "fields": {
+                    "add": [
+                        {"name": "extra", "store": "extra", "kind": "str", "none": True},
+                        {"name": "count", "store": "count", "kind": "int", "none": False}
+                    ],
+                    "change": {"name": {"store": "label"}, "flag": {"kind": "int"}},
+                    "remove": ["spend"]
+                },
+                "index": {"add": {"things": ["things__b"]}, "rename": {"spend": "spent"}},
+                "unique": {"remove": ["name"]}
+            },
+            definition=self.definition
+        )
+
+        self.assertEqual(plan.changes, [
+            {"kind": "field", "action": "add", "name": "extra", "cost": "metadata"},
+            {"kind": "field", "action": "add", "name": "count", "cost": "rewrite"},
+            {"kind": "field", "action": "change", "name": "name", "cost": "metadata"},
+            {"kind": "field", "action": "change", "name": "flag", "cost": "rewrite"},
+            {"kind": "field", "action": "remove", "name": "spend", "cost": "rewrite"},
+            {"kind": "index", "action": "add", "name": "things", "cost": "index"},
+            {"kind": "index", "action": "rename", "name": "spend", "cost": "index"},
+            {"kind": "unique", "action": "remove", "name": "name", "cost": "metadata"}
+        ])
+
+        self.assertTrue(plan.rewrite)
+
+        with unittest.mock.patch.object(TABLE, "VERSION", (3, 34, 0)):
+            plan = PLAN(migration={"fields": {"remove": ["spend"]}}, definition=self.definition)
+            self.assertEqual(plan.changes, [{"kind": "field", "action": "remove", "name": "spend", "cost": "rewrite"}])
+
+    def test_estimate(self):
+
+        connection = sqlite3.connect(":memory:")
+
+        ddl = TABLE(migration=self.definition)
+        ddl.args = []
+        ddl.create()
+        connection.executescript(ddl.sql)
+
+        connection.executemany(
+            "INSERT INTO `meta` (`name`, `flag`, `spend`, `things`) VALUES (?, 1, 1.5, '{}')",
+            [(f"{row:0100}",) for row in range(500)]
+        )
+        connection.commit()
+
+        plan = PLAN(migration={"fields": {"change": {"flag": {"default": True}}}}, definition=self.definition)
+
+        self.assertEqual(plan.rows(connection), 500)
+        self.assertGreater(plan.bytes(connection), 500 * 100)
+
+        connection.execute("DELETE FROM `meta` WHERE `id` > 1 AND `id` < 500")
+        connection.execute("ANALYZE")
+        self.assertEqual(plan.rows(connection), 2)
+
+        estimate = plan.estimate(connection)
+        self.assertEqual(estimate["cost"], "rewrite")
+        self.assertEqual(estimate["rows"], 2)
+        self.assertGreater(estimate["bytes"], 0)
+
+        plan = PLAN(migration={"fields": {"change": {"flag": {"store": "flagged"}}}}, definition=self.definition)
+        self.assertEqual(plan.estimate(connection), {"cost": "metadata", "rows": 0, "bytes": 0})
+
+        plan = PLAN(migration={"fields": {"remove": ["spend"]}}, definition=self.definition)
+        self.assertTrue(plan.rewrite)
+
+        estimate = plan.estimate(connection)
+        self.assertEqual(estimate["cost"], "rewrite")
+        self.assertEqual(estimate["rows"], 2)
+        self.assertGreater(estimate["bytes"], 0)
+
+        connection = unittest.mock.MagicMock()
+        cursor = connection.cursor.return_value
+        cursor.execute.side_effect = [sqlite3.OperationalError("no such table: dbstat"), cursor, cursor]
+        cursor.fetchone.side_effect = [(10,), (4096,)]
+
+        self.assertEqual(plan.bytes(connection), 40960)
+        cursor.execute.assert_has_calls([
+            unittest.mock.call("PRAGMA `main`.page_count"),
+            unittest.mock.call("PRAGMA `main`.page_size")
+        ])
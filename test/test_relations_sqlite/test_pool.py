@@ -0,0 +1,211 @@
+import unittest
+import unittest.mock
+
+import os
+import time
+import sqlite3
+import tempfile
+import threading
+
+import relations
+from relations_sqlite import *
+
+
+class Meta(relations.Model):
+    id = int, {"auto": True}
+    name = str
+
+
+class TestPOOL(unittest.TestCase):
+
+    maxDiff = None
+
+    def setUp(self):
+
+        self.directory = tempfile.TemporaryDirectory()
+        self.database = os.path.join(self.directory.name, "main.db")
+        self.unit = os.path.join(self.directory.name, "unit.db")
+
+    def tearDown(self):
+
+        self.directory.cleanup()
+
+    def test___init__(self):
+
+        pool = POOL(self.database, size=2, attach={"unit": self.unit}, pragma="durable", wait=1, timeout=2, isolation_level=None)
+
+        self.assertEqual(pool.database, self.database)
+        self.assertEqual(pool.size, 2)
+        self.assertEqual(pool.attach, {"unit": self.unit})
+        self.assertEqual(pool.pragma, "durable")
+        self.assertEqual(pool.wait, 1)
+        self.assertEqual(pool.kwargs, {"timeout": 2, "isolation_level": None})
+        self.assertEqual(pool.opened, 0)
+
+    def test_connect(self):
+
+        pool = POOL(self.database, attach={"unit": self.unit}, pragma="durable", row_factory=sqlite3.Row)
+
+        connection = pool.connect()
+
+        self.assertEqual(connection.row_factory, sqlite3.Row)
+        self.assertEqual([row["name"] for row in connection.execute("PRAGMA database_list")], ["main", "unit"])
+        self.assertEqual(connection.execute("PRAGMA `unit`.`journal_mode`").fetchone()[0], "wal")
+        self.assertEqual(connection.execute("PRAGMA `main`.`synchronous`").fetchone()[0], 2)
+
+        connection.close()
+
+        pool = POOL(self.database, wait=1, timeout=0.25)
+
+        connection = pool.connect()
+
+        self.assertEqual(connection.execute("PRAGMA busy_timeout").fetchone()[0], 250)
+
+        connection.close()
+
+    def test_open(self):
+
+        pool = POOL(self.database)
+        pool.opened = 1
+
+        connection = pool.open()
+        self.assertEqual(pool.connections, [connection])
+
+        with unittest.mock.patch.object(pool, "connect", side_effect=sqlite3.OperationalError("nope")):
+            self.assertRaises(sqlite3.OperationalError, pool.open)
+
+        self.assertEqual(pool.opened, 0)
+
+        pool.close()
+
+    def test_acquire(self):
+
+        pool = POOL(self.database)
+
+        connection = pool.acquire()
+        self.assertIs(pool.acquire(), connection)
+
+        others = []
+        thread = threading.Thread(target=lambda: others.append(pool.acquire()))
+        thread.start()
+        thread.join()
+
+        self.assertIsNot(others[0], connection)
+        self.assertEqual((pool.opened, pool.acquired, pool.busy), (1, 3, 3))
+        self.assertEqual(pool.connections, [connection])
+        self.assertRaisesRegex(sqlite3.ProgrammingError, "closed", others[0].execute, "SELECT 1")
+
+        def query():
+            with pool.connection() as each:
+                each.execute("SELECT 1")
+
+        for _ in range(20):
+            thread = threading.Thread(target=query)
+            thread.start()
+            thread.join()
+
+        self.assertEqual((pool.opened, len(pool.connections)), (1, 1))
+
+        pool.close()
+
+        pool = POOL(self.database, size=1, wait=0.01)
+
+        with pool.connection() as connection:
+            self.assertRaisesRegex(TimeoutError, "no connection free after 0.01 seconds", pool.acquire)
+
+        def hold():
+            with pool.connection():
+                time.sleep(0.05)
+
+        thread = threading.Thread(target=hold)
+        thread.start()
+        time.sleep(0.01)
+
+        pool.wait = 1
+
+        with pool.connection() as again:
+            self.assertIs(again, connection)
+
+        thread.join()
+
+        self.assertEqual(pool.opened, 1)
+        self.assertGreater(pool.waited, 0.01)
+
+        pool.close()
+
+    def test_release(self):
+
+        pool = POOL(self.database, size=1)
+
+        with pool.connection() as connection:
+            connection.execute("CREATE TABLE `people` (`name` TEXT)")
+            connection.execute("INSERT INTO `people` VALUES ('mary')")
+            self.assertTrue(connection.in_transaction)
+
+        self.assertFalse(connection.in_transaction)
+        self.assertEqual(connection.execute("SELECT COUNT(*) FROM `people`").fetchone()[0], 0)
+        self.assertEqual(pool.idle.qsize(), 1)
+        self.assertEqual(pool.busy, 0)
+
+        pool.close()
+
+    def test_execute(self):
+
+        cache = CACHE()
+        pool = POOL(self.database, size=2, attach={"unit": self.unit}, cache=cache)
+
+        ddl = TABLE(migration={**Meta.thy().define(), "schema": "unit"})
+        self.assertEqual(pool.execute(ddl), -1)
+
+        self.assertEqual(pool.execute(INSERT("unit.meta").VALUES(name="tom")), 1)
+        self.assertEqual(pool.execute(INSERT("unit.meta").many([{"name": "dick"}, {"name": "harry"}])), 2)
+        self.assertEqual(pool.execute(INSERT("unit.meta").many([{"name": "moe"}, {"name": "curly"}]).RETURNING("id")), [(4,), (5,)])
+        self.assertEqual(pool.execute(DELETE("unit.meta").WHERE(id__gt=3).RETURNING("name")), [("moe",), ("curly",)])
+
+        self.assertEqual(pool.execute(SELECT("name").FROM("unit.meta").WHERE(id__gt=1)), [("dick",), ("harry",)])
+        self.assertEqual(pool.execute(SELECT("name").FROM("unit.meta").WHERE(id__gt=2)), [("harry",)])
+        self.assertEqual(cache.hits, 1)
+
+        self.assertEqual(pool.execute(UPDATE("unit.meta").SET(name="jane").WHERE(id=2)), 1)
+        self.assertEqual(pool.execute(DELETE("unit.meta").WHERE(id__gt=2)), 1)
+
+        other = POOL(self.database, attach={"unit": self.unit})
+        self.assertEqual(other.execute(SELECT("id", "name").FROM("unit.meta")), [(1, "tom"), (2, "jane")])
+
+        pool.close()
+        other.close()
+
+    def test_metrics(self):
+
+        pool = POOL(self.database, size=2)
+
+        self.assertEqual(pool.metrics()["utilisation"], 0.0)
+
+        with pool.connection():
+            time.sleep(0.01)
+            metrics = pool.metrics()
+            self.assertEqual((metrics["opened"], metrics["busy"], metrics["acquired"]), (1, 1, 1))
+
+        metrics = pool.metrics()
+
+        self.assertEqual(metrics["size"], 2)
+        self.assertEqual(metrics["busy"], 0)
+        self.assertEqual(metrics["wait"], 0.0)
+        self.assertGreater(metrics["utilisation"], 0.0)
+        self.assertLessEqual(metrics["utilisation"], 1.0)
+
+        pool.close()
+
+    def test_close(self):
+
+        pool = POOL(self.database)
+
+        connection = pool.acquire()
+
+        pool.close()
+
+        self.assertEqual((pool.opened, pool.connections), (0, []))
+        self.assertRaises(sqlite3.ProgrammingError, connection.execute, "SELECT 1")
+        self.assertIsNot(pool.acquire(), connection)
+
+        pool.close()
@@ -1,6 +1,10 @@
 import unittest
 import unittest.mock
 
+import json
+import base64
+import sqlite3
+
 from relations_sqlite import *
 
 
@@ -40,9 +44,9 @@ class TestSELECT(unittest.TestCase):
         self.assertEqual(query.sql,
             "SELECT FAST * FROM (SELECT `a`.`b`.`c` FROM `d`.`e`) "
             "AS `people` WHERE `stuff` IN "
-            "(SELECT `f` FROM `g` WHERE json_extract(`things`,?)>?)"
+            "(SELECT `f` FROM `g` WHERE json_extract(`things`,'$.a[0][-1].\"2\".\"-3\"')>?)"
         )
-        self.assertEqual(query.args, ['$.a[0][-1]."2"."-3"', 5])
+        self.assertEqual(query.args, [5])
 
         query.GROUP_BY("fee", "fie").HAVING(foe="fum").ORDER_BY("yin", yang=DESC).LIMIT(1, 2)
 
@@ -50,11 +54,11 @@ class TestSELECT(unittest.TestCase):
         self.assertEqual(query.sql,
             "SELECT FAST * FROM (SELECT `a`.`b`.`c` FROM `d`.`e`) "
             "AS `people` WHERE `stuff` IN "
-            "(SELECT `f` FROM `g` WHERE json_extract(`things`,?)>?) "
+            "(SELECT `f` FROM `g` WHERE json_extract(`things`,'$.a[0][-1].\"2\".\"-3\"')>?) "
             "GROUP BY `fee`,`fie` HAVING `foe`=? "
             "ORDER BY `yin`,`yang` DESC LIMIT ? OFFSET ?"
         )
-        self.assertEqual(query.args, ['$.a[0][-1]."2"."-3"', 5, 'fum', 1, 2])
+        self.assertEqual(query.args, [5, 'fum', 1, 2])
 
         query.WHERE(more="stuff").HAVING(more="things")
         query.generate(indent=2)
@@ -75,7 +79,7 @@ WHERE
     FROM
       `g`
     WHERE
-      json_extract(`things`,?)>?
+      json_extract(`things`,'$.a[0][-1]."2"."-3"')>?
   ) AND
   `more`=?
 GROUP BY
@@ -107,7 +111,7 @@ LIMIT ? OFFSET ?""")
       FROM
         `g`
       WHERE
-        json_extract(`things`,?)>?
+        json_extract(`things`,'$.a[0][-1]."2"."-3"')>?
     ) AND
     `more`=?
   GROUP BY
@@ -139,7 +143,7 @@ LIMIT ? OFFSET ?""")
         FROM
           `g`
         WHERE
-          json_extract(`things`,?)>?
+          json_extract(`things`,'$.a[0][-1]."2"."-3"')>?
       ) AND
       `more`=?
     GROUP BY
@@ -154,6 +158,214 @@ LIMIT ? OFFSET ?""")
     LIMIT ? OFFSET ?""")
 
 
+    def test_join(self):
+
+        query = SELECT("p.name", "s.what").FROM(p="people").JOIN(
+            {"s": "stuff"}, LEFT=True, **{"s.people_id": COLUMN_NAME("p.id"), "s.what__not_eq": "z"}
+        ).WHERE(**{"p.id__lt": 4}).ORDER_BY("p.id", "s.id")
+
+        query.generate()
+        self.assertEqual(query.sql,
+            "SELECT `p`.`name`,`s`.`what` FROM `people` AS `p` "
+            "LEFT JOIN `stuff` AS `s` ON `s`.`people_id`=(`p`.`id`) AND `s`.`what`!=? "
+            "WHERE `p`.`id`<? ORDER BY `p`.`id`,`s`.`id`"
+        )
+        self.assertEqual(query.args, ["z", 4])
+
+        connection = sqlite3.connect(":memory:")
+        connection.execute("CREATE TABLE `people` (`id` INTEGER PRIMARY KEY, `name` TEXT)")
+        connection.execute("CREATE TABLE `stuff` (`id` INTEGER PRIMARY KEY, `people_id` INTEGER, `what` TEXT)")
+        connection.executemany("INSERT INTO `people` VALUES (?,?)", [(1, "tom"), (2, "dick"), (3, "harry"), (4, "jane")])
+        connection.executemany("INSERT INTO `stuff` VALUES (?,?,?)", [(1, 1, "a"), (2, 1, "b"), (3, 2, "c"), (4, 2, "z")])
+
+        self.assertEqual(connection.execute(query.sql, query.args).fetchall(), [
+            ("tom", "a"), ("tom", "b"), ("dick", "c"), ("harry", None)
+        ])
+
+        query = SELECT("people.name").FROM("people").JOIN("stuff", **{"stuff.people_id": COLUMN_NAME("people.id")}).ORDER_BY("stuff.id")
+
+        query.generate()
+        self.assertEqual(query.sql,
+            "SELECT `people`.`name` FROM `people` JOIN `stuff` ON `stuff`.`people_id`=(`people`.`id`) ORDER BY `stuff`.`id`"
+        )
+        self.assertEqual(connection.execute(query.sql, query.args).fetchall(), [("tom",), ("tom",), ("dick",), ("dick",)])
+
+    def test_with(self):
+
+        tree = SELECT("id", "name", depth=relations_sql.SQL("0")).FROM("categories").WHERE(id=1)
+        tree.UNION(
+            SELECT("c.id", "c.name", depth=relations_sql.SQL("`tree`.`depth`+1")).FROM("tree", c="categories").WHERE(**{"c.parent_id": COLUMN_NAME("tree.id")}),
+            ALL=True
+        )
+
+        query = SELECT("name", "depth").FROM("tree").WITH(RECURSIVE=True, tree=tree).ORDER_BY("depth", "name")
+
+        query.generate()
+        self.assertEqual(query.sql,
+            "WITH RECURSIVE `tree` AS ("
+            "SELECT `id`,`name`,0 AS `depth` FROM `categories` WHERE `id`=? "
+            "UNION ALL "
+            "SELECT `c`.`id`,`c`.`name`,`tree`.`depth`+1 AS `depth` FROM `tree`,`categories` AS `c` WHERE `c`.`parent_id`=(`tree`.`id`)"
+            ") "
+            "SELECT `name`,`depth` FROM `tree` ORDER BY `depth`,`name`"
+        )
+        self.assertEqual(query.args, [1])
+
+        query.generate(indent=2)
+        self.assertEqual(query.sql, """WITH RECURSIVE
+  `tree` AS (
+    SELECT
+      `id`,
+      `name`,
+      0 AS `depth`
+    FROM
+      `categories`
+    WHERE
+      `id`=?
+    UNION ALL
+    SELECT
+      `c`.`id`,
+      `c`.`name`,
+      `tree`.`depth`+1 AS `depth`
+    FROM
+      `tree`,
+      `categories` AS `c`
+    WHERE
+      `c`.`parent_id`=(
+        `tree`.`id`
+      )
+  )
+SELECT
+  `name`,
+  `depth`
+FROM
+  `tree`
+ORDER BY
+  `depth`,
+  `name`""")
+
+        connection = sqlite3.connect(":memory:")
+        connection.execute("CREATE TABLE `categories` (`id` INTEGER PRIMARY KEY, `parent_id` INTEGER, `name` TEXT)")
+        connection.executemany("INSERT INTO `categories` VALUES (?,?,?)", [
+            (1, None, "root"), (2, 1, "a"), (3, 1, "b"), (4, 2, "aa"), (5, 6, "other")
+        ])
+
+        self.assertEqual(connection.execute(query.sql, query.args).fetchall(), [("root", 0), ("a", 1), ("b", 1), ("aa", 2)])
+
+        query = SELECT("*").FROM("a").WITH(a=SELECT("stuff").FROM("people").WHERE(stuff__gt=1)).WHERE(stuff__lt=3)
+
+        query.generate()
+        self.assertEqual(query.sql, """WITH `a` AS (SELECT `stuff` FROM `people` WHERE `stuff`>?) SELECT * FROM `a` WHERE `stuff`<?""")
+        self.assertEqual(query.args, [1, 3])
+
+    def test_token(self):
+
+        query = SELECT("*").FROM("people").ORDER_BY("name", id=DESC)
+
+        token = query.token({"id": 3, "name": "bob", "age": 40})
+        self.assertEqual(json.loads(base64.urlsafe_b64decode(token)), ["bob", 3])
+
+        self.assertEqual(query.token(("bob", 3)), token)
+
+        query = SELECT("*").FROM("people").ORDER_BY(age=DESC)
+
+        token = query.token({"id": 3, "name": "bob", "age": 40})
+        self.assertEqual(json.loads(base64.urlsafe_b64decode(token)), [40, 3])
+
+        query.generate()
+        self.assertEqual(query.sql, """SELECT * FROM `people` ORDER BY `age` DESC,`id` DESC""")
+
+        query = SELECT("*").FROM("people").ORDER_BY("age")
+
+        token = query.token({"ref": 3, "name": "bob", "age": 40}, KEY="ref")
+        self.assertEqual(json.loads(base64.urlsafe_b64decode(token)), [40, 3])
+
+        self.assertRaisesRegex(relations_sql.SQLError, "need 2 values for ORDER BY, got 1", query.token, [40], KEY="ref")
+        self.assertRaisesRegex(relations_sql.SQLError, "need id in the row for ORDER BY", SELECT("*").FROM("people").token, {"name": "bob"})
+
+        query = SELECT("id", a="things__a").FROM("people").ORDER_BY("things__a", "things__b")
+
+        token = query.token({"id": 3, "a": 1, "json_extract(`things`,'$.b')": 2})
+        self.assertEqual(json.loads(base64.urlsafe_b64decode(token)), [1, 2, 3])
+
+    def test_seek(self):
+
+        query = SELECT("*").FROM("people").ORDER_BY("name", id=DESC).LIMIT(2)
+
+        self.assertIs(query.seek(None), query)
+
+        query.seek(query.token(["bob", 3]))
+
+        query.generate()
+        self.assertEqual(query.sql, """SELECT * FROM `people` WHERE ((`name`>?) OR (`name`=? AND `id`<?)) ORDER BY `name`,`id` DESC LIMIT ?""")
+        self.assertEqual(query.args, ["bob", "bob", 3, 2])
+
+        connection = sqlite3.connect(":memory:")
+        connection.execute("CREATE TABLE `people` (`id` INTEGER PRIMARY KEY, `name` TEXT, `age` INTEGER)")
+        connection.executemany(
+            "INSERT INTO `people` (`name`, `age`) VALUES (?, ?)",
+            [(f"n{row % 7}", row % 5) for row in range(50)]
+        )
+
+        for orders in [["name", "id"], ["age", {"name": DESC}, "id"], [{"age": DESC}, {"id": DESC}]]:
+
+            def select(token=None):
+                query = SELECT("id", "name", "age").FROM("people")
+                for order in orders:
+                    query.ORDER_BY(order)
+                query.seek(token).LIMIT(7)
+                query.generate()
+                return query, connection.execute(query.sql, query.args).fetchall()
+
+            every = []
+            token = None
+
+            while True:
+                query, rows = select(token)
+                if not rows:
+                    break
+                every.extend(rows)
+                token = query.token([rows[-1][["id", "name", "age"].index(order if isinstance(order, str) else list(order)[0])] for order in orders])
+
+            query = SELECT("id", "name", "age").FROM("people")
+            for order in orders:
+                query.ORDER_BY(order)
+            query.generate()
+
+            self.assertEqual(every, connection.execute(query.sql, query.args).fetchall(), orders)
+
+        connection.execute("CREATE TABLE `scores` (`id` INTEGER PRIMARY KEY, `m` INTEGER, `things` TEXT)")
+        connection.executemany(
+            "INSERT INTO `scores` (`m`, `things`) VALUES (?, ?)",
+            [(row % 3, json.dumps({"a": row % 4})) for row in range(29)]
+        )
+        connection.row_factory = sqlite3.Row
+
+        for fields, aliases, orders in [
+            (["id", "m"], {}, [{"m": DESC}]),
+            (["id"], {"a": "things__a"}, ["things__a"]),
+            (["id", "things__a"], {}, [{"things__a": DESC}])
+        ]:
+
+            every = []
+            token = None
+
+            while True:
+                query = SELECT(*fields, **aliases).FROM("scores")
+                for order in orders:
+                    query.ORDER_BY(order)
+                query.seek(token).LIMIT(4)
+                query.generate()
+                rows = connection.execute(query.sql, query.args).fetchall()
+                if not rows:
+                    break
+                every.extend(rows)
+                token = query.token(rows[-1])
+
+            self.assertEqual(len(every), 29, orders)
+            self.assertEqual(len(set(row["id"] for row in every)), 29, orders)
+
+
 class TestINSERT(unittest.TestCase):
 
     maxDiff = None
@@ -259,6 +471,181 @@ FROM
 
         self.assertRaisesRegex(relations_sql.SQLError, "set VALUES or SELECT but not both", query.generate)
 
+    def test_limit(self):
+
+        connection = unittest.mock.MagicMock()
+        connection.getlimit.return_value = 500
+
+        self.assertEqual(INSERT.limit(connection), 500)
+        connection.getlimit.assert_called_once_with(9)
+
+        self.assertEqual(INSERT.limit(None), 999)
+
+    def test_chunks(self):
+
+        query = INSERT("people").OPTIONS("OR IGNORE").VALUES(stuff=1, things=2).VALUES(3, 4).VALUES(5, 6)
+
+        chunks = list(query.chunks(variables=5))
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual(chunks[0].sql, "INSERT OR IGNORE INTO `people` (`stuff`,`things`) VALUES (?,?),(?,?)")
+        self.assertEqual(chunks[0].args, [1, 2, 3, 4])
+        self.assertEqual(chunks[1].sql, "INSERT OR IGNORE INTO `people` (`stuff`,`things`) VALUES (?,?)")
+        self.assertEqual(chunks[1].args, [5, 6])
+
+        chunks = list(query.chunks(rows=1))
+        self.assertEqual([chunk.sql for chunk in chunks], ["INSERT OR IGNORE INTO `people` (`stuff`,`things`) VALUES (?,?)"] * 3)
+        self.assertEqual([chunk.args for chunk in chunks], [[1, 2], [3, 4], [5, 6]])
+
+        chunks = list(query.chunks())
+        self.assertEqual(len(chunks), 1)
+        self.assertEqual(chunks[0].args, [1, 2, 3, 4, 5, 6])
+
+        self.assertRaisesRegex(relations_sql.SQLError, "2 values over 1 variables", list, query.chunks(variables=1))
+
+        query = INSERT("people")
+        query.SELECT("stuff").FROM("things")
+
+        chunks = list(query.chunks(variables=1))
+        self.assertEqual([chunk.sql for chunk in chunks], ["INSERT INTO `people` SELECT `stuff` FROM `things`"])
+
+        query = INSERT("people").VALUES(stuff=1, things=2).VALUES(3, 4).ON_CONFLICT("stuff", things=0)
+
+        self.assertEqual(len(list(query.chunks(variables=5))), 1)
+
+        chunks = list(query.chunks(variables=4))
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual(chunks[0].sql, "INSERT INTO `people` (`stuff`,`things`) VALUES (?,?) ON CONFLICT (`stuff`) DO UPDATE SET `things`=?")
+        self.assertEqual([chunk.args for chunk in chunks], [[1, 2, 0], [3, 4, 0]])
+
+
+    def test_many(self):
+
+        query = INSERT("people").OPTIONS("OR IGNORE").many(iter([{"stuff": 1, "things": {"a": 1}}, {"stuff": 2, "things": [2]}]))
+
+        query.generate()
+        self.assertEqual(query.sql, "INSERT OR IGNORE INTO `people` (`stuff`,`things`) VALUES (?,json_extract(?,'$'))")
+        self.assertEqual(list(query.args), [(1, '{"a": 1}'), (2, '[2]')])
+
+        query = INSERT("people", "stuff", "things").many((row, row * 2) for row in range(3))
+
+        query.generate(indent=2)
+        self.assertEqual(query.sql, """INSERT
+INTO
+  `people`
+  (
+    `stuff`,
+    `things`
+  )
+VALUES
+  (
+    ?,
+    ?
+  )""")
+
+        query.generate()
+        self.assertEqual(query.sql, "INSERT INTO `people` (`stuff`,`things`) VALUES (?,?)")
+        self.assertEqual(list(query.args), [(0, 0), (1, 2), (2, 4)])
+
+        query = INSERT("people").many([
+            {"stuff": 1, "things": None}, {"stuff": 2, "things": {"a": 1}}, {"stuff": 3, "things": "abc"}
+        ], JSON=["things"])
+
+        query.generate()
+        self.assertEqual(query.sql, "INSERT INTO `people` (`stuff`,`things`) VALUES (?,json_extract(?,'$'))")
+
+        connection = sqlite3.connect(":memory:")
+        connection.execute("CREATE TABLE `people` (`stuff` INTEGER, `things` TEXT)")
+        connection.executemany(query.sql, query.args)
+        self.assertEqual(connection.execute("SELECT * FROM `people` ORDER BY `stuff`").fetchall(), [(1, None), (2, '{"a":1}'), (3, "abc")])
+        connection.close()
+
+        query = INSERT("people", "stuff").many([[1]])
+        query.SELECT("stuff").FROM("things")
+
+        self.assertRaisesRegex(relations_sql.SQLError, "set VALUES or SELECT but not both", query.generate)
+
+        query = INSERT("people", "stuff").many([[1]])
+        query.OPTIONS(relations_sql.SQL("nope", ["nope"]))
+
+        self.assertRaisesRegex(relations_sql.SQLError, "only VALUES can have args for many", query.generate)
+
+        query = INSERT("people").many([{"stuff": 1, "things": 2}, {"stuff": 3, "things": 4}]).ON_CONFLICT("stuff", EXCLUDED=["things"], count=0)
+
+        query.generate()
+        self.assertEqual(query.sql,
+            "INSERT INTO `people` (`stuff`,`things`) VALUES (?,?) "
+            "ON CONFLICT (`stuff`) DO UPDATE SET `things`=`excluded`.`things`,`count`=?"
+        )
+        self.assertEqual(list(query.args), [(1, 2, 0), (3, 4, 0)])
+
+    def test_on_conflict(self):
+
+        query = INSERT("people").VALUES(stuff=1, things=2).VALUES(3, 4).ON_CONFLICT()
+
+        query.generate()
+        self.assertEqual(query.sql, "INSERT INTO `people` (`stuff`,`things`) VALUES (?,?),(?,?) ON CONFLICT DO NOTHING")
+        self.assertEqual(query.args, [1, 2, 3, 4])
+
+        query = INSERT("people", ON_CONFLICT=["stuff"])
+        query.SELECT("stuff").FROM("things")
+
+        self.assertRaisesRegex(relations_sql.SQLError, "SELECT needs a WHERE for ON CONFLICT to parse", query.generate)
+
+        query.SELECT.WHERE(things__gt=0)
+
+        query.generate()
+        self.assertEqual(query.sql, "INSERT INTO `people` SELECT `stuff` FROM `things` WHERE `things`>? ON CONFLICT (`stuff`) DO NOTHING")
+        self.assertEqual(query.args, [0])
+
+        connection = sqlite3.connect(":memory:")
+        connection.execute("CREATE TABLE `people` (`stuff` INTEGER PRIMARY KEY, `things` INTEGER, `count` INTEGER DEFAULT 0)")
+
+        def execute(query):
+            query.generate()
+            if query.VALUES.rows is not None:
+                connection.executemany(query.sql, query.args)
+            else:
+                connection.execute(query.sql, query.args)
+            return connection.execute("SELECT * FROM `people` ORDER BY `stuff`").fetchall()
+
+        self.assertEqual(execute(INSERT("people").VALUES(stuff=1, things=2).VALUES(3, 4)), [(1, 2, 0), (3, 4, 0)])
+
+        self.assertEqual(execute(INSERT("people").VALUES(stuff=1, things=5).VALUES(5, 6).ON_CONFLICT()), [(1, 2, 0), (3, 4, 0), (5, 6, 0)])
+
+        query = INSERT("people").many([{"stuff": 3, "things": 7}, {"stuff": 7, "things": 8}])
+        query.ON_CONFLICT("stuff", EXCLUDED=["things"], count=relations_sql.SQL("`count`+1"))
+
+        self.assertEqual(execute(query), [(1, 2, 0), (3, 7, 1), (5, 6, 0), (7, 8, 0)])
+
+        query = INSERT("people").VALUES(stuff=5, things=9).ON_CONFLICT("stuff", things=EXCLUDED("stuff"), count=2)
+
+        self.assertEqual(execute(query), [(1, 2, 0), (3, 7, 1), (5, 5, 2), (7, 8, 0)])
+
+    def test_returning(self):
+
+        query = INSERT("people").VALUES(stuff=1, things=2).ON_CONFLICT().RETURNING("id", total="count")
+
+        query.generate()
+        self.assertEqual(query.sql,
+            "INSERT INTO `people` (`stuff`,`things`) VALUES (?,?) ON CONFLICT DO NOTHING RETURNING `id`,`count` AS `total`"
+        )
+        self.assertEqual(query.args, [1, 2])
+
+        query = INSERT("people").many([{"stuff": 1}]).RETURNING("id")
+
+        query.generate()
+        self.assertEqual(query.sql, "INSERT INTO `people` (`stuff`) VALUES (?) RETURNING `id`")
+
+        connection = sqlite3.connect(":memory:")
+        connection.execute("CREATE TABLE `people` (`id` INTEGER PRIMARY KEY, `stuff` INTEGER, `count` INTEGER DEFAULT 3)")
+
+        query = INSERT("people").VALUES(stuff=1).VALUES(2).RETURNING("id", "count")
+        query.generate()
+        self.assertEqual(connection.execute(query.sql, query.args).fetchall(), [(1, 3), (2, 3)])
+
+        with unittest.mock.patch.object(RETURNING, "VERSION", (3, 34, 0)):
+            self.assertRaisesRegex(relations_sql.SQLError, "RETURNING needs sqlite 3.35.0 or later", query.generate)
+
 
 class TestUPDATE(unittest.TestCase):
 
@@ -316,6 +703,22 @@ LIMIT ?""")
 
         self.assertRaisesRegex(relations_sql.SQLError, "LIMIT can only be total", query.generate)
 
+    def test_returning(self):
+
+        query = UPDATE("people").SET(stuff="things").WHERE(things="stuff").RETURNING("*").ORDER_BY("yin").LIMIT(5)
+
+        query.generate()
+        self.assertEqual(query.sql, """UPDATE `people` SET `stuff`=? WHERE `things`=? RETURNING * ORDER BY `yin` LIMIT ?""")
+        self.assertEqual(query.args, ["things", "stuff", 5])
+
+        connection = sqlite3.connect(":memory:")
+        connection.execute("CREATE TABLE `people` (`id` INTEGER PRIMARY KEY, `stuff` TEXT)")
+        connection.execute("INSERT INTO `people` (`stuff`) VALUES ('a'),('b')")
+
+        query = UPDATE("people").SET(stuff="c").WHERE(id=2).RETURNING("id", "stuff")
+        query.generate()
+        self.assertEqual(connection.execute(query.sql, query.args).fetchall(), [(2, "c")])
+
 
 class TestDELETE(unittest.TestCase):
 
@@ -369,3 +772,198 @@ LIMIT ?""")
         query.LIMIT(10)
 
         self.assertRaisesRegex(relations_sql.SQLError, "LIMIT can only be total", query.generate)
+
+    def test_returning(self):
+
+        query = DELETE("people").WHERE(things="stuff").RETURNING("id", stuff="things")
+
+        query.generate()
+        self.assertEqual(query.sql, """DELETE FROM `people` WHERE `things`=? RETURNING `id`,`things` AS `stuff`""")
+        self.assertEqual(query.args, ["stuff"])
+
+        connection = sqlite3.connect(":memory:")
+        connection.execute("CREATE TABLE `people` (`id` INTEGER PRIMARY KEY, `stuff` TEXT)")
+        connection.execute("INSERT INTO `people` (`stuff`) VALUES ('a'),('b')")
+
+        query = DELETE("people").WHERE(id__gt=0).RETURNING("stuff")
+        query.generate()
+        self.assertEqual(connection.execute(query.sql, query.args).fetchall(), [("a",), ("b",)])
+
+
+class TestPRAGMA(unittest.TestCase):
+
+    maxDiff = None
+
+    def test___init__(self):
+
+        pragma = PRAGMA("cache_size", -2000, schema="unit")
+
+        self.assertEqual(pragma.name, "cache_size")
+        self.assertEqual(pragma.value, -2000)
+        self.assertEqual(pragma.schema, "unit")
+
+        self.assertRaisesRegex(relations_sql.SQLError, "invalid pragma cache_size=1; DROP", PRAGMA, "cache_size=1; DROP")
+
+    def test_literal(self):
+
+        pragma = PRAGMA("journal_mode")
+
+        self.assertEqual(pragma.literal(True), "ON")
+        self.assertEqual(pragma.literal(False), "OFF")
+        self.assertEqual(pragma.literal(5000), "5000")
+        self.assertEqual(pragma.literal("WAL"), "WAL")
+        self.assertEqual(pragma.literal("it's"), "'it''s'")
+
+    def test_generate(self):
+
+        pragma = PRAGMA("journal_mode")
+
+        pragma.generate()
+        self.assertEqual(pragma.sql, """PRAGMA `journal_mode`""")
+        self.assertEqual(pragma.args, [])
+
+        pragma = PRAGMA("journal_mode", "WAL", schema="unit")
+
+        pragma.generate()
+        self.assertEqual(pragma.sql, """PRAGMA `unit`.`journal_mode`=WAL""")
+
+        pragma = PRAGMA("busy_timeout", 5000, schema="unit")
+
+        pragma.generate()
+        self.assertEqual(pragma.sql, """PRAGMA `busy_timeout`=5000""")
+
+    def test_preset(self):
+
+        pragmas = PRAGMA.preset("durable", schema="test")
+
+        for pragma in pragmas:
+            pragma.generate()
+
+        self.assertEqual([pragma.sql for pragma in pragmas], [
+            """PRAGMA `test`.`journal_mode`=WAL""",
+            """PRAGMA `test`.`synchronous`=FULL""",
+            """PRAGMA `busy_timeout`=5000"""
+        ])
+
+        pragmas = PRAGMA.preset({"foreign_keys": True})
+
+        pragmas[0].generate()
+        self.assertEqual(pragmas[0].sql, """PRAGMA `foreign_keys`=ON""")
+
+        self.assertRaisesRegex(relations_sql.SQLError, "unknown preset nope", PRAGMA.preset, "nope")
+
+    def test_apply(self):
+
+        connection = sqlite3.connect(":memory:")
+        connection.execute("ATTACH DATABASE ':memory:' AS `unit`")
+
+        self.assertEqual(PRAGMA.apply(connection, "bulk-load", schema="unit"), {
+            "journal_mode": "memory",
+            "synchronous": "OFF",
+            "cache_size": -262144,
+            "temp_store": "MEMORY"
+        })
+
+        self.assertEqual(connection.execute("PRAGMA `unit`.`cache_size`").fetchone()[0], -262144)
+        self.assertEqual(connection.execute("PRAGMA `main`.`cache_size`").fetchone()[0], -2000)
+        self.assertEqual(connection.execute("PRAGMA `temp_store`").fetchone()[0], 2)
+
+
+class TestCACHE(unittest.TestCase):
+
+    maxDiff = None
+
+    def test_generate(self):
+
+        cache = CACHE(size=2)
+
+        query = SELECT("*").FROM("people").WHERE(stuff__gt=1, things__a__b="yep", name__in=["tom", "mary"])
+
+        cache.generate(query)
+        self.assertEqual(query.sql, """SELECT * FROM `people` WHERE `name` IN (?,?) AND `stuff`>? AND json_extract(`things`,'$.a.b')=?""")
+        self.assertEqual(query.args, ["tom", "mary", 1, "yep"])
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (0, 1, 1))
+
+        query = SELECT("*").FROM("people").WHERE(stuff__gt=2, things__a__b="nope", name__in=["dick", "harry"])
+
+        cache.generate(query)
+        self.assertEqual(query.sql, """SELECT * FROM `people` WHERE `name` IN (?,?) AND `stuff`>? AND json_extract(`things`,'$.a.b')=?""")
+        self.assertEqual(query.args, ["dick", "harry", 2, "nope"])
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (1, 1, 1))
+
+        query = SELECT("*").FROM("people").WHERE(stuff__gt=2, things__a__c="nope", name__in=["dick", "harry", "tom"])
+
+        cache.generate(query)
+        self.assertEqual(query.sql, """SELECT * FROM `people` WHERE `name` IN (?,?,?) AND `stuff`>? AND json_extract(`things`,'$.a.c')=?""")
+        self.assertEqual(query.args, ["dick", "harry", "tom", 2, "nope"])
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (1, 2, 2))
+
+        query = SELECT("*").FROM("people").WHERE(stuff__null=True, things__has=[1, 2])
+
+        cache.generate(query)
+        self.assertEqual(query.sql, """SELECT * FROM `people` WHERE `stuff` IS NULL AND (NOT (SELECT COUNT(*) FROM json_each(json_extract(?,'$')) as l LEFT JOIN json_each(`things`) as r ON l.value=r.value WHERE r.value IS NULL))""")
+        self.assertEqual(query.args, ['[1, 2]'])
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (1, 3, 2))
+
+        query = SELECT("*").FROM("people").WHERE(stuff__null=False, things__has=[3])
+
+        cache.generate(query)
+        self.assertEqual(query.sql, """SELECT * FROM `people` WHERE `stuff` IS NOT NULL AND (NOT (SELECT COUNT(*) FROM json_each(json_extract(?,'$')) as l LEFT JOIN json_each(`things`) as r ON l.value=r.value WHERE r.value IS NULL))""")
+        self.assertEqual(query.args, ['[3]'])
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (1, 4, 2))
+
+        query = SELECT("*").FROM("people").WHERE(stuff__gt=3, things__a__b="maybe", name__in=["sally", "sue"])
+
+        cache.generate(query)
+        self.assertEqual(query.args, ["sally", "sue", 3, "maybe"])
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (1, 5, 2))
+
+        query = UPDATE("people").SET(stuff="things").WHERE(things="stuff").LIMIT(5)
+
+        cache.generate(query, indent=2)
+        query = UPDATE("people").SET(stuff="thangs").WHERE(things="stiff").LIMIT(6)
+
+        cache.generate(query, indent=2)
+        self.assertEqual(query.sql, """UPDATE
+  `people`
+SET
+  `stuff`=?
+WHERE
+  `things`=?
+LIMIT ?""")
+        self.assertEqual(query.args, ["thangs", "stiff", 6])
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (2, 6, 2))
+
+        cache.generate(query)
+        self.assertEqual(query.sql, """UPDATE `people` SET `stuff`=? WHERE `things`=? LIMIT ?""")
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (2, 7, 2))
+
+        query = INSERT("people").VALUES(stuff=1, things={"a": 1}).VALUES(3, [4])
+
+        cache.generate(query)
+        query = INSERT("people").VALUES(stuff=5, things={"b": 2}).VALUES(6, [7])
+
+        cache.generate(query)
+        self.assertEqual(query.sql, """INSERT INTO `people` (`stuff`,`things`) VALUES (?,json_extract(?,'$')),(?,json_extract(?,'$'))""")
+        self.assertEqual(query.args, [5, '{"b": 2}', 6, '[7]'])
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (3, 8, 2))
+
+        cache.clear()
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (0, 0, 0))
+
+        query = SELECT("*").FROM("people").WHERE(stuff__in=list(range(150)))
+
+        cache.generate(query)
+        query = SELECT("*").FROM("people").WHERE(stuff__in=list(range(250)))
+
+        cache.generate(query)
+        self.assertEqual(query.sql, """SELECT * FROM `people` WHERE `stuff` IN (SELECT +value FROM json_each(?))""")
+        self.assertEqual(query.args, [json.dumps(list(range(250)))])
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (1, 1, 1))
+
+        query = INSERT("people", "stuff", "things").many(iter([(1, "a"), (2, "b")]))
+
+        cache.generate(query)
+        self.assertEqual(query.sql, """INSERT INTO `people` (`stuff`,`things`) VALUES (?,?)""")
+        self.assertEqual(list(query.args), [(1, "a"), (2, "b")])
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (1, 2, 1))
@@ -1,6 +1,8 @@
 import unittest
 import unittest.mock
 
+import sqlite3
+
 from relations_sqlite import *
 
 
@@ -16,6 +18,12 @@ class TestSQL(unittest.TestCase):
         self.assertEqual(SQL.PLACEHOLDER, """?""")
         self.assertEqual(SQL.JSONIFY, """json_extract(%s,'$')""")
         self.assertEqual(SQL.PATH, """json_extract(%s,%s)""")
+        self.assertEqual(SQL.VERSION, sqlite3.sqlite_version_info)
+
+    def test_str(self):
+
+        self.assertEqual(SQL().str("$.a"), """'$.a'""")
+        self.assertEqual(SQL().str("$.a'b"), """'$.a''b'""")
 
     def test_walk(self):
 
@@ -1,6 +1,8 @@
 import unittest
 import unittest.mock
 
+import sqlite3
+
 import relations
 from relations_sqlite import *
 
@@ -58,6 +60,163 @@ CREATE INDEX `meta_spend` ON `meta` (`spend`);
 CREATE UNIQUE INDEX `meta_name` ON `meta` (`name`);
 """)
 
+        with unittest.mock.patch.object(TABLE, "STORED", True), unittest.mock.patch.object(TABLE, "EXTRACTED", True):
+
+            ddl.create(indent=2)
+            self.assertEqual(ddl.sql, """CREATE TABLE IF NOT EXISTS `meta` (
+  `id` INTEGER PRIMARY KEY,
+  `name` TEXT NOT NULL,
+  `flag` INTEGER,
+  `spend` REAL,
+  `people` TEXT NOT NULL,
+  `stuff` TEXT NOT NULL,
+  `things` TEXT NOT NULL,
+  `things__for__0____1` TEXT AS (json_extract(`things`,'$.for[0]."1"')) STORED
+);
+
+CREATE INDEX `meta_spend` ON `meta` (`spend`);
+
+CREATE INDEX `meta_things__for__0____1` ON `meta` (`things__for__0____1`);
+
+CREATE UNIQUE INDEX `meta_name` ON `meta` (`name`);
+""")
+            self.assertNotIn("things__for__0____1", ddl.migration["index"])
+
+        ddl = TABLE(
+            name="meta",
+            fields=Meta.thy().define()["fields"],
+            index={"deep": ["things__for__0____1", "things__for__1"], "flag": ["flag"]}
+        )
+        ddl.args = []
+
+        ddl.create()
+        self.assertEqual(ddl.sql.split(";\n\n")[1:3], [
+            """CREATE INDEX `meta_deep` ON `meta` (`things__for__0____1`,json_extract(`things`,'$.for[1]'))""",
+            """CREATE INDEX `meta_flag` ON `meta` (`flag`);\n"""
+        ])
+
+    def test_extracted(self):
+
+        ddl = TABLE(**Meta.thy().define())
+
+        self.assertEqual(ddl.extracted(ddl.migration), {})
+
+        with unittest.mock.patch.object(TABLE, "EXTRACTED", True):
+            self.assertEqual(ddl.extracted(ddl.migration), {"things__for__0____1": ["things__for__0____1"]})
+
+    def test_target(self):
+
+        ddl = TABLE(
+            migration={
+                "fields": {
+                    "change": {"things": {"store": "thingies"}},
+                    "remove": ["flag"],
+                    "add": [{"name": "extra", "store": "extra", "kind": "str", "none": True}]
+                },
+                "index": {"add": {"extra": ["extra"]}, "rename": {"deep": "deeper"}}
+            },
+            definition={
+                "name": "yep",
+                "fields": Meta.thy().define()["fields"],
+                "index": {"deep": ["things__a__b"]}
+            }
+        )
+
+        migration, renames = ddl.target()
+        self.assertEqual([field["store"] for field in migration["fields"]], ["id", "name", "spend", "people", "stuff", "thingies", "extra"])
+        self.assertEqual(migration["index"], {"deeper": ["thingies__a__b"], "extra": ["extra"]})
+        self.assertEqual(renames["thingies"], "things")
+
+    def test_alter(self):
+
+        definition = {
+            "name": "yep",
+            "fields": Meta.thy().define()["fields"],
+            "index": {"deep": ["things__a__b"], "spend": ["spend"]},
+            "unique": Meta.thy().define()["unique"]
+        }
+
+        ddl = TABLE(
+            migration={
+                "fields": {
+                    "change": {"things": {"name": "thingies", "store": "thingies"}},
+                    "add": [
+                        {"name": "extra", "store": "extra", "kind": "str", "none": True},
+                        {"name": "count", "store": "count", "kind": "int", "none": False, "default": 0},
+                        {"name": "meta", "store": "meta", "kind": "dict", "none": True, "extract": {"x": "int"}}
+                    ]
+                },
+                "index": {"rename": {"spend": "spent"}}
+            },
+            definition=definition
+        )
+
+        ddl.generate(indent=2)
+        self.assertEqual(ddl.sql, """DROP INDEX `yep_spend`;
+
+ALTER TABLE `yep` RENAME `things` TO `thingies`;
+
+ALTER TABLE `yep` RENAME `things__for__0____1` TO `thingies__for__0____1`;
+
+ALTER TABLE `yep` ADD `extra` TEXT;
+
+ALTER TABLE `yep` ADD `count` INTEGER NOT NULL DEFAULT 0;
+
+ALTER TABLE `yep` ADD `meta` TEXT;
+
+ALTER TABLE `yep` ADD `meta__x` INTEGER AS (json_extract(`meta`,'$.x'));
+
+CREATE INDEX `yep_spent` ON `yep` (`spend`);
+""")
+
+        ddl = TABLE(
+            migration={
+                "fields": {"remove": ["things", "flag"]},
+                "index": {"remove": ["deep"]}
+            },
+            definition=definition
+        )
+
+        ddl.generate()
+        self.assertEqual(ddl.sql.split(";\n\n"), [
+            "DROP INDEX `yep_deep`",
+            "ALTER TABLE `yep` DROP `things__for__0____1`",
+            "ALTER TABLE `yep` DROP `things`",
+            "ALTER TABLE `yep` DROP `flag`;\n"
+        ])
+
+        ddl = TABLE(migration={"name": "yep"}, definition=definition)
+
+        ddl.generate()
+        self.assertEqual(ddl.sql, "")
+
+        for migration in [
+            {"fields": {"add": [{"name": "extra", "store": "extra", "kind": "str", "none": False}]}},
+            {"fields": {"add": [{"name": "key", "store": "key", "kind": "int", "auto": True}]}},
+            {"fields": {"add": [{"name": "meta", "store": "meta", "kind": "dict", "none": True, "stored": True, "extract": {"x": "int"}}]}},
+            {"fields": {"change": {"flag": {"default": True}}}},
+            {"fields": {"remove": ["id"]}},
+            {"schema": "other"}
+        ]:
+            ddl = TABLE(migration=migration, definition=definition)
+            ddl.generate()
+            self.assertIn("RENAME TO `_old_yep`;", ddl.sql.split("\n")[0], migration)
+
+        with unittest.mock.patch.object(TABLE, "VERSION", (3, 24, 0)):
+            ddl = TABLE(migration={"fields": {"change": {"flag": {"store": "flags"}}}}, definition=definition)
+            ddl.generate()
+            self.assertTrue(ddl.sql.startswith("ALTER TABLE `yep` RENAME TO `_old_yep`"))
+
+        with unittest.mock.patch.object(TABLE, "VERSION", (3, 34, 0)):
+            ddl = TABLE(migration={"fields": {"remove": ["flag"]}}, definition=definition)
+            ddl.generate()
+            self.assertTrue(ddl.sql.startswith("ALTER TABLE `yep` RENAME TO `_old_yep`"))
+
+        with unittest.mock.patch.object(TABLE, "VERSION", (3, 35, 0)):
+            ddl = TABLE(migration={"fields": {"remove": ["flag"]}}, definition=definition)
+            ddl.generate()
+            self.assertEqual(ddl.sql, "ALTER TABLE `yep` DROP `flag`;\n")
+
     def test_modify(self):
 
         ddl = TABLE(
@@ -81,7 +240,7 @@ DROP INDEX `scheming`.`evil_spend`;
 
 DROP INDEX `scheming`.`evil_name`;
 
-CREATE TABLE IF NOT EXISTS `dreaming`.`good` (
+CREATE TABLE IF NOT EXISTS `dreaming`.`_new_good` (
   `id` INTEGER PRIMARY KEY,
   `name` TEXT NOT NULL,
   `flag` INTEGER,
@@ -92,13 +251,9 @@ CREATE TABLE IF NOT EXISTS `dreaming`.`good` (
   `things__for__0____1` TEXT AS (json_extract(`things`,'$.for[0]."1"'))
 );
 
-CREATE INDEX `dreaming`.`good_spend` ON `good` (`spend`);
-
-CREATE UNIQUE INDEX `dreaming`.`good_name` ON `good` (`name`);
-
 INSERT
 INTO
-  `dreaming`.`good`
+  `dreaming`.`_new_good`
   (
     `flag`,
     `id`,
@@ -119,6 +274,12 @@ SELECT
 FROM
   `scheming`.`_old_evil`;
 
+ALTER TABLE `dreaming`.`_new_good` RENAME TO `good`;
+
+CREATE INDEX `dreaming`.`good_spend` ON `good` (`spend`);
+
+CREATE UNIQUE INDEX `dreaming`.`good_name` ON `good` (`name`);
+
 DROP TABLE `scheming`.`_old_evil`;
 """)
         self.assertEqual(ddl.args, [])
@@ -137,18 +298,16 @@ DROP TABLE `scheming`.`_old_evil`;
 
 DROP INDEX `simple_name`;
 
-CREATE TABLE IF NOT EXISTS `simple` (
+CREATE TABLE IF NOT EXISTS `_new_simple` (
   `id` INTEGER,
   `name` TEXT NOT NULL,
   `things` TEXT NOT NULL,
   `things__for__0____1` TEXT AS (json_extract(`things`,'$.for[0]."1"'))
 );
 
-CREATE UNIQUE INDEX `simple_name` ON `simple` (`name`);
-
 INSERT
 INTO
-  `simple`
+  `_new_simple`
   (
     `id`,
     `name`
@@ -159,6 +318,10 @@ SELECT
 FROM
   `_old_simple`;
 
+ALTER TABLE `_new_simple` RENAME TO `simple`;
+
+CREATE UNIQUE INDEX `simple_name` ON `simple` (`name`);
+
 DROP TABLE `_old_simple`;
 """)
         self.assertEqual(ddl.args, [])
@@ -201,7 +364,7 @@ DROP INDEX `yep_spend`;
 
 DROP INDEX `yep_name`;
 
-CREATE TABLE IF NOT EXISTS `yep` (
+CREATE TABLE IF NOT EXISTS `_new_yep` (
   `id` INTEGER PRIMARY KEY,
   `name` TEXT NOT NULL,
   `flag` INTEGER,
@@ -214,7 +377,7 @@ CREATE TABLE IF NOT EXISTS `yep` (
 
 INSERT
 INTO
-  `yep`
+  `_new_yep`
   (
     `flag`,
     `id`,
@@ -235,6 +398,8 @@ SELECT
 FROM
   `_old_yep`;
 
+ALTER TABLE `_new_yep` RENAME TO `yep`;
+
 DROP TABLE `_old_yep`;
 """)
         self.assertEqual(ddl.args, [])
@@ -277,7 +442,7 @@ DROP INDEX `yep_spend`;
 
 DROP INDEX `yep_name`;
 
-CREATE TABLE IF NOT EXISTS `yep` (
+CREATE TABLE IF NOT EXISTS `_new_yep` (
   `id` INTEGER PRIMARY KEY,
   `name` TEXT NOT NULL,
   `flag` INTEGER,
@@ -288,13 +453,9 @@ CREATE TABLE IF NOT EXISTS `yep` (
   `thingies__for__0____1` TEXT AS (json_extract(`thingies`,'$.for[0]."1"'))
 );
 
-CREATE INDEX `yep_spoon` ON `yep` (`spend`);
-
-CREATE UNIQUE INDEX `yep_label` ON `yep` (`name`);
-
 INSERT
 INTO
-  `yep`
+  `_new_yep`
   (
     `flag`,
     `id`,
@@ -315,6 +476,12 @@ SELECT
 FROM
   `_old_yep`;
 
+ALTER TABLE `_new_yep` RENAME TO `yep`;
+
+CREATE INDEX `yep_spoon` ON `yep` (`spend`);
+
+CREATE UNIQUE INDEX `yep_label` ON `yep` (`name`);
+
 DROP TABLE `_old_yep`;
 """)
         self.assertEqual(ddl.args, [])
@@ -334,10 +501,11 @@ DROP TABLE `_old_yep`;
             }
         )
 
-        ddl.generate(indent=2)
+        with unittest.mock.patch.object(TABLE, "VERSION", (3, 34, 0)):
+            ddl.generate(indent=2)
         self.assertEqual(ddl.sql, """ALTER TABLE `yep` RENAME TO `_old_yep`;
 
-CREATE TABLE IF NOT EXISTS `yep` (
+CREATE TABLE IF NOT EXISTS `_new_yep` (
   `id` INTEGER PRIMARY KEY,
   `name` TEXT NOT NULL,
   `flag` INTEGER,
@@ -348,7 +516,7 @@ CREATE TABLE IF NOT EXISTS `yep` (
 
 INSERT
 INTO
-  `yep`
+  `_new_yep`
   (
     `flag`,
     `id`,
@@ -367,6 +535,8 @@ SELECT
 FROM
   `_old_yep`;
 
+ALTER TABLE `_new_yep` RENAME TO `yep`;
+
 DROP TABLE `_old_yep`;
 """)
         self.assertEqual(ddl.args, [])
@@ -386,10 +556,11 @@ DROP TABLE `_old_yep`;
             }
         )
 
-        ddl.generate(indent=2)
+        with unittest.mock.patch.object(TABLE, "VERSION", (3, 34, 0)):
+            ddl.generate(indent=2)
         self.assertEqual(ddl.sql, """ALTER TABLE `yep` RENAME TO `_old_yep`;
 
-CREATE TABLE IF NOT EXISTS `yep` (
+CREATE TABLE IF NOT EXISTS `_new_yep` (
   `id` INTEGER PRIMARY KEY,
   `name` TEXT NOT NULL,
   `flag` INTEGER,
@@ -400,7 +571,7 @@ CREATE TABLE IF NOT EXISTS `yep` (
 
 INSERT
 INTO
-  `yep`
+  `_new_yep`
   (
     `flag`,
     `id`,
@@ -419,6 +590,8 @@ SELECT
 FROM
   `_old_yep`;
 
+ALTER TABLE `_new_yep` RENAME TO `yep`;
+
 DROP TABLE `_old_yep`;
 """)
         self.assertEqual(ddl.args, [])
@@ -450,61 +623,246 @@ DROP TABLE `_old_yep`;
         )
 
         ddl.generate(indent=2)
-        self.assertEqual(ddl.sql, """ALTER TABLE `yep` RENAME TO `_old_yep`;
+        self.assertEqual(ddl.sql, """DROP INDEX `yep_name`;
 
-DROP INDEX `yep_spend`;
+CREATE INDEX `yep_flag` ON `yep` (`flag`);
 
-DROP INDEX `yep_name`;
+CREATE UNIQUE INDEX `yep_flag` ON `yep` (`flag`);
+""")
+        self.assertEqual(ddl.args, [])
 
-CREATE TABLE IF NOT EXISTS `yep` (
-  """ """
-);
+        ddl.generate(indent=2)
+        self.assertEqual(ddl.sql, """DROP INDEX `yep_name`;
 
 CREATE INDEX `yep_flag` ON `yep` (`flag`);
 
-CREATE INDEX `yep_spend` ON `yep` (`spend`);
-
 CREATE UNIQUE INDEX `yep_flag` ON `yep` (`flag`);
-
-INSERT
-INTO
-  `yep`
-SELECT
-FROM
-  `_old_yep`;
-
-DROP TABLE `_old_yep`;
 """)
+
         self.assertEqual(ddl.args, [])
 
-        ddl.generate(indent=2)
-        self.assertEqual(ddl.sql, """ALTER TABLE `yep` RENAME TO `_old_yep`;
+        with unittest.mock.patch.object(TABLE, "EXTRACTED", True):
 
-DROP INDEX `yep_spend`;
+            ddl = TABLE(
+                migration={
+                    "name": "good"
+                },
+                definition={
+                    "name": "evil",
+                    "fields": Meta.thy().define()["fields"],
+                    "index": Meta.thy().define()["index"],
+                    "unique": Meta.thy().define()["unique"]
+                }
+            )
+
+            ddl.generate()
+            self.assertEqual(ddl.sql.split(";\n\n"), [
+                "DROP INDEX `evil_things__for__0____1`",
+                "DROP INDEX `evil_spend`",
+                "DROP INDEX `evil_name`",
+                "ALTER TABLE `evil` RENAME TO `good`",
+                "CREATE INDEX `good_spend` ON `good` (`spend`)",
+                "CREATE INDEX `good_things__for__0____1` ON `good` (`things__for__0____1`)",
+                "CREATE UNIQUE INDEX `good_name` ON `good` (`name`);\n"
+            ])
+
+            ddl = TABLE(
+                migration={
+                    "fields": {
+                        "change": {
+                            "flag": {"kind": "int"}
+                        }
+                    }
+                },
+                definition={
+                    "name": "evil",
+                    "fields": Meta.thy().define()["fields"],
+                    "index": Meta.thy().define()["index"],
+                    "unique": Meta.thy().define()["unique"]
+                }
+            )
 
-DROP INDEX `yep_name`;
+            ddl.generate()
+            self.assertEqual(ddl.sql.split(";\n\n")[:4], [
+                "ALTER TABLE `evil` RENAME TO `_old_evil`",
+                "DROP INDEX `evil_things__for__0____1`",
+                "DROP INDEX `evil_spend`",
+                "DROP INDEX `evil_name`"
+            ])
+            self.assertIn("CREATE INDEX `evil_things__for__0____1` ON `evil` (`things__for__0____1`)", ddl.sql)
 
-CREATE TABLE IF NOT EXISTS `yep` (
-  """ """
-);
+        with unittest.mock.patch.object(TABLE, "ANALYZE", True):
+            ddl = TABLE(migration={"fields": {"change": {"name": {"default": "none"}}}}, definition=Simple.thy().define())
+            ddl.generate()
+            self.assertTrue(ddl.sql.endswith("CREATE UNIQUE INDEX `simple_name` ON `simple` (`name`);\n\nDROP TABLE `_old_simple`;\n\nANALYZE `simple`;\n"))
 
-CREATE INDEX `yep_flag` ON `yep` (`flag`);
+    def test_execute(self):
 
-CREATE INDEX `yep_spend` ON `yep` (`spend`);
+        connection = sqlite3.connect(":memory:")
 
-CREATE UNIQUE INDEX `yep_flag` ON `yep` (`flag`);
+        definition = Simple.thy().define()
 
-INSERT
-INTO
-  `yep`
-SELECT
-FROM
-  `_old_yep`;
+        ddl = TABLE(migration=definition)
+        ddl.args = []
+        ddl.create()
+        connection.executescript(ddl.sql)
 
-DROP TABLE `_old_yep`;
-""")
+        connection.executemany("INSERT INTO `simple` (`id`, `name`) VALUES (?, ?)", [(id, f"n{id}") for id in range(6)])
+        connection.execute("DELETE FROM `simple` WHERE `id`=2")
+        connection.commit()
 
-        self.assertEqual(ddl.args, [])
+        rows = connection.execute("SELECT rowid, `id`, `name` FROM `simple` ORDER BY rowid").fetchall()
+
+        migration = {"fields": {"change": {"name": {"default": "none"}}}}
+
+        progress = []
+
+        ddl = TABLE(migration=migration, definition=definition)
+        ddl.execute(connection, rows=2, progress=lambda done, total: progress.append((done, total)))
+
+        self.assertEqual(progress, [(2, 5), (4, 5), (5, 5)])
+        self.assertEqual(connection.execute("SELECT rowid, `id`, `name` FROM `simple` ORDER BY rowid").fetchall(), rows)
+        self.assertFalse(ddl.exists(connection, prefix='_old_'))
+        self.assertIn("DEFAULT 'none'", connection.execute("SELECT sql FROM sqlite_master WHERE name='simple'").fetchone()[0])
+
+        definition = {**definition, "fields": [{**field, "default": "none"} if field["name"] == "name" else field for field in definition["fields"]]}
+
+        def interrupt(done, total):
+            raise KeyboardInterrupt()
+
+        ddl = TABLE(migration={"fields": {"change": {"name": {"default": "some"}}}}, definition=definition)
+        prepare, _, _ = ddl.rebuilding()
+        ddl.transact(connection, prepare)
+        self.assertRaises(KeyboardInterrupt, ddl.copy, connection, rows=3, progress=interrupt)
+        self.assertTrue(ddl.exists(connection, prefix='_old_'))
+        self.assertEqual(connection.execute("SELECT COUNT(*) FROM `_new_simple`").fetchone()[0], 3)
+        self.assertRaisesRegex(sqlite3.OperationalError, "no such table: simple", connection.execute, "SELECT * FROM `simple`")
+
+        progress = []
+
+        ddl = TABLE(migration={"fields": {"change": {"name": {"default": "some"}}}}, definition=definition)
+        ddl.execute(connection, rows=3, progress=lambda done, total: progress.append((done, total)))
+
+        self.assertEqual(progress, [(5, 5)])
+        self.assertEqual(connection.execute("SELECT rowid, `id`, `name` FROM `simple` ORDER BY rowid").fetchall(), rows)
+        self.assertFalse(ddl.exists(connection, prefix='_old_'))
+
+        definition = {**definition, "fields": [{**field, "default": "some"} if field["name"] == "name" else field for field in definition["fields"]]}
+
+        writes = []
+
+        def write(done, total):
+            try:
+                connection.execute("INSERT INTO `simple` (`id`, `name`) VALUES (99, 'writer')")
+            except sqlite3.OperationalError as exception:
+                writes.append(str(exception))
+
+        ddl = TABLE(migration={"fields": {"change": {"name": {"default": "more"}}}}, definition=definition)
+        ddl.execute(connection, rows=4, progress=write)
+
+        self.assertEqual(writes, ["no such table: simple", "no such table: simple"])
+        self.assertEqual(connection.execute("SELECT rowid, `id`, `name` FROM `simple` ORDER BY rowid").fetchall(), rows)
+        self.assertFalse(ddl.exists(connection, prefix='_old_'))
+        self.assertFalse(ddl.exists(connection, prefix='_new_'))
+
+        ddl = TABLE(migration={"fields": {"change": {"name": {"store": "label"}}}}, definition=definition)
+        ddl.execute(connection)
+        self.assertEqual(ddl.sql, "ALTER TABLE `simple` RENAME `name` TO `label`;\n")
+        self.assertEqual(connection.execute("SELECT rowid, `id`, `label` FROM `simple` ORDER BY rowid").fetchall(), rows)
+
+    def test_online(self):
+
+        connection = sqlite3.connect(":memory:")
+
+        definition = Simple.thy().define()
+
+        ddl = TABLE(migration=definition)
+        ddl.args = []
+        ddl.create()
+        connection.executescript(ddl.sql)
+
+        connection.executemany("INSERT INTO `simple` (`id`, `name`) VALUES (?, ?)", [(id, f"n{id}") for id in range(6)])
+        connection.commit()
+
+        migration = {"fields": {"change": {"name": {"store": "label", "default": "none"}}}}
+
+        ddl = TABLE(migration=migration, definition=definition)
+
+        prepare, finish = ddl.mirroring()
+        self.assertEqual(prepare, [
+            """CREATE TABLE IF NOT EXISTS `_new_simple` (`id` INTEGER,`label` TEXT NOT NULL DEFAULT 'none')""",
+            """CREATE TRIGGER `_new_simple_insert` AFTER INSERT ON `simple` BEGIN """
+            """INSERT INTO `_new_simple` (`id`,`label`,`rowid`) VALUES (NEW.`id`,NEW.`name`,NEW.`rowid`); END""",
+            """CREATE TRIGGER `_new_simple_update` AFTER UPDATE ON `simple` BEGIN DELETE FROM `_new_simple` WHERE rowid=OLD.rowid; """
+            """INSERT INTO `_new_simple` (`id`,`label`,`rowid`) VALUES (NEW.`id`,NEW.`name`,NEW.`rowid`); END""",
+            """CREATE TRIGGER `_new_simple_delete` AFTER DELETE ON `simple` BEGIN DELETE FROM `_new_simple` WHERE rowid=OLD.rowid; END"""
+        ])
+        self.assertEqual(finish, [
+            """DROP TABLE `simple`""",
+            """ALTER TABLE `_new_simple` RENAME TO `simple`""",
+            """CREATE UNIQUE INDEX `simple_name` ON `simple` (`label`)"""
+        ])
+
+        def write(done, total):
+            if done == 2:
+                connection.execute("INSERT INTO `simple` (`id`, `name`) VALUES (6, 'n6')")
+                connection.execute("UPDATE `simple` SET `name`='m0' WHERE `id`=0")
+                connection.execute("UPDATE `simple` SET `name`='m4' WHERE `id`=4")
+                connection.execute("DELETE FROM `simple` WHERE `id`=1")
+                connection.execute("DELETE FROM `simple` WHERE `id`=5")
+                connection.commit()
+
+        rows = None
+
+        def check(done, total):
+            nonlocal rows
+            write(done, total)
+            rows = connection.execute("SELECT rowid, `id`, `name` FROM `simple` ORDER BY rowid").fetchall()
+
+        ddl.execute(connection, rows=2, progress=check, online=True)
+
+        self.assertEqual(connection.execute("SELECT rowid, `id`, `label` FROM `simple` ORDER BY rowid").fetchall(), rows)
+        self.assertEqual(rows, [(1, 0, "m0"), (3, 2, "n2"), (4, 3, "n3"), (5, 4, "m4"), (7, 6, "n6")])
+        self.assertFalse(ddl.exists(connection, prefix='_new_'))
+        self.assertEqual(connection.execute("SELECT COUNT(*) FROM sqlite_master WHERE type='trigger'").fetchone()[0], 0)
+        self.assertEqual(
+            connection.execute("SELECT name FROM sqlite_master WHERE type='index'").fetchall(),
+            [("simple_name",)]
+        )
+
+        self.assertRaisesRegex(
+            relations_sql.SQLError, "can't rebuild online across schemas",
+            TABLE(migration={"schema": "other"}, definition=definition).mirroring
+        )
+
+        connection = sqlite3.connect(":memory:")
+
+        ddl = TABLE(migration=definition)
+        ddl.args = []
+        ddl.create()
+        connection.executescript(ddl.sql)
+
+        connection.executemany("INSERT INTO `simple` (`id`, `name`) VALUES (?, ?)", [(id, f"n{id}") for id in range(5)])
+        connection.commit()
+
+        ddl = TABLE(migration={"fields": {"add": [{"name": "b", "store": "b", "kind": "int"}]}}, definition=definition)
+
+        self.assertRaisesRegex(
+            relations_sql.SQLError, "can't rebuild online adding b NOT NULL without a default",
+            ddl.execute, connection, online=True
+        )
+        self.assertFalse(ddl.exists(connection, prefix='_new_'))
+
+        connection.execute("UPDATE `simple` SET `id`=NULL WHERE `id`=3")
+        connection.commit()
+
+        ddl = TABLE(migration={"fields": {"change": {"id": {"none": False}}}}, definition=definition)
+
+        self.assertRaisesRegex(
+            sqlite3.IntegrityError, "NOT NULL constraint failed",
+            ddl.execute, connection, rows=2, online=True
+        )
+        self.assertEqual(connection.execute("SELECT COUNT(*) FROM `simple`").fetchone()[0], 5)
 
     def test_drop(self):
 
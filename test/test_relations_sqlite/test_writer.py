@@ -0,0 +1,215 @@
+import unittest
+import unittest.mock
+
+import os
+import sqlite3
+import tempfile
+import asyncio
+import threading
+
+import relations
+from relations_sqlite import *
+
+
+class Meta(relations.Model):
+    id = int, {"auto": True}
+    name = str
+
+
+class TestWRITER(unittest.TestCase):
+
+    maxDiff = None
+
+    def setUp(self):
+
+        self.directory = tempfile.TemporaryDirectory()
+        self.database = os.path.join(self.directory.name, "main.db")
+
+        self.pool = POOL(self.database, size=1, attach={"unit": os.path.join(self.directory.name, "unit.db")})
+        self.pool.execute(TABLE(migration={**Meta.thy().define(), "schema": "unit"}))
+
+    def tearDown(self):
+
+        self.pool.close()
+        self.directory.cleanup()
+
+    def count(self):
+
+        return len(self.pool.execute(SELECT("id").FROM("unit.meta")))
+
+    def test___init__(self):
+
+        writer = WRITER(pool=self.pool, window=0.01, batch=10)
+
+        self.assertEqual((writer.window, writer.batch, writer.owned, writer.closed), (0.01, 10, False, False))
+        self.assertTrue(writer.thread.is_alive())
+
+        writer.close()
+
+        writer = WRITER(self.database, timeout=0.25)
+
+        self.assertEqual((writer.window, writer.batch, writer.owned), (0.002, 1000, True))
+        self.assertEqual(writer.pool.size, 1)
+        self.assertEqual(writer.pool.kwargs, {"timeout": 0.25})
+
+        writer.close()
+
+        self.assertFalse(writer.thread.is_alive())
+
+    def test_submit(self):
+
+        writer = WRITER(pool=self.pool, window=0.05)
+
+        futures = [writer.submit(INSERT("unit.meta").VALUES(name=f"n{row}")) for row in range(20)]
+
+        self.assertEqual([future.result() for future in futures], [1] * 20)
+        self.assertLess(writer.commits, 3)
+        self.assertEqual(writer.writes, 20)
+
+        writer.close()
+
+        self.assertRaisesRegex(RuntimeError, "WRITER is closed", writer.submit, DELETE("unit.meta"))
+
+    def test_execute(self):
+
+        writer = WRITER(pool=self.pool, window=0)
+
+        self.assertEqual(writer.execute(INSERT("unit.meta").many([{"name": "tom"}, {"name": "mary"}])), 2)
+        self.assertEqual(writer.execute(UPDATE("unit.meta").SET(name="jane").WHERE(name="tom")), 1)
+        self.assertRaises(sqlite3.IntegrityError, writer.execute, UPDATE("unit.meta").SET(name="jane"))
+
+        writer.close()
+
+        self.assertEqual(self.pool.execute(SELECT("name").FROM("unit.meta").ORDER_BY("name")), [("jane",), ("mary",)])
+
+    def test_write(self):
+
+        async def write():
+            writer = WRITER(pool=self.pool)
+            result = await writer.write(INSERT("unit.meta").VALUES(name="tom"))
+            writer.close()
+            return result
+
+        self.assertEqual(asyncio.run(write()), 1)
+        self.assertEqual(self.count(), 1)
+
+    def test_gather(self):
+
+        writer = WRITER(pool=self.pool, window=0.05, batch=10)
+
+        futures = [writer.submit(INSERT("unit.meta").VALUES(name=f"n{row}")) for row in range(25)]
+
+        for future in futures:
+            future.result()
+
+        self.assertGreaterEqual(writer.commits, 3)
+
+        writer.close()
+
+        self.assertEqual(self.count(), 25)
+
+    def test_commit(self):
+
+        writer = WRITER(pool=self.pool, window=0.05)
+
+        futures = [
+            writer.submit(INSERT("unit.meta").VALUES(name="tom")),
+            writer.submit(INSERT("unit.meta").VALUES(name="tom")),
+            writer.submit(INSERT("unit.meta").VALUES(name="mary"))
+        ]
+
+        cancelled = writer.submit(INSERT("unit.meta").VALUES(name="dick"))
+        cancelled.cancel()
+
+        self.assertEqual(futures[0].result(), 1)
+        self.assertRaisesRegex(sqlite3.IntegrityError, "UNIQUE", futures[1].result)
+        self.assertEqual(futures[2].result(), 1)
+        self.assertTrue(cancelled.cancelled())
+
+        writer.close()
+
+        self.assertEqual(self.pool.execute(SELECT("name").FROM("unit.meta").ORDER_BY("id")), [("tom",), ("mary",)])
+
+    def test_commit_locked(self):
+
+        locker = sqlite3.connect(self.database, isolation_level=None)
+        locker.execute("CREATE TABLE `locked` (`name` TEXT)")
+        locker.execute("BEGIN EXCLUSIVE")
+
+        writer = WRITER(self.database, window=0, pragma={"busy_timeout": 100})
+
+        future = writer.submit(INSERT("locked").VALUES(name="tom"))
+
+        self.assertRaisesRegex(sqlite3.OperationalError, "database is locked", future.result, timeout=5)
+
+        locker.execute("COMMIT")
+
+        self.assertEqual(writer.execute(INSERT("locked").VALUES(name="mary")), 1)
+
+        writer.close()
+        locker.close()
+
+    def test_loop(self):
+
+        writer = WRITER(pool=self.pool, window=0.01)
+
+        def insert(thread):
+            for row in range(25):
+                writer.execute(INSERT("unit.meta").VALUES(name=f"{thread}-{row}"))
+
+        threads = [threading.Thread(target=insert, args=(thread,)) for thread in range(4)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        writer.close()
+
+        self.assertEqual(self.count(), 100)
+        self.assertEqual(writer.writes, 100)
+        self.assertLess(writer.commits, 100)
+
+        gate = threading.Event()
+
+        def connect(pool):
+            gate.wait(5)
+            raise sqlite3.OperationalError("unable to open database file")
+
+        with unittest.mock.patch.object(POOL, "connect", connect):
+
+            writer = WRITER(self.database)
+
+            future = writer.submit(INSERT("meta").VALUES(name="tom"))
+            gate.set()
+
+            self.assertRaisesRegex(sqlite3.OperationalError, "unable to open database file", future.result, timeout=5)
+
+            writer.thread.join(5)
+
+        self.assertFalse(writer.thread.is_alive())
+        self.assertTrue(writer.closed)
+        self.assertIsInstance(writer.failure, sqlite3.OperationalError)
+        self.assertRaisesRegex(RuntimeError, "WRITER is closed", writer.submit, INSERT("meta").VALUES(name="mary"))
+
+        writer.close()
+
+        writer = WRITER(os.path.join(self.directory.name, "missing", "main.db"))
+        writer.thread.join(5)
+
+        self.assertRaisesRegex(RuntimeError, "WRITER is closed", writer.execute, INSERT("meta").VALUES(name="tom"))
+
+        writer.close()
+
+    def test_close(self):
+
+        writer = WRITER(pool=self.pool, window=1)
+
+        future = writer.submit(INSERT("unit.meta").VALUES(name="tom"))
+
+        writer.close()
+        writer.close()
+
+        self.assertEqual(future.result(timeout=0), 1)
+        self.assertTrue(writer.closed)